@@ -0,0 +1,156 @@
+"""Batch conversion of whole Python source trees into Java"""
+import os
+import time
+
+from cache import CacheStats, ConversionCache
+from engine import ConversionOptions, PyjamaEngine
+
+
+def java_class_name(stem):
+    """Turn a module file name into a valid Java class name"""
+    parts = [part for part in stem.replace("-", "_").split("_") if part]
+    name = "".join(part[:1].upper() + part[1:] for part in parts)
+    if not name or not name.isidentifier():
+        return "Main"
+    if name[0].isdigit():
+        name = "_" + name
+    return name
+
+
+def find_python_files(source_dir):
+    """Yield every .py file below source_dir in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+
+def plan_conversion(source_dir, output_dir):
+    """Map every Python file to its mirrored .java path and class name"""
+    tasks = []
+    for src_path in find_python_files(source_dir):
+        rel_dir = os.path.relpath(os.path.dirname(src_path), source_dir)
+        stem = os.path.splitext(os.path.basename(src_path))[0]
+        class_name = java_class_name(stem)
+        dst_path = os.path.normpath(os.path.join(output_dir, rel_dir, class_name + ".java"))
+        tasks.append((src_path, dst_path, class_name))
+    return tasks
+
+
+_worker_caches = {}
+
+
+def worker_cache(cache_dir):
+    """The calling process's cache handle for cache_dir, created on first use"""
+    cache = _worker_caches.get(cache_dir)
+    if cache is None:
+        # Eviction is left to the parent process once the batch is done
+        cache = _worker_caches[cache_dir] = ConversionCache(cache_dir, max_bytes=float("inf"))
+    return cache
+
+
+def convert_file(task, add_imports=True, add_main=True, cache_dir=None):
+    """Convert one file; runs inside a worker process
+
+    With a cache_dir, unchanged files are served from the conversion cache
+    without being parsed. The last item of the outcome tells whether that
+    happened (None when no cache is used).
+    """
+    src_path, dst_path, class_name = task
+    try:
+        with open(src_path, 'r', encoding='utf-8') as file:
+            python_code = file.read()
+        options = ConversionOptions(class_name=class_name, add_imports=add_imports, add_main=add_main,
+                                    explain=False)
+        cache = worker_cache(cache_dir) if cache_dir else None
+        result = cache.get(python_code, options) if cache else None
+        cached = result is not None if cache else None
+        if result is None:
+            result = PyjamaEngine(options).convert_python_to_java(python_code)
+            if cache and result.ok:
+                cache.put(python_code, options, result)
+        os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+        with open(dst_path, 'w', encoding='utf-8') as file:
+            file.write(result.java_code)
+        error = None if result.ok else result.explanation
+        return src_path, result.ok, result.unsupported, error, cached
+    except Exception as e:
+        return src_path, False, {}, str(e), None
+
+
+def _convert_task(args):
+    return convert_file(*args)
+
+
+class BatchSummary:
+    """Aggregated outcome of a batch run"""
+
+    def __init__(self):
+        self.files = 0
+        self.failures = []
+        self.unsupported = {}
+        self.elapsed = 0.0
+        self.cache = CacheStats()
+
+    def add(self, src_path, ok, unsupported, error, cached=None):
+        self.files += 1
+        if cached is not None:
+            if cached:
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
+        if not ok:
+            self.failures.append((src_path, error))
+        for kind, count in unsupported.items():
+            self.unsupported[kind] = self.unsupported.get(kind, 0) + count
+
+    @property
+    def files_per_sec(self):
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self):
+        lines = [
+            f"Converted {self.files} files in {self.elapsed:.2f}s "
+            f"({self.files_per_sec:.1f} files/sec)",
+            f"Failures: {len(self.failures)}",
+        ]
+        if self.cache.lookups:
+            lines.append(f"Cache hits: {self.cache.hits}/{self.cache.lookups} "
+                         f"({self.cache.hit_rate * 100:.0f}%)")
+        for src_path, error in self.failures:
+            lines.append(f"  {src_path}: {error}")
+        total = sum(self.unsupported.values())
+        lines.append(f"Unsupported nodes: {total}")
+        for kind, count in sorted(self.unsupported.items(), key=lambda item: -item[1]):
+            lines.append(f"  {kind}: {count}")
+        return "\n".join(lines)
+
+
+def convert_tree(source_dir, output_dir, jobs=None, add_imports=True, add_main=True, cache=None):
+    """Convert every .py file under source_dir across a process pool
+
+    cache is an optional ConversionCache shared by all workers; its hit
+    counts are recorded and its size cap enforced once at the end.
+    """
+    tasks = plan_conversion(source_dir, output_dir)
+    summary = BatchSummary()
+    started = time.perf_counter()
+    cache_dir = cache.directory if cache is not None else None
+    work = [(task, add_imports, add_main, cache_dir) for task in tasks]
+    if jobs == 1:
+        for outcome in map(_convert_task, work):
+            summary.add(*outcome)
+    else:
+        # Imported here: multiprocessing costs more to load than a small file takes to convert
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(work) // ((jobs or os.cpu_count() or 1) * 8))
+            for outcome in pool.map(_convert_task, work, chunksize=chunksize):
+                summary.add(*outcome)
+    if cache is not None:
+        cache.record(summary.cache)
+        cache.trim()
+        cache.flush_stats()
+    summary.elapsed = time.perf_counter() - started
+    return summary
@@ -0,0 +1,165 @@
+"""Converter benchmark suite
+
+Generates synthetic programs (see corpus.py) and times the three phases
+of PyjamaEngine.convert_python_to_java separately: ast.parse, the
+convert_node walk and final class assembly. Reports throughput and peak
+memory, saves results as JSON and can compare a run against a stored
+baseline.
+
+Run from the repository root:
+    python benchmarks/bench_convert.py --output bench.json
+    python benchmarks/bench_convert.py --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import PyjamaEngine  # noqa: E402
+from corpus import PROFILES, CorpusSpec, generate_program  # noqa: E402
+
+PHASES = ("parse", "convert", "assemble")
+# Phases faster than this are too noisy to judge regressions on
+MIN_COMPARABLE_MS = 1.0
+
+
+def time_phases(source, repeat):
+    """Best-of-`repeat` wall time in seconds for each conversion phase"""
+    best = {phase: float("inf") for phase in PHASES}
+    result = None
+    for _ in range(repeat):
+        engine = PyjamaEngine()
+        started = time.perf_counter()
+        tree = engine.parse(source)
+        parsed = time.perf_counter()
+        module = engine.convert_module(tree, source)
+        converted = time.perf_counter()
+        result = engine.assemble(module)
+        assembled = time.perf_counter()
+        best["parse"] = min(best["parse"], parsed - started)
+        best["convert"] = min(best["convert"], converted - parsed)
+        best["assemble"] = min(best["assemble"], assembled - converted)
+    return best, result
+
+
+def peak_memory(source):
+    """Peak traced allocation in bytes for one full conversion"""
+    tracemalloc.start()
+    try:
+        PyjamaEngine().convert_python_to_java(source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_profile(name, spec, repeat):
+    source = generate_program(spec)
+    phases, result = time_phases(source, repeat)
+    total = sum(phases.values())
+    source_lines = source.count("\n")
+    return {
+        "profile": name,
+        "spec": spec.to_dict(),
+        "source_bytes": len(source.encode("utf-8")),
+        "source_lines": source_lines,
+        "java_lines": result.java_code.count("\n") + 1,
+        "phases_ms": {phase: seconds * 1000 for phase, seconds in phases.items()},
+        "total_ms": total * 1000,
+        "lines_per_sec": source_lines / total if total else 0.0,
+        "mb_per_sec": len(source) / total / 1e6 if total else 0.0,
+        "peak_memory_kb": peak_memory(source) / 1024,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """List regressions of `results` against `baseline` beyond `tolerance`"""
+    previous = {entry["profile"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry["profile"])
+        if old is None:
+            continue
+        checks = [("total", old["total_ms"], entry["total_ms"])]
+        checks.extend((phase, old["phases_ms"][phase], entry["phases_ms"][phase]) for phase in PHASES)
+        for label, before, after in checks:
+            if before >= MIN_COMPARABLE_MS and after > before * (1 + tolerance):
+                regressions.append(f"{entry['profile']} {label}: {before:.2f}ms -> {after:.2f}ms "
+                                   f"(+{(after / before - 1) * 100:.0f}%)")
+        before, after = old["peak_memory_kb"], entry["peak_memory_kb"]
+        if after > before * (1 + tolerance):
+            regressions.append(f"{entry['profile']} peak memory: {before:.0f}KB -> {after:.0f}KB")
+    return regressions
+
+
+def format_table(results):
+    header = (f"{'profile':<12} {'lines':>7} {'parse':>9} {'convert':>9} {'assemble':>9} "
+              f"{'total':>9} {'lines/s':>10} {'peak KB':>9}")
+    rows = [header]
+    for entry in results:
+        phases = entry["phases_ms"]
+        rows.append(f"{entry['profile']:<12} {entry['source_lines']:>7} {phases['parse']:>8.2f}m "
+                    f"{phases['convert']:>8.2f}m {phases['assemble']:>8.2f}m {entry['total_ms']:>8.2f}m "
+                    f"{entry['lines_per_sec']:>10.0f} {entry['peak_memory_kb']:>9.0f}")
+    return "\n".join(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Pyjama converter")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="profile to run (repeatable, default: all)")
+    parser.add_argument("--functions", type=int, help="run a custom corpus with this many functions")
+    parser.add_argument("--statements", type=int, default=30, help="statements per block (custom corpus)")
+    parser.add_argument("--depth", type=int, default=3, help="nesting depth (custom corpus)")
+    parser.add_argument("--expr-size", type=int, default=4, help="operators per expression (custom corpus)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per profile, best is kept")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a regression is reported (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.functions is not None:
+        specs = {"custom": CorpusSpec(functions=args.functions, statements=args.statements,
+                                      depth=args.depth, expr_size=args.expr_size, seed=args.seed)}
+    else:
+        names = args.profile or sorted(PROFILES)
+        specs = {name: PROFILES[name] for name in names}
+
+    results = [run_profile(name, spec, args.repeat) for name, spec in specs.items()]
+    print(format_table(results))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
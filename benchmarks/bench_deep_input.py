@@ -0,0 +1,109 @@
+"""Stress test for very long and very deeply nested inputs
+
+Each shape below used to overflow the Python call stack somewhere
+between a few hundred and a thousand terms or branches, and came out as
+a single "maximum recursion depth exceeded" error comment. Conversion
+now walks statements and expressions from explicit stacks, so every size
+must convert cleanly and the time per term should stay roughly flat.
+Conversions run on a worker thread, as they do in the GUI.
+
+Run from the repository root: python benchmarks/bench_deep_input.py
+Exits with status 1 if any conversion fails.
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import ConversionOptions, PyjamaEngine  # noqa: E402
+
+SIZES = (1000, 5000, 20000)
+# Python's own parser gives up on longer elif chains and unary chains
+PARSER_LIMITS = {"elif chain": 5000, "unary chain": 2000}
+
+
+def sum_chain(n):
+    """`x = a0 + a1 + ...`: a left-nested BinOp n deep"""
+    return "x = " + " + ".join(f"a{i}" for i in range(n)) + "\n"
+
+
+def elif_chain(n):
+    """An if statement with n elif branches, each nested in the previous orelse"""
+    lines = ["x = 1", "if x == 0:", "    y = 0"]
+    for i in range(1, n):
+        lines += [f"elif x == {i}:", f"    y = {i}"]
+    lines += ["else:", "    y = -1"]
+    return "\n".join(lines) + "\n"
+
+
+def string_chain(n):
+    """A loop appending an n-term concatenation, lowered to a StringBuilder"""
+    terms = " + ".join("str(i)" for _ in range(n))
+    return f's = ""\nfor i in range(3):\n    s += "a" + {terms}\n'
+
+
+def subscript_chain(n):
+    """`x = y[0][0]...`: a Subscript n deep"""
+    return "y = [1]\nx = y" + "[0]" * n + "\n"
+
+
+def compare_chain(n):
+    """An if test comparing an n-term sum"""
+    return "if " + " + ".join("a" for _ in range(n)) + " < b:\n    print(b)\n"
+
+
+def unary_chain(n):
+    """`x = - - ... y`: an unsupported UnaryOp n deep"""
+    return "x = " + "-" * n + "y\n"
+
+
+SHAPES = {
+    "sum chain": sum_chain,
+    "elif chain": elif_chain,
+    "string chain": string_chain,
+    "subscript chain": subscript_chain,
+    "compare chain": compare_chain,
+    "unary chain": unary_chain,
+}
+
+
+def convert_in_thread(source, options):
+    """Convert on a worker thread; returns (result, seconds)"""
+    outcome = {}
+
+    def run():
+        started = time.perf_counter()
+        outcome["result"] = PyjamaEngine(options).convert_python_to_java(source)
+        outcome["seconds"] = time.perf_counter() - started
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join()
+    return outcome["result"], outcome["seconds"]
+
+
+def main():
+    failures = 0
+    print(f"{'shape':<16} {'size':>6} {'options':<12} {'status':<7} {'ms':>9} {'us/term':>8}")
+    for name, make_source in SHAPES.items():
+        for size in SIZES:
+            if size > PARSER_LIMITS.get(name, size):
+                continue
+            source = make_source(size)
+            for label, options in (("default", ConversionOptions()),
+                                   ("collections", ConversionOptions(specialize_collections=True))):
+                result, seconds = convert_in_thread(source, options)
+                failed = not result.ok or "Error converting" in result.java_code
+                failures += failed
+                print(f"{name:<16} {size:>6} {label:<12} {'FAILED' if failed else 'ok':<7} "
+                      f"{seconds * 1000:>9.1f} {seconds * 1e6 / size:>8.1f}")
+    if failures:
+        print(f"{failures} conversions failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Benchmark conversion of deeply nested code
+
+Compares the old per-level indent() string rebuilding against the
+CodeEmitter used by the engine, then times full conversions at growing
+nesting depths. With the emitter the cost per output line stays flat
+as depth grows.
+
+Run from the repository root: python benchmarks/bench_nesting.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import CodeEmitter, PyjamaEngine  # noqa: E402
+
+# Python's tokenizer refuses more than 100 indentation levels
+DEPTHS = (10, 25, 50, 75, 95)
+WIDTH = 20
+
+
+def nested_source(depth, width=WIDTH):
+    """`depth` nested if blocks, each holding `width` assignments"""
+    lines = []
+    for d in range(depth):
+        lines.append("    " * d + f"if x{d} > {d}:")
+        for w in range(width):
+            lines.append("    " * (d + 1) + f"y{w} = x{d} + {w}")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_indent(code, level):
+    return "\n".join("    " * level + line for line in code.splitlines() if line.strip())
+
+
+def legacy_emit(depth, width=WIDTH):
+    """Old assembly: join each level, then re-indent it inside its parent"""
+    code = ""
+    for d in reversed(range(depth)):
+        lines = [f"if (x{d} > {d}) {{"]
+        lines.extend(f"    int y{w} = (x{d} + {w});" for w in range(width))
+        if code:
+            lines.append(legacy_indent(code, 1))
+        lines.append("}")
+        code = "\n".join(lines)
+    return legacy_indent(code, 2)
+
+
+def emitter_emit(depth, width=WIDTH):
+    """New assembly: one shared buffer, each line indented once"""
+    out = CodeEmitter(level=2)
+    for d in range(depth):
+        out.line(f"if (x{d} > {d}) {{")
+        out.indent()
+        for w in range(width):
+            out.line(f"int y{w} = (x{d} + {w});")
+    for d in range(depth):
+        out.dedent()
+        out.line("}")
+    return out.getvalue()
+
+
+def best_of(func, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print("Assembly only (ms)")
+    print(f"{'depth':>6} {'indent()':>10} {'emitter':>10} {'speedup':>8}")
+    for depth in DEPTHS:
+        assert legacy_emit(depth) == emitter_emit(depth)
+        old = best_of(legacy_emit, depth)
+        new = best_of(emitter_emit, depth)
+        print(f"{depth:>6} {old * 1000:>10.2f} {new * 1000:>10.2f} {old / new:>7.1f}x")
+
+    print()
+    print("Full conversion")
+    print(f"{'depth':>6} {'lines':>7} {'ms':>9} {'us/line':>8}")
+    engine = PyjamaEngine()
+    for depth in DEPTHS:
+        source = nested_source(depth)
+        lines = len(engine.convert_python_to_java(source).java_code.splitlines())
+        elapsed = best_of(engine.convert_python_to_java, source)
+        print(f"{depth:>6} {lines:>7} {elapsed * 1000:>9.2f} {elapsed * 1e6 / lines:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Cold-start benchmark for headless use of the converter
+
+Each case runs in a fresh interpreter, so the times include interpreter
+startup and every import on the path. "python" is the floor: an empty
+interpreter. "one file" converts the small corpus program with the CLI,
+the way scripts call the converter; it must not load Tk, and the run
+fails if it does. "gui import" shows what the window costs on top when
+Tk is available.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import PROFILES, generate_program  # noqa: E402
+
+# Exits with status 3 if converting one file pulled in Tk
+ONE_FILE = """
+import sys
+import main
+status = main.main(sys.argv[1:])
+sys.exit(3 if "tkinter" in sys.modules else status)
+"""
+
+
+def cases(source_path, output_path):
+    """(name, argv) of every timed case"""
+    listed = [
+        ("python", [sys.executable, "-c", "pass"]),
+        ("import main", [sys.executable, "-c", "import main"]),
+        ("one file", [sys.executable, "-c", ONE_FILE, source_path, "-o", output_path, "--no-cache"]),
+    ]
+    try:
+        import tkinter  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        listed.append(("gui import", [sys.executable, "-c", "import gui"]))
+    return listed
+
+
+def time_case(argv, runs):
+    """Wall times in milliseconds of `runs` fresh interpreters running argv"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        times.append((time.perf_counter() - started) * 1000)
+        if completed.returncode:
+            if completed.returncode == 3:
+                raise RuntimeError("converting one file imported tkinter")
+            raise RuntimeError(completed.stderr.decode("utf-8", errors="replace").strip())
+    return times
+
+
+def compare(results, baseline, tolerance):
+    """List cases whose median regressed beyond `tolerance` against `baseline`"""
+    previous = {entry["case"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry["case"])
+        if old is None:
+            continue
+        before, after = old["median_ms"], entry["median_ms"]
+        if after > before * (1 + tolerance):
+            regressions.append(f"{entry['case']}: {before:.1f}ms -> {after:.1f}ms "
+                               f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark converter cold-start latency")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per case")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a regression is reported (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pyjama-startup-") as workdir:
+        source_path = os.path.join(workdir, "small.py")
+        with open(source_path, 'w', encoding='utf-8') as file:
+            file.write(generate_program(PROFILES["small"]))
+        output_path = os.path.join(workdir, "Small.java")
+        print(f"{'case':<12} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+        for name, command in cases(source_path, output_path):
+            try:
+                times = time_case(command, args.runs)
+            except RuntimeError as e:
+                print(f"{name:<12} FAILED: {e}")
+                return 1
+            entry = {"case": name, "median_ms": statistics.median(times),
+                     "min_ms": min(times), "max_ms": max(times)}
+            results.append(entry)
+            print(f"{name:<12} {entry['median_ms']:>10.1f} {entry['min_ms']:>8.1f} {entry['max_ms']:>8.1f}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
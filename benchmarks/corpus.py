@@ -0,0 +1,122 @@
+"""Synthetic Python corpus generator for converter benchmarks
+
+Programs are built only from constructs the converter understands, with
+the shape controlled by CorpusSpec. The same spec and seed always give
+the same program.
+"""
+import random
+
+
+class CorpusSpec:
+    """Parameters controlling the shape of a generated program"""
+
+    def __init__(self, functions=20, statements=30, depth=3, expr_size=4,
+                 literal_mix=None, seed=0):
+        self.functions = functions
+        self.statements = statements
+        self.depth = depth
+        self.expr_size = expr_size
+        # Relative weights of literal kinds appearing in expressions
+        self.literal_mix = literal_mix or {"int": 5, "float": 2, "str": 2, "bool": 1}
+        self.seed = seed
+
+    def to_dict(self):
+        return {
+            "functions": self.functions,
+            "statements": self.statements,
+            "depth": self.depth,
+            "expr_size": self.expr_size,
+            "literal_mix": dict(self.literal_mix),
+            "seed": self.seed,
+        }
+
+
+# Named corpora used by the benchmark suite
+PROFILES = {
+    "small": CorpusSpec(functions=5, statements=10, depth=2, expr_size=2),
+    "wide": CorpusSpec(functions=200, statements=40, depth=2, expr_size=3),
+    "deep": CorpusSpec(functions=20, statements=40, depth=12, expr_size=3),
+    "expressions": CorpusSpec(functions=50, statements=30, depth=2, expr_size=40,
+                              literal_mix={"int": 6, "float": 4}),
+    "strings": CorpusSpec(functions=50, statements=30, depth=2, expr_size=6,
+                          literal_mix={"str": 8, "int": 1}),
+}
+
+
+class CorpusGenerator:
+    ARITH_OPS = ("+", "-", "*", "/", "%")
+    COMPARE_OPS = ("<", "<=", ">", ">=", "==", "!=")
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.kinds = list(spec.literal_mix)
+        self.weights = [spec.literal_mix[kind] for kind in self.kinds]
+
+    def literal(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "int":
+            return str(self.rng.randint(0, 1000))
+        if kind == "float":
+            return f"{self.rng.uniform(0, 100):.3f}"
+        if kind == "str":
+            return f'"s{self.rng.randint(0, 99)}"'
+        return self.rng.choice(("True", "False"))
+
+    def operand(self, names):
+        if names and self.rng.random() < 0.5:
+            return self.rng.choice(names)
+        return self.literal()
+
+    def expression(self, names):
+        parts = [self.operand(names)]
+        for _ in range(self.rng.randint(1, max(1, self.spec.expr_size))):
+            parts.append(self.rng.choice(self.ARITH_OPS))
+            parts.append(self.operand(names))
+        return " ".join(parts)
+
+    def condition(self, names):
+        return f"{self.operand(names)} {self.rng.choice(self.COMPARE_OPS)} {self.operand(names)}"
+
+    def block(self, lines, indent, names, count, depth):
+        """Emit `count` statements, nesting control flow up to `depth` levels"""
+        pad = "    " * indent
+        loop_var = f"i{indent}"
+        for index in range(count):
+            roll = self.rng.random()
+            if depth > 0 and roll < 0.15:
+                lines.append(f"{pad}if {self.condition(names)}:")
+                self.block(lines, indent + 1, names, max(1, count // 3), depth - 1)
+                lines.append(f"{pad}else:")
+                self.block(lines, indent + 1, names, 1, depth - 1)
+            elif depth > 0 and roll < 0.25:
+                lines.append(f"{pad}for {loop_var} in range({self.rng.randint(1, 100)}):")
+                self.block(lines, indent + 1, names + [loop_var], max(1, count // 3), depth - 1)
+            elif depth > 0 and roll < 0.30:
+                lines.append(f"{pad}while {self.condition(names)}:")
+                self.block(lines, indent + 1, names, max(1, count // 4), depth - 1)
+                lines.append(f"{pad}    break")
+            elif roll < 0.45 and names:
+                lines.append(f"{pad}{self.rng.choice(names)} += {self.operand(names)}")
+            elif roll < 0.60:
+                lines.append(f"{pad}print({self.expression(names)})")
+            else:
+                name = f"v{indent}_{index}"
+                lines.append(f"{pad}{name} = {self.expression(names)}")
+                names = names + [name]
+
+    def generate(self):
+        lines = []
+        for index in range(self.spec.functions):
+            params = [f"p{i}" for i in range(self.rng.randint(0, 3))]
+            lines.append(f"def func_{index}({', '.join(params)}):")
+            self.block(lines, 1, params, self.spec.statements, self.spec.depth)
+            lines.append(f"    return {self.expression(params)}")
+            lines.append("")
+        self.block(lines, 0, [], self.spec.statements, self.spec.depth)
+        return "\n".join(lines) + "\n"
+
+
+def generate_program(spec):
+    """Generate a Python program matching spec"""
+    return CorpusGenerator(spec).generate()
@@ -0,0 +1,227 @@
+"""Persistent content-addressed cache of finished conversions
+
+Entries are keyed by a hash of the Python source, every option that
+changes the output and the converter version, so a hit can be returned
+without parsing or converting anything. Each entry is one zlib-compressed
+JSON file; its modification time doubles as the last-use time for LRU
+eviction once the cache grows past its size cap.
+"""
+import hashlib
+import json
+import os
+import time
+import zlib
+
+import engine
+import explanations
+import inference
+from engine import ConversionResult
+from explanations import ExplanationLog
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Eviction frees space down to this fraction of the cap, so that a full
+# cache does not rescan itself on every store
+TRIM_TARGET = 0.9
+STATS_FILE = "stats.json"
+ENTRY_SUFFIX = ".json.z"
+
+_converter_version = None
+
+
+def converter_version():
+    """Digest of the converter sources; any change to them invalidates the cache"""
+    global _converter_version
+    if _converter_version is None:
+        digest = hashlib.sha256()
+        for module in (engine, inference, explanations):
+            with open(module.__file__, 'rb') as file:
+                digest.update(file.read())
+        _converter_version = digest.hexdigest()[:16]
+    return _converter_version
+
+
+def default_cache_dir():
+    """PYJAMA_CACHE_DIR, else pyjama/ under the user's cache directory"""
+    configured = os.environ.get("PYJAMA_CACHE_DIR")
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pyjama")
+
+
+def cache_key(python_code, options):
+    """Content address of converting python_code with options"""
+    # Incremental reuse changes how the result is computed, never what it is
+    settings = sorted((name, value) for name, value in vars(options).items() if name != "incremental")
+    digest = hashlib.sha256()
+    digest.update(f"{converter_version()}|{settings}|".encode("utf-8"))
+    digest.update(python_code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Lookup counters, accumulated in memory and flushed to stats.json"""
+
+    def __init__(self, hits=0, misses=0, evictions=0):
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def to_dict(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class ConversionCache:
+    """Size-capped on-disk cache of ConversionResults with LRU eviction"""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        # Counters not yet written to stats.json
+        self.stats = CacheStats()
+        # Estimated bytes on disk; None until the first store scans the directory
+        self.total_bytes = None
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, python_code, options):
+        """Cached ConversionResult for this source and options, or None"""
+        started = time.perf_counter()
+        path = self.entry_path(cache_key(python_code, options))
+        try:
+            with open(path, 'rb') as file:
+                data = json.loads(zlib.decompress(file.read()))
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return ConversionResult(
+            data["java_code"], ExplanationLog.from_dict(data["explanations"]),
+            ok=data["ok"], unsupported=data["unsupported"],
+            timings={"cache": (time.perf_counter() - started) * 1000}
+        )
+
+    def put(self, python_code, options, result):
+        """Store a finished conversion, evicting old entries past the size cap"""
+        data = {
+            "java_code": result.java_code,
+            "explanations": result.explanations.to_dict(),
+            "ok": result.ok,
+            "unsupported": result.unsupported,
+        }
+        payload = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        path = self.entry_path(cache_key(python_code, options))
+        # Write then rename, so concurrent readers never see half an entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(temp_path, path)
+        except OSError:
+            # A cache that cannot be written only costs speed
+            return
+
+        if self.max_bytes == float("inf"):
+            # Uncapped: the size is never compared, so never scan for it
+            return
+        if self.total_bytes is None:
+            self.total_bytes = sum(size for _, size, _ in self.entries())
+        else:
+            self.total_bytes += len(payload)
+        if self.total_bytes > self.max_bytes:
+            self.trim()
+
+    def entries(self):
+        """(path, size, last use) of every entry on disk"""
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(ENTRY_SUFFIX):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, info.st_size, info.st_mtime
+
+    def trim(self):
+        """Evict least recently used entries until the cache is below its target size"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * TRIM_TARGET
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+        self.total_bytes = total
+
+    def clear(self):
+        for path, _, _ in list(self.entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.total_bytes = 0
+
+    def load_stats(self):
+        """Counters recorded so far, including ones not yet flushed"""
+        try:
+            with open(os.path.join(self.directory, STATS_FILE), 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            saved = {}
+        return CacheStats(saved.get("hits", 0) + self.stats.hits,
+                          saved.get("misses", 0) + self.stats.misses,
+                          saved.get("evictions", 0) + self.stats.evictions)
+
+    def record(self, stats):
+        """Add counters gathered elsewhere (e.g. in batch workers) to this cache's"""
+        self.stats.hits += stats.hits
+        self.stats.misses += stats.misses
+        self.stats.evictions += stats.evictions
+
+    def flush_stats(self):
+        """Add the in-memory counters to stats.json and reset them"""
+        if not self.stats.lookups and not self.stats.evictions:
+            return
+        totals = self.load_stats()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, STATS_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(totals.to_dict(), file)
+        os.replace(temp_path, path)
+        self.stats = CacheStats()
+
+    def format_stats(self):
+        stats = self.load_stats()
+        entries = list(self.entries())
+        size = sum(entry[1] for entry in entries)
+        return "\n".join([
+            f"Cache directory: {self.directory}",
+            f"Entries: {len(entries)} ({size / 1024:.0f} KB of {self.max_bytes / 1024:.0f} KB)",
+            f"Lookups: {stats.lookups} ({stats.hits} hits, {stats.misses} misses)",
+            f"Hit rate: {stats.hit_rate * 100:.1f}%",
+            f"Evictions: {stats.evictions}",
+        ])
@@ -0,0 +1,1731 @@
+"""Headless Python to Java conversion engine used by the Pyjama GUI and tools"""
+import ast
+import hashlib
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import GeneratorType
+
+from explanations import Explanation, ExplanationLog, Message
+from inference import (COMPREHENSIONS, NUMERIC_RANK, REDUCTIONS, CollectionAnalysis, SymbolTable, boxed,
+                       reduction_type)
+
+
+class ConversionCancelled(Exception):
+    """Raised when a caller asks a running conversion to stop"""
+
+
+class ConversionOptions:
+    """Plain options controlling how a conversion is assembled"""
+
+    def __init__(self, class_name="Main", add_imports=True, add_main=True, incremental=False,
+                 explain=True, infer_types=True, specialize_collections=False, package=None,
+                 comprehensions="streams"):
+        self.class_name = class_name
+        self.add_imports = add_imports
+        self.add_main = add_main
+        # Reuse converted top-level statements whose source did not change
+        self.incremental = incremental
+        # Record explanations; headless callers that never show them can skip it
+        self.explain = explain
+        # Run the scope-aware inference pass for variable, parameter and return types
+        self.infer_types = infer_types
+        # Emit primitive arrays and typed, pre-sized collections where the
+        # inferred element types allow it (needs infer_types)
+        self.specialize_collections = specialize_collections
+        # Java package the class is declared in; None for the default package
+        self.package = package
+        # How comprehensions are lowered: "streams" pipelines, or "loops"
+        # filling pre-sized collections wherever a statement can hold them
+        self.comprehensions = comprehensions
+
+
+class ConversionResult:
+    """Java source and explanations produced by a conversion"""
+
+    def __init__(self, java_code, explanations, ok=True, unsupported=None, timings=None):
+        self.java_code = java_code
+        self.explanations = explanations
+        self.ok = ok
+        self.unsupported = unsupported or {}
+        # Phase name -> milliseconds spent in it
+        self.timings = timings or {}
+
+    @property
+    def explanation(self):
+        """Explanations formatted as plain text"""
+        return self.explanations.format()
+
+    def __iter__(self):
+        return iter((self.java_code, self.explanation))
+
+
+class ConvertedModule:
+    """Statements of one module after the convert phase, before assembly"""
+
+    def __init__(self, main_body, static_methods, fields=None):
+        self.main_body = main_body
+        self.static_methods = static_methods
+        # Module constants that other classes of a project refer to
+        self.fields = fields if fields is not None else CodeEmitter(level=1)
+        self.explanations = ExplanationLog()
+
+
+class StatementFrame:
+    """A statement on the conversion stack, possibly waiting for a nested block"""
+    
+    __slots__ = ("node", "start", "steps", "block", "message")
+    
+    def __init__(self, node, start):
+        self.node = node
+        # First Java line written for the statement
+        self.start = start
+        # Suspended generator handler and the block it is waiting for
+        self.steps = None
+        self.block = None
+        self.message = None
+
+
+class CodeEmitter:
+    """Append-only Java line buffer that tracks the current indentation
+    
+    Every line is indented once, when it is written, so output is produced
+    in a single linear pass however deeply the source is nested.
+    """
+    
+    INDENT = "    "
+    
+    def __init__(self, level=0):
+        self.lines = []
+        self.level = level
+        self.prefixes = [self.INDENT * i for i in range(level + 1)]
+    
+    def line(self, text):
+        """Write a line (or a block of lines) at the current indentation"""
+        prefix = self.prefixes[self.level]
+        if "\n" not in text:
+            if text.strip():
+                self.lines.append(prefix + text)
+            return
+        self.lines.extend(prefix + part for part in text.splitlines() if part.strip())
+    
+    def extend(self, lines):
+        """Write lines that are already indented"""
+        self.lines.extend(lines)
+    
+    def indent(self):
+        self.level += 1
+        if self.level == len(self.prefixes):
+            self.prefixes.append(self.INDENT * self.level)
+    
+    def dedent(self):
+        self.level -= 1
+    
+    @contextmanager
+    def indented(self):
+        """Indent everything written inside the block by one level"""
+        self.indent()
+        try:
+            yield self
+        finally:
+            self.dedent()
+    
+    def getvalue(self):
+        return "\n".join(self.lines)
+
+
+# Operator tables shared by every conversion
+BINOP_SYMBOLS = {
+    ast.Add: "+", ast.Sub: "-", ast.Mult: "*",
+    ast.Div: "/", ast.Mod: "%", ast.Pow: "Math.pow",
+    ast.FloorDiv: "/"
+}
+COMPARE_SYMBOLS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<",
+    ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+    ast.In: ".contains", ast.NotIn: "!.contains"
+}
+AUGASSIGN_SYMBOLS = {ast.Add: "+=", ast.Sub: "-=", ast.Mult: "*=", ast.Div: "/="}
+
+# Fields of statements, handlers and match cases holding nested statements
+STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+# Nodes those fields can hold that have statements of their own; function
+# and class bodies are a separate scope and left out
+COMPOUND_STATEMENTS = tuple(
+    getattr(ast, name) for name in ("If", "For", "AsyncFor", "While", "With", "AsyncWith", "Try",
+                                    "TryStar", "Match", "ExceptHandler", "match_case")
+    if hasattr(ast, name)
+)
+
+# Nodes that cannot contain a Name
+LEAF_NODES = {ast.Constant, ast.Load, ast.Store, ast.Del, *ast.operator.__subclasses__(),
+              *ast.unaryop.__subclasses__(), *ast.cmpop.__subclasses__(), *ast.boolop.__subclasses__()}
+
+# Python format specs with a direct java.util.Formatter equivalent:
+# [<>][0][width][,][.precision][type]
+FORMAT_SPEC = re.compile(r"([<>]?)(0?)(\d*)(,?)(?:\.(\d+))?([deEfosxX]?)")
+# f-string conversions (!s, !r, !a) all become String.valueOf
+CONVERSION_STR, CONVERSION_REPR, CONVERSION_ASCII = ord("s"), ord("r"), ord("a")
+
+
+# Imports added in front of the class when add_imports is set
+JAVA_IMPORTS = ("import java.util.*;", "import java.io.*;", "import java.math.*;")
+# Added as well once any converted statement uses a stream pipeline
+STREAM_IMPORT = "import java.util.stream.*;"
+# Reserved words of Java, which cannot name a package, class or variable
+JAVA_KEYWORDS = frozenset("""
+    abstract assert boolean break byte case catch char class const continue default do
+    double else enum extends false final finally float for goto if implements import
+    instanceof int interface long native new null package private protected public
+    return short static strictfp super switch synchronized this throw throws transient
+    true try var void volatile while
+""".split())
+
+# Comprehension node -> Java type of what it builds
+COMPREHENSION_COLLECTIONS = {ast.ListComp: "ArrayList", ast.SetComp: "HashSet", ast.DictComp: "HashMap",
+                             ast.GeneratorExp: "Stream"}
+# Primitive stream element type -> the name used in IntStream, mapToInt, getAsInt...
+STREAM_NAMES = {"int": "Int", "long": "Long", "double": "Double"}
+# Initial value of a sum, by its Java type
+SUM_ZEROS = {"long": "0L", "double": "0.0"}
+
+# The parser builds the AST recursively; long generated chains such as
+# `a + b + ...` with thousands of terms need more than the default limit
+PARSE_RECURSION_LIMIT = 20000
+
+
+def parse_python(python_code):
+    """ast.parse with room for the deeply nested input the parser accepts"""
+    limit = sys.getrecursionlimit()
+    if limit >= PARSE_RECURSION_LIMIT:
+        return ast.parse(python_code)
+    sys.setrecursionlimit(PARSE_RECURSION_LIMIT)
+    try:
+        return ast.parse(python_code)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+class ParseCache:
+    """Parsed trees of the most recent buffers, shared by every tool
+    
+    Entries are keyed by a hash of the buffer, so a buffer is parsed once
+    and asking again returns the same tree, or raises the same
+    SyntaxError, until the text changes. The converter only reads trees,
+    so one tree can serve every tool. Used from the GUI thread and the
+    conversion worker at once; a buffer being parsed by one waits for the
+    other rather than parsing it twice.
+    """
+    
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        # Buffer digest -> (tree, None) or (None, SyntaxError), oldest first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def parse(self, python_code):
+        """Tree of python_code, parsing it only if this buffer is not cached"""
+        key = hashlib.sha1(python_code.encode("utf-8", "surrogatepass")).digest()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                try:
+                    entry = (parse_python(python_code), None)
+                except SyntaxError as e:
+                    entry = (None, e)
+                self.entries[key] = entry
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+        tree, error = entry
+        if error is not None:
+            raise error.with_traceback(None)
+        return tree
+
+
+def nested_statements(node):
+    """Statements directly inside node's blocks, in source order"""
+    return [child for field in STATEMENT_FIELDS for child in getattr(node, field, ())]
+
+
+def bound_names(scope):
+    """Names bound directly in a module or function body; comprehension variables are their own"""
+    names = set()
+    if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        names.update(arg.arg for arg in ast.walk(scope.args) if isinstance(arg, ast.arg))
+    pending = list(scope.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif not isinstance(node, (ast.Lambda, *COMPREHENSIONS)):
+            pending.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def int_literal(node):
+    """Value of an integer literal, negative ones included, or None"""
+    negative = isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+    if negative:
+        node = node.operand
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return -node.value if negative else node.value
+    return None
+
+
+def is_range_call(iterable):
+    """Whether iterable is `range(...)` with one to three positional arguments"""
+    return (isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name)
+            and iterable.func.id == "range" and 1 <= len(iterable.args) <= 3 and not iterable.keywords)
+
+
+def range_step(iterable):
+    """Step of a `range(...)` call (1 when omitted), None if not a range or its step is not a literal
+
+    Only a literal step tells whether the loop counts up or down, which
+    picks the comparison against the stop value.
+    """
+    if not is_range_call(iterable):
+        return None
+    if len(iterable.args) < 3:
+        return 1
+    # range() rejects a zero step
+    return int_literal(iterable.args[2]) or None
+
+
+# Python builtin name -> handler(engine, call_node, java_args) returning Java source
+BUILTIN_CALLS = {}
+
+
+def register_builtin(name):
+    """Decorator registering a Java translation for a Python builtin call
+    
+    Handlers added here apply to every engine created afterwards; pass
+    `builtins=` to PyjamaEngine to customise a single engine instead.
+    """
+    def decorator(func):
+        BUILTIN_CALLS[name] = func
+        return func
+    return decorator
+
+
+@register_builtin("print")
+def _print(engine, call_node, args):
+    return f"System.out.println({', '.join(args) if args else ''})"
+
+
+@register_builtin("len")
+def _len(engine, call_node, args):
+    if not args:
+        return "0"
+    info = engine.collection_info(call_node.args[0])
+    if info is not None and info.is_primitive_array():
+        return f"{args[0]}.length"
+    return f"{args[0]}.size()"
+
+
+@register_builtin("str")
+def _str(engine, call_node, args):
+    return f"String.valueOf({args[0]})" if args else '""'
+
+
+@register_builtin("int")
+def _int(engine, call_node, args):
+    return f"Integer.parseInt({args[0]})" if args else "0"
+
+
+@register_builtin("float")
+def _float(engine, call_node, args):
+    return f"Double.parseDouble({args[0]})" if args else "0.0"
+
+
+@register_builtin("abs")
+def _abs(engine, call_node, args):
+    return f"Math.abs({args[0]})" if args else "0"
+
+
+@register_builtin("max")
+def _max(engine, call_node, args):
+    return f"Math.max({', '.join(args)})" if len(args) >= 2 else args[0] if args else "0"
+
+
+@register_builtin("min")
+def _min(engine, call_node, args):
+    return f"Math.min({', '.join(args)})" if len(args) >= 2 else args[0] if args else "0"
+
+
+@register_builtin("range")
+def _range(engine, call_node, args):
+    return engine.handle_range(call_node.args)
+
+
+def build_dispatch(cls, prefix):
+    """Map AST node classes to the `<prefix><NodeName>` methods defined on cls"""
+    table = {}
+    for attr in dir(cls):
+        if attr.startswith(prefix):
+            node_class = getattr(ast, attr[len(prefix):], None)
+            if isinstance(node_class, type) and issubclass(node_class, ast.AST):
+                table[node_class] = getattr(cls, attr)
+    return table
+
+
+class PyjamaEngine:
+    """AST visitor translating Python modules into a Java class
+    
+    Statements are handled by `stmt_<Node>` methods and expressions by
+    `expr_<Node>` methods, looked up in per-class dispatch tables that are
+    built once when the class (or a subclass) is defined. Handlers of
+    nodes with nested statements or sub-expressions are generators that
+    yield them instead of converting them directly: a statement handler
+    yields each nested block and resumes once it has been written, and
+    an expression handler yields each child and is sent back its Java.
+    convert_node and expr_to_java drive them from an explicit stack, so
+    long elif chains and expressions with thousands of terms need no
+    Python recursion.
+    """
+    
+    STMT_HANDLERS = {}
+    EXPR_HANDLERS = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.STMT_HANDLERS = build_dispatch(cls, "stmt_")
+        cls.EXPR_HANDLERS = build_dispatch(cls, "expr_")
+    
+    def __init__(self, options=None, builtins=None, project=None, parse_cache=None):
+        self.options = options or ConversionOptions()
+        # ParseCache shared with the other tools looking at the same buffers
+        self.parse_cache = parse_cache
+        self.builtins = dict(BUILTIN_CALLS)
+        if builtins:
+            self.builtins.update(builtins)
+        # What the module's imports refer to when it is converted as part of
+        # a project (see project.ProjectContext), else None
+        self.project = project
+        self.unsupported = {}
+        # Statement fingerprint -> (java code, explanations, unsupported counts)
+        self.fragment_cache = {}
+        # Origins that explanation records of the current statement are relative to
+        self.java_base = 0
+        self.python_base = 0
+        # Inferred types of the module being converted, and the functions being walked
+        self.symbols = None
+        self.function_stack = []
+        # Specialised list and dict variables, when specialize_collections is on
+        self.collections = None
+        # String variable -> StringBuilder accumulating it in the enclosing loop
+        self.string_builders = {}
+        # Loop node -> {name: values added with `+=` anywhere in the loop}
+        self.loop_appends = {}
+        # Loop node -> {name: occurrences in the loop}, for names it appends to
+        self.loop_uses = {}
+        # Imports beyond JAVA_IMPORTS that the converted statements need
+        self.extra_imports = set()
+        # Scope (FunctionDef or None) -> names its Java locals use, filled as scopes are reached
+        self.local_names = {}
+        self.module_names = ()
+        # Comprehension variable -> its Java name, for the comprehensions being converted
+        self.comprehension_names = {}
+        # First for clause of each of those comprehensions -> the names in effect around it
+        self.enclosing_names = {}
+    
+    def note_unsupported(self, kind):
+        """Count an AST node type the converter could not translate"""
+        self.unsupported[kind] = self.unsupported.get(kind, 0) + 1
+    
+    def merge_unsupported(self, counts):
+        """Add a batch of unsupported-node counts to the running totals"""
+        for kind, count in counts.items():
+            self.unsupported[kind] = self.unsupported.get(kind, 0) + count
+    
+    def source_lines(self, python_code):
+        """Split source on the same line breaks the Python tokenizer uses"""
+        return python_code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    
+    def fingerprint(self, lines, node, level):
+        """Identify a top-level statement by its source text and position on its lines"""
+        # Column offsets are in UTF-8 bytes, so keep whole lines plus the offsets
+        segment = "\n".join(lines[node.lineno - 1:node.end_lineno])
+        # Converted code also depends on the signatures and module-level types
+        symbols = self.symbols.digest() if self.symbols is not None else None
+        collections = self.collections.digest() if self.collections is not None else None
+        return (level, node.col_offset, node.end_col_offset, self.options.explain,
+                self.options.comprehensions, symbols, collections, self.module_names, segment)
+    
+    def convert_top_level(self, node, out, section, log, lines, fresh_cache):
+        """Convert a top-level statement, reusing the cached fragment when unchanged
+        
+        Its explanation records are added to `log` as one group, relative to
+        the statement's first Java line in `section` and its Python line.
+        """
+        java_base = len(out.lines)
+        self.python_base = node.lineno - 1
+        if not self.options.incremental:
+            records = [] if self.options.explain else None
+            self.java_base = java_base
+            self.convert_node(node, out, records)
+            log.add_group(section, java_base, self.python_base, records)
+            return
+        
+        key = self.fingerprint(lines, node, out.level)
+        cached = self.fragment_cache.get(key)
+        if cached is None:
+            outer_counts, self.unsupported = self.unsupported, {}
+            outer_imports, self.extra_imports = self.extra_imports, set()
+            fragment = CodeEmitter(out.level)
+            records = [] if self.options.explain else None
+            self.java_base = 0
+            self.convert_node(node, fragment, records)
+            cached = (fragment.lines, records, self.unsupported, self.extra_imports)
+            self.unsupported = outer_counts
+            self.extra_imports = outer_imports
+        fresh_cache[key] = cached
+        self.merge_unsupported(cached[2])
+        self.extra_imports.update(cached[3])
+        out.extend(cached[0])
+        log.add_group(section, java_base, self.python_base, cached[1])
+    
+    def infer_type_and_reason(self, value_node):
+        """Enhanced type inference with better reasoning"""
+        if isinstance(value_node, ast.Constant):
+            value = value_node.value
+            if isinstance(value, bool):
+                return "boolean", Message("Boolean literal `{}` → `boolean`", value)
+            elif isinstance(value, int):
+                if -2147483648 <= value <= 2147483647:
+                    return "int", Message("Integer literal `{}` fits in int range → `int`", value)
+                else:
+                    return "long", Message("Integer literal `{}` requires long → `long`", value)
+            elif isinstance(value, float):
+                return "double", Message("Float literal `{}` → `double`", value)
+            elif isinstance(value, str):
+                return "String", Message("String literal → `String`")
+            elif value is None:
+                return "Object", Message("`None` → `null`, using `Object` type")
+        elif isinstance(value_node, ast.List):
+            return "ArrayList<Object>", Message("List literal → `ArrayList<Object>`")
+        elif isinstance(value_node, ast.Dict):
+            return "HashMap<Object, Object>", Message("Dictionary literal → `HashMap<Object, Object>`")
+        elif isinstance(value_node, ast.BinOp):
+            return "Object", Message("Binary operation result → `Object` (type depends on operands)")
+        elif isinstance(value_node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            java_type = self.comprehension_java_type(value_node)
+            return java_type, Message("Comprehension → `{}`", java_type)
+        
+        return "Object", Message("Complex expression → defaulting to `Object`")
+    
+    def expr_to_java(self, expr):
+        """Java source of an expression, converted without recursion"""
+        handlers = self.EXPR_HANDLERS
+        handler = handlers.get(type(expr))
+        value = handler(self, expr) if handler is not None else self.unsupported_expr(expr)
+        if type(value) is not GeneratorType:
+            return value
+        # Generator handlers waiting for the Java of the child they yielded
+        waiting = [value]
+        value = None
+        while True:
+            try:
+                child = waiting[-1].send(value)
+            except StopIteration as done:
+                waiting.pop()
+                value = done.value
+                if not waiting:
+                    return value
+                continue
+            handler = handlers.get(type(child))
+            value = handler(self, child) if handler is not None else self.unsupported_expr(child)
+            if type(value) is GeneratorType:
+                waiting.append(value)
+                value = None
+    
+    def unsupported_expr(self, expr):
+        self.note_unsupported(type(expr).__name__)
+        try:
+            dump = ast.dump(expr)
+        except RecursionError:
+            # ast.dump recurses; a deeply nested node is only named
+            dump = type(expr).__name__
+        return f"/* Unsupported expression: {dump} */"
+    
+    def expr_Constant(self, expr):
+        value = expr.value
+        if isinstance(value, str):
+            return f'"{value}"'
+        elif isinstance(value, bool):
+            return "true" if value else "false"
+        elif value is None:
+            return "null"
+        else:
+            return str(value)
+    
+    def expr_Name(self, expr):
+        renamed = self.comprehension_names.get(expr.id)
+        if renamed is not None:
+            return renamed
+        if self.project is not None:
+            symbol = self.project.resolve(expr)
+            if symbol is not None and symbol.kind == "constant":
+                return symbol.java
+        return expr.id
+    
+    def expr_Attribute(self, expr):
+        # Only constants of other project modules have a Java equivalent
+        symbol = self.project.resolve(expr) if self.project is not None else None
+        if symbol is not None and symbol.kind == "constant":
+            return symbol.java
+        return self.unsupported_expr(expr)
+    
+    def expr_BinOp(self, expr):
+        # A left-nested chain such as `a + b + c` is joined once instead of
+        # copying the growing left operand into every enclosing level
+        chain = []
+        while type(expr) is ast.BinOp:
+            chain.append(expr)
+            expr = expr.left
+        prefix = "".join("Math.pow(" if isinstance(node.op, ast.Pow) else "(" for node in chain)
+        pieces = [prefix, (yield expr)]
+        for node in reversed(chain):
+            right = yield node.right
+            if isinstance(node.op, ast.Pow):
+                pieces.append(f", {right})")
+            else:
+                pieces.append(f" {BINOP_SYMBOLS.get(type(node.op), '?')} {right})")
+        return "".join(pieces)
+    
+    def expr_Compare(self, expr):
+        left = yield expr.left
+        right = yield expr.comparators[0]
+        op = COMPARE_SYMBOLS.get(type(expr.ops[0]), "==")
+        if op in (".contains", "!.contains"):
+            contains = "!" if op.startswith("!") else ""
+            return f"{contains}{right}.contains({left})"
+        return f"{left} {op} {right}"
+    
+    def expr_Call(self, expr):
+        return self.call_to_java(expr)
+    
+    def expr_List(self, expr):
+        elements = []
+        for element in expr.elts:
+            elements.append((yield element))
+        return f"Arrays.asList({', '.join(elements)})"
+    
+    def expr_JoinedStr(self, expr):
+        pieces = self.joined_str_pieces(expr)
+        if not pieces:
+            return '""'
+        first = expr.values[0]
+        is_text = (not isinstance(first, ast.FormattedValue) or first.format_spec is not None
+                   or first.conversion != -1)
+        if not is_text and (len(pieces) == 1 or not isinstance(expr.values[1], ast.Constant)):
+            # Make sure `+` concatenates instead of adding numbers
+            pieces[0] = f"String.valueOf({pieces[0]})"
+        if len(pieces) == 1:
+            return pieces[0]
+        return f"({' + '.join(pieces)})"
+    
+    def expr_FormattedValue(self, expr):
+        value = yield expr.value
+        if isinstance(expr.value, (ast.Compare, ast.BoolOp, ast.IfExp, ast.UnaryOp)):
+            value = f"({value})"
+        if expr.format_spec is not None:
+            pattern = self.java_format_pattern(expr.format_spec)
+            if pattern is not None:
+                return f'String.format("{pattern}", {value})'
+            self.note_unsupported("FormatSpec")
+            return f"String.valueOf({value})"
+        if expr.conversion in (CONVERSION_STR, CONVERSION_REPR, CONVERSION_ASCII):
+            return f"String.valueOf({value})"
+        return value
+    
+    def joined_str_pieces(self, expr):
+        """Java operands of an f-string, literal parts and values in order"""
+        return [self.expr_to_java(value) for value in expr.values]
+    
+    def java_format_pattern(self, format_spec):
+        """java.util.Formatter pattern for a constant f-string format spec, or None"""
+        if len(format_spec.values) != 1 or not isinstance(format_spec.values[0], ast.Constant):
+            return None
+        match = FORMAT_SPEC.fullmatch(format_spec.values[0].value)
+        if match is None:
+            return None
+        align, zero, width, grouping, precision, kind = match.groups()
+        if precision and kind not in ("e", "E", "f"):
+            return None
+        if grouping and kind not in ("d", "f"):
+            return None
+        if zero and not (width and kind and kind in "deEfoxX"):
+            return None
+        flags = ("-" if align == "<" and width else "") + zero + grouping
+        return f"%{flags}{width}{'.' + precision if precision else ''}{kind or 's'}"
+    
+    def expr_Subscript(self, expr):
+        # `x[i][j]...` chains are joined once, like BinOp chains
+        chain = []
+        while type(expr) is ast.Subscript:
+            chain.append(expr)
+            expr = expr.value
+        pieces = [(yield expr)]
+        for node in reversed(chain):
+            slice_value = yield node.slice
+            info = self.collection_info(node.value)
+            if info is not None and info.is_primitive_array():
+                pieces.append(f"[{slice_value}]")
+            else:
+                pieces.append(f".get({slice_value})")
+        return "".join(pieces)
+    
+    def collection_info(self, expr):
+        """Specialisation details of a list or dict variable, or None"""
+        if self.collections is None or not isinstance(expr, ast.Name):
+            return None
+        function = self.function_stack[-1] if self.function_stack else None
+        info = self.collections.lookup(function, expr.id)
+        if info is None or info.java_type() is None:
+            return None
+        return info
+    
+    def call_to_java(self, call_node):
+        """Convert function calls to Java, using the builtin registry when it applies"""
+        symbol = self.project.resolve(call_node.func) if self.project is not None else None
+        if symbol is not None and symbol.kind == "function":
+            args = [self.expr_to_java(arg) for arg in call_node.args]
+            return f"{symbol.java}({', '.join(args)})"
+        
+        if isinstance(call_node.func, ast.Name):
+            func_name = call_node.func.id
+            comprehension = self.reduction_argument(call_node)
+            if comprehension is not None:
+                return self.stream_reduction(func_name, comprehension)
+            args = [self.expr_to_java(arg) for arg in call_node.args]
+            builtin = self.builtins.get(func_name)
+            if builtin is not None:
+                return builtin(self, call_node, args)
+            return f"{func_name}({', '.join(args)})"
+        
+        func = call_node.func
+        info = self.collection_info(func.value) if isinstance(func, ast.Attribute) else None
+        if info is not None and info.kind == "list" and func.attr == "append" and len(call_node.args) == 1:
+            return f"{func.value.id}.add({self.expr_to_java(call_node.args[0])})"
+        
+        self.note_unsupported("Call")
+        return "/* Unsupported function call */"
+    
+    def handle_range(self, args):
+        """Handle Python range() function"""
+        if len(args) == 1:
+            return f"0; i < {self.expr_to_java(args[0])}; i++"
+        elif len(args) == 2:
+            return f"{self.expr_to_java(args[0])}; i < {self.expr_to_java(args[1])}; i++"
+        elif len(args) == 3:
+            start = self.expr_to_java(args[0])
+            end = self.expr_to_java(args[1])
+            step = self.expr_to_java(args[2])
+            return f"{start}; i < {end}; i += {step}"
+        return "0; i < 10; i++"
+    
+    def expr_ListComp(self, expr):
+        if not self.comprehension_supported(expr):
+            return self.unsupported_expr(expr)
+        with self.comprehension_scope(expr):
+            stream = self.comprehension_stream(expr, self.expr_to_java(expr.elt))
+        return f"{stream}.collect(Collectors.toCollection(ArrayList::new))"
+    
+    def expr_SetComp(self, expr):
+        if not self.comprehension_supported(expr):
+            return self.unsupported_expr(expr)
+        with self.comprehension_scope(expr):
+            stream = self.comprehension_stream(expr, self.expr_to_java(expr.elt))
+        return f"{stream}.collect(Collectors.toCollection(HashSet::new))"
+    
+    def expr_DictComp(self, expr):
+        if not self.comprehension_supported(expr):
+            return self.unsupported_expr(expr)
+        with self.comprehension_scope(expr):
+            key, value = self.expr_to_java(expr.key), self.expr_to_java(expr.value)
+            if len(expr.generators) == 1:
+                var = self.comprehension_variable(expr.generators[0])
+                stream = self.comprehension_stream(expr, var)
+                return (f"{stream}.collect(Collectors.toMap({var} -> {key}, {var} -> {value}, "
+                        f"(first, second) -> second, HashMap::new))")
+            # Entries carry the key and value out of the nested lambdas
+            stream = self.comprehension_stream(expr, f"Map.entry({key}, {value})")
+        return (f"{stream}.collect(Collectors.toMap(Map.Entry::getKey, Map.Entry::getValue, "
+                f"(first, second) -> second, HashMap::new))")
+    
+    def expr_GeneratorExp(self, expr):
+        # Streams are lazy like generators, so the pipeline itself is the value
+        if not self.comprehension_supported(expr):
+            return self.unsupported_expr(expr)
+        with self.comprehension_scope(expr):
+            return self.comprehension_stream(expr, self.expr_to_java(expr.elt))
+    
+    @contextmanager
+    def comprehension_scope(self, expr):
+        """Give expr's loop variables Java names no local or enclosing comprehension variable uses
+        
+        Python comprehensions have a scope of their own, but a Java lambda
+        parameter or loop variable may not redeclare a local in scope.
+        """
+        outer = self.comprehension_names
+        first = expr.generators[0]
+        self.enclosing_names[first] = outer
+        self.comprehension_names = dict(outer)
+        try:
+            for generator in expr.generators:
+                name = generator.target.id
+                self.comprehension_names[name] = self.temporary_name(name)
+            yield
+        finally:
+            self.comprehension_names = outer
+            del self.enclosing_names[first]
+    
+    @contextmanager
+    def outside_comprehension(self, generator):
+        """Convert a for clause's iterable; the first clause's is evaluated around its comprehension"""
+        outer = self.enclosing_names.get(generator)
+        if outer is None:
+            yield
+            return
+        inner, self.comprehension_names = self.comprehension_names, outer
+        try:
+            yield
+        finally:
+            self.comprehension_names = inner
+    
+    def comprehension_variable(self, generator):
+        """Java name of a for clause's variable"""
+        name = generator.target.id
+        return self.comprehension_names.get(name, name)
+    
+    def comprehension_supported(self, expr):
+        """Whether every for clause of a comprehension binds a single name to a convertible iterable
+        
+        A range() with a step that is not a literal is left unconverted:
+        whether it counts up or down is only known at run time.
+        """
+        return all(isinstance(generator.target, ast.Name) and not generator.is_async
+                   and (range_step(generator.iter) is not None or not is_range_call(generator.iter))
+                   for generator in expr.generators)
+    
+    def comprehension_element_type(self, expr):
+        """Inferred type of a comprehension's elements ((key, value) for a dict), or None"""
+        return self.symbols.element_types.get(expr) if self.symbols is not None else None
+    
+    def comprehension_java_type(self, expr):
+        """Java type of the collection or stream a comprehension builds"""
+        element = self.comprehension_element_type(expr)
+        if isinstance(expr, ast.DictComp):
+            key, value = element or (None, None)
+            return f"HashMap<{boxed(key)}, {boxed(value)}>"
+        return f"{COMPREHENSION_COLLECTIONS[type(expr)]}<{boxed(element)}>"
+    
+    def loop_variable_type(self, expr, generator):
+        """Java type of a for clause's variable inside a comprehension"""
+        info = self.collection_info(generator.iter)
+        if info is not None and info.kind == "list":
+            return info.element_type
+        scope = self.symbols.comprehensions.get(expr) if self.symbols is not None else None
+        return (scope.lookup(generator.target.id) if scope is not None else None) or "Object"
+    
+    def variable_java_type(self, expr):
+        """Inferred Java type of a Name expression, or None"""
+        if self.symbols is None or not isinstance(expr, ast.Name):
+            return None
+        scope = self.function_stack[-1] if self.function_stack else None
+        return self.symbols.variable_type(scope, expr.id)
+    
+    def is_dict(self, expr):
+        info = self.collection_info(expr)
+        if info is not None:
+            return info.kind == "dict"
+        java_type = self.variable_java_type(expr)
+        return java_type is not None and java_type.startswith("HashMap<")
+    
+    def range_bounds(self, iterable):
+        """Java (start, stop) and int step of a `range(...)` call with a literal step, else None"""
+        step = range_step(iterable)
+        if step is None:
+            return None
+        bounds = [self.range_argument(arg) for arg in iterable.args[:2]]
+        if len(bounds) == 1:
+            bounds.insert(0, "0")
+        return bounds[0], bounds[1], step
+    
+    def range_argument(self, arg):
+        value = int_literal(arg)
+        return str(value) if value is not None else self.expr_to_java(arg)
+    
+    def stream_source(self, generator):
+        """Java stream over a for clause's iterable, and the primitive type of its items or None"""
+        var = self.comprehension_variable(generator)
+        with self.outside_comprehension(generator):
+            return self.iterable_stream(generator, var)
+    
+    def iterable_stream(self, generator, var):
+        bounds = self.range_bounds(generator.iter)
+        if bounds is not None:
+            start, stop, step = bounds
+            if step == 1:
+                return f"IntStream.range({start}, {stop})", "int"
+            order, sign = ("<", "+") if step > 0 else (">", "-")
+            return (f"IntStream.iterate({start}, {var} -> {var} {order} {stop}, {var} -> {var} {sign} {abs(step)})",
+                    "int")
+        iterable = self.expr_to_java(generator.iter)
+        info = self.collection_info(generator.iter)
+        if info is not None and info.is_primitive_array() and info.element_type in STREAM_NAMES:
+            return f"Arrays.stream({iterable})", info.element_type
+        if self.is_dict(generator.iter):
+            return f"{iterable}.keySet().stream()", None
+        return f"{iterable}.stream()", None
+    
+    def comprehension_stream(self, expr, element, target=None):
+        """Stream pipeline producing the elements of a comprehension
+        
+        element is the Java of one element in terms of the loop variables.
+        The pipeline is an IntStream, LongStream or DoubleStream when target
+        names that primitive type, else a Stream of objects. Each `if`
+        becomes a filter and each further `for` a flatMap.
+        """
+        self.extra_imports.add(STREAM_IMPORT)
+        pipeline = None
+        for generator in reversed(expr.generators):
+            var = self.comprehension_variable(generator)
+            source, kind = self.stream_source(generator)
+            stages = [source]
+            for condition in generator.ifs:
+                stages.append(f".filter({var} -> {self.expr_to_java(condition)})")
+            if pipeline is None:
+                stages.append(self.map_stage(var, element, kind, target))
+            else:
+                if kind is not None and kind != target:
+                    stages.append(".boxed()")
+                    kind = None
+                method = "flatMap" if kind == target else f"flatMapTo{STREAM_NAMES[target]}"
+                stages.append(f".{method}({var} -> {pipeline})")
+            pipeline = "".join(stages)
+        return pipeline
+    
+    def map_stage(self, var, element, kind, target):
+        """Stream stage turning items of primitive type kind (None: objects) into elements of target"""
+        identity = element == var
+        if kind == target:
+            return "" if identity else f".map({var} -> {element})"
+        if target is None:
+            return ".boxed()" if identity else f".mapToObj({var} -> {element})"
+        if identity and kind is not None and NUMERIC_RANK[kind] < NUMERIC_RANK[target]:
+            return f".as{STREAM_NAMES[target]}Stream()"
+        return f".mapTo{STREAM_NAMES[target]}({var} -> {element})"
+    
+    def reduction_argument(self, call_node):
+        """Comprehension that is the only argument of a REDUCTIONS builtin call, or None"""
+        func = call_node.func
+        if (not isinstance(func, ast.Name) or func.id not in REDUCTIONS or call_node.keywords
+                or len(call_node.args) != 1):
+            return None
+        if self.symbols is not None and func.id in self.symbols.functions:
+            return None
+        argument = call_node.args[0]
+        if (isinstance(argument, (ast.GeneratorExp, ast.ListComp, ast.SetComp))
+                and self.comprehension_supported(argument)):
+            return argument
+        return None
+    
+    def stream_reduction(self, name, expr):
+        """`sum`, `any`, `all`, `min` or `max` of a comprehension as one stream pass"""
+        with self.comprehension_scope(expr):
+            return self.scoped_stream_reduction(name, expr)
+    
+    def scoped_stream_reduction(self, name, expr):
+        if name in ("any", "all"):
+            # Nested for clauses test the inner stream from the outer lambda,
+            # so the first deciding element ends every level
+            match = "anyMatch" if name == "any" else "allMatch"
+            self.extra_imports.add(STREAM_IMPORT)
+            predicate = self.expr_to_java(expr.elt)
+            for generator in reversed(expr.generators):
+                var = self.comprehension_variable(generator)
+                source, _ = self.stream_source(generator)
+                filters = "".join(f".filter({var} -> {self.expr_to_java(condition)})"
+                                  for condition in generator.ifs)
+                predicate = f"{source}{filters}.{match}({var} -> {predicate})"
+            return predicate
+        java_type = reduction_type(name, self.comprehension_element_type(expr))
+        target = java_type if java_type in STREAM_NAMES else None
+        stream = self.comprehension_stream(expr, self.expr_to_java(expr.elt), target)
+        if name == "sum":
+            return f"{stream}.sum()"
+        if target is None:
+            return f"{stream}.{name}(Comparator.naturalOrder()).get()"
+        return f"{stream}.{name}().getAs{STREAM_NAMES[target]}()"
+    
+    def lower_comprehension(self, name, value, out):
+        """Build a comprehension, or a reduction fused with one, into `name` with plain loops
+        
+        Returns the explanation Message, or None when value is neither or
+        its loops cannot be written as statements, which leaves it to the
+        stream form.
+        """
+        reduction = None
+        comprehension = value
+        if isinstance(value, ast.Call):
+            comprehension = self.reduction_argument(value)
+            if comprehension is None:
+                return None
+            reduction = value.func.id
+        elif not isinstance(value, (ast.ListComp, ast.SetComp, ast.DictComp)):
+            return None
+        if not self.loopable(comprehension, name):
+            return None
+        with self.comprehension_scope(comprehension):
+            if reduction is None:
+                return self.collect_in_loop(name, comprehension, out)
+            return self.reduce_in_loop(name, reduction, comprehension, out)
+    
+    def loopable(self, expr, name):
+        """Whether a comprehension can become loops declaring `name` before them
+        
+        range() bounds are evaluated once by Python but on every iteration by
+        a Java for loop, so they must be plain names or constants.
+        """
+        if not self.comprehension_supported(expr):
+            return False
+        for node in ast.walk(expr):
+            if isinstance(node, ast.Name) and node.id == name:
+                return False
+        for generator in expr.generators:
+            if range_step(generator.iter) is not None and not all(
+                    isinstance(arg, (ast.Name, ast.Constant)) or int_literal(arg) is not None
+                    for arg in generator.iter.args):
+                return False
+        return True
+    
+    def comprehension_size(self, expr):
+        """Java expression for the number of elements of an unfiltered single-clause comprehension"""
+        if len(expr.generators) != 1 or expr.generators[0].ifs:
+            return None
+        iterable = expr.generators[0].iter
+        bounds = self.range_bounds(iterable)
+        if bounds is not None:
+            start, stop, step = bounds
+            if step != 1:
+                return None
+            return stop if start == "0" else f"Math.max(0, {stop} - {start})"
+        info = self.collection_info(iterable)
+        if info is not None and info.is_primitive_array():
+            return f"{iterable.id}.length"
+        java_type = self.variable_java_type(iterable)
+        if info is not None or (java_type is not None and java_type.startswith(("ArrayList<", "HashSet<",
+                                                                                "HashMap<"))):
+            return f"{iterable.id}.size()"
+        return None
+    
+    def open_comprehension_loops(self, expr, out, label=None):
+        """Write a comprehension's for clauses and filters as nested blocks; returns how many were opened"""
+        opened = 0
+        for generator in expr.generators:
+            var = self.comprehension_variable(generator)
+            with self.outside_comprehension(generator):
+                bounds = self.range_bounds(generator.iter)
+                iterable = self.expr_to_java(generator.iter) if bounds is None else None
+            if bounds is not None:
+                start, stop, step = bounds
+                if step == 1:
+                    update = f"{var}++"
+                elif step == -1:
+                    update = f"{var}--"
+                else:
+                    update = f"{var} {'+' if step > 0 else '-'}= {abs(step)}"
+                header = f"for (int {var} = {start}; {var} {'<' if step > 0 else '>'} {stop}; {update})"
+            else:
+                if self.is_dict(generator.iter):
+                    iterable += ".keySet()"
+                header = f"for ({self.loop_variable_type(expr, generator)} {var} : {iterable})"
+            if label is not None and not opened:
+                header = f"{label}: {header}"
+            out.line(f"{header} {{")
+            out.indent()
+            opened += 1
+            if generator.ifs:
+                conditions = [self.expr_to_java(condition) for condition in generator.ifs]
+                if len(conditions) > 1:
+                    conditions = [f"({condition})" for condition in conditions]
+                out.line(f"if ({' && '.join(conditions)}) {{")
+                out.indent()
+                opened += 1
+        return opened
+    
+    def close_blocks(self, out, count):
+        for _ in range(count):
+            out.dedent()
+            out.line("}")
+    
+    def collect_in_loop(self, name, expr, out):
+        java_type = self.comprehension_java_type(expr)
+        collection = COMPREHENSION_COLLECTIONS[type(expr)]
+        size = self.comprehension_size(expr)
+        capacity = size or ""
+        if size is not None and collection != "ArrayList":
+            # Room for every element without rehashing at the default load factor
+            capacity = f"{size} * 4 / 3 + 1"
+        out.line(f"{java_type} {name} = new {collection}<>({capacity});")
+        opened = self.open_comprehension_loops(expr, out)
+        if isinstance(expr, ast.DictComp):
+            out.line(f"{name}.put({self.expr_to_java(expr.key)}, {self.expr_to_java(expr.value)});")
+        else:
+            out.line(f"{name}.add({self.expr_to_java(expr.elt)});")
+        self.close_blocks(out, opened)
+        if size is None:
+            return Message("Comprehension: `{}` → `{}` filled by a loop", name, java_type)
+        return Message("Comprehension: `{}` → `{}` filled by a loop, pre-sized for `{}` elements",
+                       name, java_type, size)
+    
+    def reduce_in_loop(self, name, reduction, expr, out):
+        java_type = reduction_type(reduction, self.comprehension_element_type(expr))
+        if reduction == "sum":
+            out.line(f"{java_type} {name} = {SUM_ZEROS.get(java_type, '0')};")
+            opened = self.open_comprehension_loops(expr, out)
+            out.line(f"{name} += {self.expr_to_java(expr.elt)};")
+            self.close_blocks(out, opened)
+            return Message("`sum()` of a comprehension: one loop adding into `{}`", name)
+        
+        # `break` has to leave every loop of the comprehension
+        label = f"{name}Search" if len(expr.generators) > 1 else None
+        leave = f"break {label};" if label else "break;"
+        if reduction in ("any", "all"):
+            found = reduction == "any"
+            out.line(f"boolean {name} = {'false' if found else 'true'};")
+            opened = self.open_comprehension_loops(expr, out, label)
+            element = self.expr_to_java(expr.elt)
+            out.line(f"if ({element if found else f'!({element})'}) {{")
+            with out.indented():
+                out.line(f"{name} = {'true' if found else 'false'};")
+                out.line(leave)
+            out.line("}")
+            self.close_blocks(out, opened)
+            return Message("`{}()` of a comprehension: one loop stopping at the first {} element",
+                           reduction, "true" if found else "false")
+        
+        # min() and max() raise on no elements, so track whether one was seen
+        seen = f"{name}Seen"
+        initial = SUM_ZEROS.get(java_type, "0") if java_type in NUMERIC_RANK else "null"
+        out.line(f"{java_type} {name} = {initial};")
+        out.line(f"boolean {seen} = false;")
+        opened = self.open_comprehension_loops(expr, out)
+        item = self.expr_to_java(expr.elt)
+        if not isinstance(expr.elt, ast.Name):
+            out.line(f"{java_type} {name}Item = {item};")
+            item = f"{name}Item"
+        order = "<" if reduction == "min" else ">"
+        if java_type in NUMERIC_RANK:
+            better = f"{item} {order} {name}"
+        else:
+            better = f"{item}.compareTo({name}) {order} 0"
+        out.line(f"if (!{seen} || {better}) {{")
+        with out.indented():
+            out.line(f"{name} = {item};")
+            out.line(f"{seen} = true;")
+        out.line("}")
+        self.close_blocks(out, opened)
+        out.line(f"if (!{seen}) {{")
+        with out.indented():
+            out.line(f'throw new NoSuchElementException("{reduction}() arg is an empty sequence");')
+        out.line("}")
+        return Message("`{}()` of a comprehension: one loop keeping the {} element in `{}`",
+                       reduction, "smallest" if reduction == "min" else "largest", name)
+    
+    def temporary_name(self, base):
+        """Name for a generated local that no variable of the current scope uses"""
+        name, suffix = base, 2
+        while self.name_taken(name):
+            name, suffix = f"{base}{suffix}", suffix + 1
+        return name
+    
+    def name_taken(self, name):
+        """Whether a local or comprehension variable in scope here already has this Java name"""
+        if name in self.comprehension_names.values():
+            return True
+        scope = self.function_stack[-1] if self.function_stack else None
+        names = self.local_names.get(scope)
+        if names is None:
+            names = self.local_names[scope] = bound_names(scope)
+        if name in names:
+            return True
+        return self.symbols is not None and self.symbols.variable_type(scope, name) is not None
+    
+    def convert_node(self, node, out, explanations):
+        """Enhanced node conversion with better error handling
+        
+        Java lines are appended to the shared emitter `out` at its current
+        indentation. Each stmt_<Node> handler returns a Message describing
+        the conversion, which is recorded in `explanations` together with
+        the node's Python line and Java line range. Pass None to skip
+        recording explanations. Nested blocks are converted from an
+        explicit stack of statements, innermost last.
+        """
+        stack = [self.open_statement(node, out, explanations)]
+        while stack:
+            frame = stack[-1]
+            if frame.block is not None:
+                child = next(frame.block, None)
+                if child is not None:
+                    stack.append(self.open_statement(child, out, explanations))
+                    continue
+                out.dedent()
+                self.resume_statement(frame, out)
+                if frame.block is not None:
+                    continue
+            stack.pop()
+            self.record_explanation(frame.node, frame.start, out, explanations, frame.message)
+    
+    def open_statement(self, node, out, explanations):
+        """Start converting a statement, up to the first nested block its handler yields"""
+        frame = StatementFrame(node, len(out.lines))
+        try:
+            handler = self.STMT_HANDLERS.get(type(node))
+            if handler is None:
+                frame.message = self.unsupported_stmt(node, out, explanations)
+            else:
+                frame.message = handler(self, node, out, explanations)
+        except Exception as e:
+            frame.message = self.statement_error(node, out, e)
+            return frame
+        if type(frame.message) is GeneratorType:
+            frame.steps, frame.message = frame.message, None
+            self.resume_statement(frame, out)
+        return frame
+    
+    def resume_statement(self, frame, out):
+        """Run a generator handler until it yields its next block or returns its Message"""
+        frame.block = None
+        try:
+            block = next(frame.steps)
+        except StopIteration as done:
+            frame.message = done.value
+        except Exception as e:
+            frame.message = self.statement_error(frame.node, out, e)
+        else:
+            out.indent()
+            frame.block = iter(block)
+    
+    def statement_error(self, node, out, error):
+        out.line(f"/* Error converting {type(node).__name__}: {str(error)} */")
+        return Message("Error processing {}: {}", type(node).__name__, str(error))
+    
+    def record_explanation(self, node, start, out, explanations, message):
+        """Record the Java lines written since `start` as the conversion of node"""
+        if explanations is not None:
+            explanations.append(Explanation(
+                type(node).__name__, node.lineno - self.python_base,
+                start - self.java_base, len(out.lines) - self.java_base, message
+            ))
+    
+    def unsupported_stmt(self, node, out, explanations):
+        self.note_unsupported(type(node).__name__)
+        out.line(f"/* Unsupported: {type(node).__name__} */")
+        return Message("Unsupported AST node: {}", type(node).__name__)
+    
+    def stmt_Assign(self, node, out, explanations):
+        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Subscript):
+            info = self.collection_info(node.targets[0].value)
+            if info is not None:
+                return self.assign_item(node.targets[0], node.value, info, out)
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            return self.unsupported_stmt(node, out, explanations)
+        var_name = node.targets[0].id
+        field_type = self.constant_field(node)
+        if field_type is not None:
+            out.line(f"public static final {field_type} {var_name} = {self.expr_to_java(node.value)};")
+            return Message("Module constant: `{}` → `public static final {}` field", var_name, field_type)
+        info = self.collection_info(node.targets[0])
+        if info is not None and isinstance(node.value, (ast.List, ast.Dict)):
+            return self.assign_collection(var_name, node.value, info, out)
+        if self.options.comprehensions == "loops":
+            message = self.lower_comprehension(var_name, node.value, out)
+            if message is not None:
+                return message
+        java_type, reason = self.infer_type_and_reason(node.value)
+        if self.symbols is not None:
+            scope = self.function_stack[-1] if self.function_stack else None
+            scoped_type = self.symbols.variable_type(scope, var_name)
+            if scoped_type is not None and scoped_type != java_type:
+                java_type = scoped_type
+                reason = Message("inferred from every assignment in its scope → `{}`", scoped_type)
+        value = self.expr_to_java(node.value)
+        out.line(f"{java_type} {var_name} = {value};")
+        return Message("Variable assignment: `{}` → {}", var_name, reason)
+    
+    def constant_field(self, node):
+        """Java type of the project constant a top-level assignment defines, or None"""
+        if self.project is None or self.function_stack or not isinstance(node, ast.Assign):
+            return None
+        target = node.targets[0]
+        if len(node.targets) != 1 or not isinstance(target, ast.Name):
+            return None
+        return self.project.constants.get(target.id)
+    
+    def stmt_Import(self, node, out, explanations):
+        if self.project is None or not self.project.is_project_import(node):
+            return self.unsupported_stmt(node, out, explanations)
+        names = ", ".join(alias.name for alias in node.names)
+        return Message("Import of project module `{}` → its classes are referenced directly", names)
+    
+    def stmt_ImportFrom(self, node, out, explanations):
+        if self.project is None or not self.project.is_project_import(node):
+            return self.unsupported_stmt(node, out, explanations)
+        return Message("Import from project module `{}` → references go to its class",
+                       "." * node.level + (node.module or ""))
+    
+    def assign_collection(self, var_name, value, info, out):
+        """Declare a list or dict literal with its specialised Java type"""
+        java_type = info.java_type()
+        if info.is_primitive_array():
+            elements = ", ".join(self.expr_to_java(el) for el in value.elts)
+            out.line(f"{java_type} {var_name} = new {info.element_type}[] {{{elements}}};")
+            return Message("Variable assignment: `{}` → fixed-size list of `{}` → primitive array `{}`",
+                           var_name, info.element_type, java_type)
+        if info.kind == "list":
+            if value.elts:
+                elements = ", ".join(self.expr_to_java(el) for el in value.elts)
+                out.line(f"{java_type} {var_name} = new ArrayList<>(Arrays.asList({elements}));")
+            else:
+                out.line(f"{java_type} {var_name} = new ArrayList<>();")
+            return Message("Variable assignment: `{}` → list of `{}` → `{}`",
+                           var_name, info.element_type, java_type)
+        # Room for every literal entry without rehashing at the default load factor
+        capacity = len(value.keys) * 4 // 3 + 1
+        out.line(f"{java_type} {var_name} = new HashMap<>({capacity if value.keys else ''});")
+        for key, item in zip(value.keys, value.values):
+            out.line(f"{var_name}.put({self.expr_to_java(key)}, {self.expr_to_java(item)});")
+        return Message("Variable assignment: `{}` → dict of `{}` to `{}` → `{}` pre-sized for {} entries",
+                       var_name, info.key_type, info.element_type, java_type, len(value.keys))
+    
+    def assign_item(self, target, value, info, out):
+        """Store into a specialised list or dict variable"""
+        name = target.value.id
+        index = self.expr_to_java(target.slice)
+        item = self.expr_to_java(value)
+        if info.is_primitive_array():
+            out.line(f"{name}[{index}] = {item};")
+            return Message("Item assignment: `{}[...]` → array element store", name)
+        method = "set" if info.kind == "list" else "put"
+        out.line(f"{name}.{method}({index}, {item});")
+        return Message("Item assignment: `{}[...]` → `{}.{}()`", name, name, method)
+    
+    def stmt_AugAssign(self, node, out, explanations):
+        if not isinstance(node.target, ast.Name):
+            return self.unsupported_stmt(node, out, explanations)
+        var_name = node.target.id
+        builder = self.string_builders.get(var_name)
+        if builder is not None:
+            out.line(f"{builder}{self.append_chain(node.value)};")
+            return Message("String accumulation: `{} +=` → `{}.append()`", var_name, builder)
+        op = AUGASSIGN_SYMBOLS.get(type(node.op), "=")
+        value = self.expr_to_java(node.value)
+        out.line(f"{var_name} {op} {value};")
+        return Message("Augmented assignment: `{} {} {}`", var_name, op, value)
+    
+    def stmt_Expr(self, node, out, explanations):
+        if isinstance(node.value, ast.Call):
+            out.line(f"{self.call_to_java(node.value)};")
+            return Message("Function call converted")
+        else:
+            expr = self.expr_to_java(node.value)
+            out.line(f"{expr};")
+            return Message("Expression statement")
+    
+    def stmt_If(self, node, out, explanations):
+        test = self.expr_to_java(node.test)
+        out.line(f"if ({test}) {{")
+        yield node.body
+        
+        orelse = node.orelse
+        # `elif` continues the same Java chain instead of nesting one level deeper
+        while len(orelse) == 1 and isinstance(orelse[0], ast.If):
+            branch = orelse[0]
+            start = len(out.lines)
+            out.line(f"}} else if ({self.expr_to_java(branch.test)}) {{")
+            yield branch.body
+            self.record_explanation(branch, start, out, explanations,
+                                    Message("Conditional branch: `elif` → Java `else if` block"))
+            orelse = branch.orelse
+        
+        if orelse:
+            out.line("} else {")
+            yield orelse
+        
+        out.line("}")
+        return Message("Conditional statement: `if/else` → Java if/else block")
+    
+    def string_accumulators(self, loop):
+        """String variables a loop only ever extends with `+=`
+        
+        Any other read or write of the variable inside the loop, including
+        its condition, keeps the plain `String` concatenation.
+        """
+        if loop not in self.loop_appends:
+            self.scan_appends(loop)
+        candidates = {
+            name: values for name, values in self.loop_appends[loop].items()
+            if name not in self.string_builders and self.is_string_variable(name, values)
+        }
+        if not candidates:
+            return []
+        # Only loops that really build strings pay for a walk of their expressions
+        if loop not in self.loop_uses:
+            self.count_uses(loop, set(self.loop_appends[loop]), (self.loop_uses.setdefault(loop, {}),))
+        uses = self.loop_uses[loop]
+        return [name for name, values in candidates.items() if uses.get(name, 0) == len(values)]
+    
+    def scan_appends(self, node):
+        """Record the `name += value` statements inside node and every loop nested in it
+        
+        Only statement lists are visited, once per outermost loop; nested
+        function bodies belong to another scope and are skipped. Each
+        append is added to every enclosing loop on the way down.
+        """
+        appends = {}
+        if isinstance(node, (ast.For, ast.While)):
+            self.loop_appends[node] = appends
+        # Statements still to scan, with the appends of every loop around
+        # them; pushed in reverse so they are popped in source order
+        stack = [(child, (appends,)) for child in reversed(nested_statements(node))]
+        while stack:
+            node, active = stack.pop()
+            if isinstance(node, ast.AugAssign):
+                if isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+                    for loop_appends in active:
+                        loop_appends.setdefault(node.target.id, []).append(node.value)
+            elif isinstance(node, COMPOUND_STATEMENTS):
+                if isinstance(node, (ast.For, ast.While)):
+                    active = active + (self.loop_appends.setdefault(node, {}),)
+                stack.extend((child, active) for child in reversed(nested_statements(node)))
+        return appends
+    
+    def count_uses(self, node, names, active):
+        """Count occurrences of names below node for every loop in `active` and nested in node"""
+        stack = [(node, active)]
+        while stack:
+            node, active = stack.pop()
+            for field in node._fields:
+                value = getattr(node, field, None)
+                for child in value if isinstance(value, list) else (value,):
+                    child_type = type(child)
+                    if child_type is ast.Name:
+                        if child.id in names:
+                            for uses in active:
+                                uses[child.id] = uses.get(child.id, 0) + 1
+                    elif child_type in LEAF_NODES or not isinstance(child, ast.AST):
+                        continue
+                    elif child_type is ast.For or child_type is ast.While:
+                        stack.append((child, active + (self.loop_uses.setdefault(child, {}),)))
+                    else:
+                        stack.append((child, active))
+    
+    def is_string_variable(self, name, values):
+        if self.symbols is not None:
+            scope = self.function_stack[-1] if self.function_stack else None
+            return self.symbols.variable_type(scope, name) == "String"
+        return all(self.is_string_expr(value) for value in values)
+    
+    def is_string_expr(self, expr):
+        """Whether expr is a string, or a `+` chain with a string operand"""
+        operands = [expr]
+        while operands:
+            expr = operands.pop()
+            if isinstance(expr, ast.Constant):
+                if isinstance(expr.value, str):
+                    return True
+            elif isinstance(expr, ast.JoinedStr):
+                return True
+            elif isinstance(expr, ast.BinOp) and isinstance(expr.op, ast.Add):
+                operands.append(expr.right)
+                operands.append(expr.left)
+            elif isinstance(expr, ast.Name) and self.symbols is not None:
+                scope = self.function_stack[-1] if self.function_stack else None
+                if self.symbols.variable_type(scope, expr.id) == "String":
+                    return True
+        return False
+    
+    def convert_loop(self, node, header, out, explanations, message):
+        """Emit a loop, lowering string accumulation in it to StringBuilders
+        
+        Each accumulated variable gets one builder created before the loop
+        and copied back once after it, so the loop body appends in
+        amortised constant time instead of copying the whole string.
+        """
+        names = self.string_accumulators(node)
+        for name in names:
+            builder = f"{name}Builder"
+            self.string_builders[name] = builder
+            # Without inference the variable may be declared Object, which no constructor takes
+            initial = name if self.symbols is not None else f"String.valueOf({name})"
+            out.line(f"StringBuilder {builder} = new StringBuilder({initial});")
+        try:
+            out.line(header)
+            yield node.body
+            out.line("}")
+        finally:
+            for name in names:
+                del self.string_builders[name]
+        for name in names:
+            out.line(f"{name} = {name}Builder.toString();")
+        if names:
+            builders = ", ".join(f"`{name}`" for name in names)
+            return Message("{}; string accumulation of {} → StringBuilder", message, builders)
+        return message
+    
+    def append_chain(self, value):
+        """`.append(...)` calls adding value to a StringBuilder, one per piece
+        
+        A `+` is split into separate appends when its left operand is
+        already a string, so `s += "a" + b + c` appends each term.
+        """
+        # Left spine of a `a + b + c` chain, outermost `+` first
+        spine = []
+        while isinstance(value, ast.BinOp) and isinstance(value.op, ast.Add):
+            spine.append(value)
+            value = value.left
+        # Scan bottom-up: whether everything left of each `+` contains a string
+        is_string = self.is_string_expr(value)
+        left_is_string = []
+        for node in reversed(spine):
+            left_is_string.append(is_string)
+            is_string = is_string or self.is_string_expr(node.right)
+        left_is_string.reverse()
+        # Split the outermost `+`s until one whose left side is not a string
+        split = 0
+        while split < len(spine) and left_is_string[split]:
+            split += 1
+        first = spine[split] if split < len(spine) else value
+        if isinstance(first, ast.JoinedStr):
+            pieces = self.joined_str_pieces(first)
+        else:
+            pieces = [self.expr_to_java(first)]
+        chain = "".join(f".append({piece})" for piece in pieces)
+        return chain + "".join(self.append_chain(node.right) for node in reversed(spine[:split]))
+    
+    def stmt_For(self, node, out, explanations):
+        if isinstance(node.iter, ast.Call) and isinstance(node.iter.func, ast.Name) and node.iter.func.id == "range":
+            loop_var = node.target.id
+            range_params = self.handle_range(node.iter.args)
+            return (yield from self.convert_loop(node, f"for (int {loop_var} = {range_params}) {{", out,
+                                                 explanations, Message("For loop with range() → Java for loop")))
+        else:
+            # Enhanced for loop for iterables
+            loop_var = node.target.id
+            iterable = self.expr_to_java(node.iter)
+            info = self.collection_info(node.iter)
+            element_type = info.element_type if info is not None and info.kind == "list" else "Object"
+            if element_type != "Object":
+                message = Message("For-each loop over `{}` elements → Java enhanced for loop", element_type)
+            else:
+                message = Message("For-each loop → Java enhanced for loop")
+            return (yield from self.convert_loop(node, f"for ({element_type} {loop_var} : {iterable}) {{",
+                                                 out, explanations, message))
+    
+    def stmt_While(self, node, out, explanations):
+        condition = self.expr_to_java(node.test)
+        return (yield from self.convert_loop(node, f"while ({condition}) {{", out, explanations,
+                                             Message("While loop → Java while loop")))
+    
+    def stmt_FunctionDef(self, node, out, explanations):
+        if self.symbols is not None and self.symbols.functions.get(node.name) is node:
+            signature = self.symbols.signature(node.name)
+            return_type, param_str = signature.return_type, signature.java_params()
+            message = Message("Function definition: `def {}()` → inferred static method `{}`",
+                              node.name, signature)
+        else:
+            params = []
+            for arg in node.args.args:
+                params.append(f"Object {arg.arg}")
+            
+            return_type, param_str = "void", ", ".join(params)
+            message = Message("Function definition: `def {}()` → Java static method", node.name)
+        
+        out.line(f"public static {return_type} {node.name}({param_str}) {{")
+        self.function_stack.append(node)
+        try:
+            yield node.body
+        finally:
+            self.function_stack.pop()
+        out.line("}")
+        return message
+    
+    def stmt_Return(self, node, out, explanations):
+        if node.value and self.options.comprehensions == "loops":
+            name = self.temporary_name("result")
+            message = self.lower_comprehension(name, node.value, out)
+            if message is not None:
+                # Declared now, so later temporaries of this function pick other names
+                scope = self.function_stack[-1] if self.function_stack else None
+                self.local_names[scope].add(name)
+                out.line(f"return {name};")
+                return message
+        if node.value:
+            value = self.expr_to_java(node.value)
+            out.line(f"return {value};")
+        else:
+            out.line("return;")
+        return Message("Return statement")
+    
+    def stmt_Break(self, node, out, explanations):
+        out.line("break;")
+        return Message("Break statement")
+    
+    def stmt_Continue(self, node, out, explanations):
+        out.line("continue;")
+        return Message("Continue statement")
+    
+    def parse(self, python_code):
+        """Parse phase: Python source to AST"""
+        if self.parse_cache is not None:
+            return self.parse_cache.parse(python_code)
+        return parse_python(python_code)
+    
+    def prepare_module(self, tree):
+        """Run the analysis passes for a module before its statements are converted"""
+        self.symbols = SymbolTable(tree, self.project) if self.options.infer_types else None
+        self.collections = None
+        if self.symbols is not None and self.options.specialize_collections:
+            self.collections = CollectionAnalysis(tree, self.symbols)
+            if self.collections.refines_types():
+                # Re-infer so calls, returns and comprehensions see the specialised types
+                self.symbols = SymbolTable(tree, self.project, self.collections)
+        self.function_stack = []
+        self.string_builders = {}
+        self.loop_appends = {}
+        self.loop_uses = {}
+        self.local_names = {None: bound_names(tree)}
+        # Module-level statements are renamed around these, so cached fragments depend on them
+        self.module_names = tuple(sorted(self.local_names[None]))
+        self.comprehension_names = {}
+        self.enclosing_names = {}
+    
+    def convert_module(self, tree, python_code, should_cancel=None):
+        """Convert phase: walk every top-level statement of a parsed module"""
+        # Main code and methods are emitted at their final indentation
+        # into separate buffers
+        module = ConvertedModule(CodeEmitter(level=2), CodeEmitter(level=1), CodeEmitter(level=1))
+        self.prepare_module(tree)
+        self.extra_imports = set()
+        # Only fragments still present in this buffer survive into the next run
+        lines = self.source_lines(python_code) if self.options.incremental else None
+        fresh_cache = {}
+        
+        for node in tree.body:
+            if should_cancel is not None and should_cancel():
+                raise ConversionCancelled()
+            if isinstance(node, ast.FunctionDef):
+                self.convert_top_level(node, module.static_methods, "methods", module.explanations,
+                                       lines, fresh_cache)
+            elif self.constant_field(node) is not None:
+                self.convert_top_level(node, module.fields, "fields", module.explanations,
+                                       lines, fresh_cache)
+            else:
+                self.convert_top_level(node, module.main_body, "main", module.explanations,
+                                       lines, fresh_cache)
+        
+        if self.options.incremental:
+            self.fragment_cache = fresh_cache
+        return module
+    
+    def assemble(self, module):
+        """Assembly phase: wrap converted statements into the Java class"""
+        java_lines = []
+        explanations = ExplanationLog()
+        explain = self.options.explain
+        
+        if self.options.package:
+            java_lines.append(f"package {self.options.package};")
+            java_lines.append("")
+        
+        # Add imports if requested
+        if self.options.add_imports:
+            java_lines.extend(JAVA_IMPORTS)
+            java_lines.extend(sorted(self.extra_imports))
+            java_lines.append("")
+            if explain:
+                explanations.add(Message("Added common Java imports"))
+        
+        # Add class declaration
+        class_name = self.options.class_name or "Main"
+        java_lines.append(f"public class {class_name} {{")
+        explanations.groups.extend(module.explanations.groups)
+        
+        if module.fields.lines:
+            explanations.section_offsets["fields"] = len(java_lines)
+            java_lines.extend(module.fields.lines)
+        
+        # Add main method if requested
+        if self.options.add_main and module.main_body.lines:
+            if module.fields.lines:
+                java_lines.append("")
+            java_lines.append("    public static void main(String[] args) {")
+            explanations.section_offsets["main"] = len(java_lines)
+            java_lines.extend(module.main_body.lines)
+            java_lines.append("    }")
+            if explain:
+                explanations.add(Message("Wrapped main code in main() method"))
+        
+        # Add static methods
+        if module.static_methods.lines:
+            java_lines.append("")
+            explanations.section_offsets["methods"] = len(java_lines)
+            java_lines.extend(module.static_methods.lines)
+        
+        java_lines.append("}")
+        
+        return ConversionResult("\n".join(java_lines), explanations,
+                                unsupported=self.unsupported)
+    
+    def convert_python_to_java(self, python_code, should_cancel=None):
+        """Main conversion function with enhanced features
+        
+        Runs the parse, convert and assembly phases in turn, recording
+        their durations in the result's timings. should_cancel
+        is polled between top-level statements; when it returns True the
+        run stops with ConversionCancelled.
+        """
+        self.unsupported = {}
+        timings = {}
+        try:
+            started = time.perf_counter()
+            tree = self.parse(python_code)
+            parsed = time.perf_counter()
+            timings["parse"] = (parsed - started) * 1000
+            module = self.convert_module(tree, python_code, should_cancel)
+            converted = time.perf_counter()
+            timings["convert"] = (converted - parsed) * 1000
+            result = self.assemble(module)
+            timings["assemble"] = (time.perf_counter() - converted) * 1000
+            result.timings = timings
+            return result
+            
+        except ConversionCancelled:
+            raise
+        except SyntaxError as e:
+            error_msg = f"Python syntax error at line {e.lineno}: {e.msg}"
+            return ConversionResult(f"/* {error_msg} */", ExplanationLog.from_messages(error_msg),
+                                    ok=False, timings=timings)
+        except Exception as e:
+            error_msg = f"Conversion error: {str(e)}"
+            return ConversionResult(f"/* {error_msg} */", ExplanationLog.from_messages(error_msg),
+                                    ok=False, timings=timings)
+
+
+PyjamaEngine.STMT_HANDLERS = build_dispatch(PyjamaEngine, "stmt_")
+PyjamaEngine.EXPR_HANDLERS = build_dispatch(PyjamaEngine, "expr_")
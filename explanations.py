@@ -0,0 +1,166 @@
+"""Structured conversion explanations, formatted only when displayed"""
+from bisect import bisect_right
+
+
+class Message:
+    """Explanation text kept as a template until it is displayed"""
+
+    __slots__ = ("template", "args")
+
+    def __init__(self, template, *args):
+        self.template = template
+        self.args = args
+
+    def __str__(self):
+        return self.template.format(*self.args) if self.args else self.template
+
+
+class Explanation:
+    """One explanation record
+
+    Inside an ExplanationLog, python_line and the java range are relative to
+    the top-level statement group they belong to; entries handed out by the
+    log carry absolute 1-based line numbers. java_end is inclusive; both
+    java fields are None when the statement emitted no visible Java.
+    """
+
+    __slots__ = ("node_type", "python_line", "java_start", "java_end", "message")
+
+    def __init__(self, node_type, python_line, java_start, java_end, message):
+        self.node_type = node_type
+        self.python_line = python_line
+        self.java_start = java_start
+        self.java_end = java_end
+        self.message = message
+
+    @property
+    def text(self):
+        return str(self.message)
+
+    def location(self):
+        """Short 'py 3 → java 10-12' style label"""
+        parts = []
+        if self.python_line is not None:
+            parts.append(f"py {self.python_line}")
+        if self.java_start is not None:
+            if self.java_end != self.java_start:
+                parts.append(f"java {self.java_start}-{self.java_end}")
+            else:
+                parts.append(f"java {self.java_start}")
+        return " → ".join(parts)
+
+    def to_dict(self):
+        return {
+            "node_type": self.node_type,
+            "python_line": self.python_line,
+            "java_lines": [self.java_start, self.java_end] if self.java_start is not None else None,
+            "message": self.text,
+        }
+
+
+class ExplanationLog:
+    """Explanation records of one conversion, grouped per top-level statement
+
+    Groups are stored as (section, java_base, python_base, records) where
+    section names the Java buffer the statement was emitted into. Absolute
+    positions are only resolved, and messages only formatted, when an entry
+    is read.
+    """
+
+    def __init__(self):
+        self.groups = []
+        # Section name -> 0-based line index of the section in the final Java
+        self.section_offsets = {}
+        self._starts = None
+
+    @classmethod
+    def from_messages(cls, *messages):
+        log = cls()
+        for message in messages:
+            log.add(message)
+        return log
+
+    def add(self, message):
+        """Add a record that is not tied to any statement"""
+        self.add_group(None, 0, 0, [Explanation(None, None, None, None, message)])
+
+    def add_group(self, section, java_base, python_base, records):
+        if records:
+            self.groups.append((section, java_base, python_base, records))
+            self._starts = None
+
+    def _index(self):
+        if self._starts is None:
+            starts = []
+            total = 0
+            for group in self.groups:
+                starts.append(total)
+                total += len(group[3])
+            self._starts = starts
+            self._total = total
+        return self._starts
+
+    def __len__(self):
+        self._index()
+        return self._total
+
+    def __getitem__(self, index):
+        starts = self._index()
+        if index < 0:
+            index += self._total
+        if not 0 <= index < self._total:
+            raise IndexError(index)
+        group_index = bisect_right(starts, index) - 1
+        return self.resolve(self.groups[group_index], index - starts[group_index])
+
+    def __iter__(self):
+        for group in self.groups:
+            for position in range(len(group[3])):
+                yield self.resolve(group, position)
+
+    def resolve(self, group, position):
+        section, java_base, python_base, records = group
+        record = records[position]
+        python_line = None if record.python_line is None else python_base + record.python_line
+        offset = self.section_offsets.get(section)
+        java_start = java_end = None
+        if offset is not None and record.java_start is not None and record.java_end > record.java_start:
+            java_start = offset + java_base + record.java_start + 1
+            java_end = offset + java_base + record.java_end
+        return Explanation(record.node_type, python_line, java_start, java_end, record.message)
+
+    def entries_for_java_line(self, line):
+        """Indices of entries whose Java range covers the 1-based line, innermost first"""
+        matches = []
+        for index, entry in enumerate(self):
+            if entry.java_start is not None and entry.java_start <= line <= entry.java_end:
+                matches.append((entry.java_end - entry.java_start, index))
+        return [index for _, index in sorted(matches)]
+
+    def to_dict(self):
+        """JSON-ready copy of the log; messages are formatted on the way"""
+        return {
+            "groups": [
+                [section, java_base, python_base,
+                 [[record.node_type, record.python_line, record.java_start, record.java_end, record.text]
+                  for record in records]]
+                for section, java_base, python_base, records in self.groups
+            ],
+            "section_offsets": self.section_offsets,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        log = cls()
+        for section, java_base, python_base, records in data["groups"]:
+            log.add_group(section, java_base, python_base,
+                          [Explanation(*record[:4], Message(record[4])) for record in records])
+        log.section_offsets = dict(data["section_offsets"])
+        return log
+
+    def format(self):
+        """All messages as newline-separated text"""
+        return "\n".join(str(record.message) for group in self.groups for record in group[3])
+
+    def __str__(self):
+        return self.format()
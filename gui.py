@@ -0,0 +1,1522 @@
+"""Tk GUI of the converter
+
+Imported by main.py only when the window is requested, so headless runs
+never load Tk.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, scrolledtext
+import tkinter.font as tkfont
+import ast
+from engine import ConversionCancelled, ConversionOptions, ParseCache, PyjamaEngine
+from batch import java_class_name
+from history import ConversionHistory
+from streaming import LARGE_FILE_BYTES, StreamingConverter, read_preview
+from highlight import TAGS, java_line, python_line
+import json
+import os
+import hashlib
+import difflib
+import threading
+import time
+from datetime import datetime
+
+# Foreground of each highlighting tag, per theme
+SYNTAX_COLORS = {
+    "light": {"keyword": "#0033b3", "builtin": "#7a3e9d", "number": "#1750eb",
+              "string": "#067d17", "comment": "#8c8c8c"},
+    "dark": {"keyword": "#569cd6", "builtin": "#4ec9b0", "number": "#b5cea8",
+             "string": "#ce9178", "comment": "#6a9955"},
+}
+
+class ConversionScheduler:
+    """Coalesce bursts of edits into a single conversion after a quiet period"""
+    
+    def __init__(self, root, callback, quiet_ms=1000):
+        self.root = root
+        self.callback = callback
+        self.quiet_ms = quiet_ms
+        self.pending_id = None
+        
+    def schedule(self):
+        """(Re)start the quiet-period timer, dropping any pending run"""
+        self.cancel()
+        self.pending_id = self.root.after(self.quiet_ms, self.fire)
+        
+    def cancel(self):
+        """Cancel the pending run, if any"""
+        if self.pending_id is not None:
+            self.root.after_cancel(self.pending_id)
+            self.pending_id = None
+            
+    def fire(self):
+        self.pending_id = None
+        self.callback()
+
+def line_diff(old_lines, new_lines, max_matched=2000):
+    """Line-level edits turning old_lines into new_lines
+    
+    Returns (start, end, replacement) tuples in ascending order, meaning
+    old_lines[start:end] is replaced by the replacement lines. The common
+    prefix and suffix are trimmed first; only a middle section of at most
+    max_matched lines is diffed with difflib, anything larger is replaced
+    in one piece.
+    """
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    
+    old_mid = old_lines[prefix:len(old_lines) - suffix]
+    new_mid = new_lines[prefix:len(new_lines) - suffix]
+    if not old_mid and not new_mid:
+        return []
+    if len(old_mid) > max_matched or len(new_mid) > max_matched:
+        return [(prefix, prefix + len(old_mid), new_mid)]
+    
+    matcher = difflib.SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    return [
+        (prefix + i1, prefix + i2, new_mid[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+class TextPaneUpdater:
+    """Bring a read-only Text widget to new contents with minimal edits
+    
+    Only changed line ranges are touched, so the scroll position survives
+    small edits. Insertions longer than chunk_lines are split into chunks
+    applied via after_idle to keep the window responsive.
+    """
+    
+    MARK = "pyjama_update"
+    
+    def __init__(self, root, widget, chunk_lines=2000):
+        self.root = root
+        self.widget = widget
+        self.chunk_lines = chunk_lines
+        self.lines = [""]  # What the widget shows once pending steps finish
+        self.steps = None
+        
+    def text(self):
+        """Target contents, even while chunks are still being inserted"""
+        return "\n".join(self.lines)
+    
+    def clear(self):
+        self.set_text("")
+        
+    def set_text(self, text):
+        """Schedule the widget update; returns once the first chunk is applied"""
+        if self.steps is not None:
+            # An interrupted update leaves the widget between two states
+            self.steps = None
+            self.lines = self.widget.get("1.0", "end-1c").split("\n")
+        new_lines = text.split("\n")
+        edits = line_diff(self.lines, new_lines)
+        old_count = len(self.lines)
+        self.lines = new_lines
+        if edits:
+            self.steps = self.edit_steps(edits, old_count)
+            self.pump(self.steps)
+            
+    def edit_steps(self, edits, old_count):
+        """Apply edits bottom-up so earlier line numbers stay valid; yields between chunks"""
+        for start, end, replacement in reversed(edits):
+            at_end = end == old_count
+            if at_end and start == 0:
+                self.widget.delete("1.0", "end")
+                position, lead, trail = "1.0", "", ""
+            elif at_end:
+                # Removing the tail also removes the newline ending line `start`
+                self.widget.delete(f"{start}.end", "end-1c")
+                position, lead, trail = f"{start}.end", "\n", ""
+            else:
+                self.widget.delete(f"{start + 1}.0", f"{end + 1}.0")
+                position, lead, trail = f"{start + 1}.0", "", "\n"
+            
+            # A right-gravity mark follows the end of each inserted chunk
+            self.widget.mark_set(self.MARK, position)
+            self.widget.mark_gravity(self.MARK, "right")
+            for offset in range(0, len(replacement), self.chunk_lines):
+                chunk = replacement[offset:offset + self.chunk_lines]
+                last = offset + self.chunk_lines >= len(replacement)
+                text = (lead if offset == 0 else "\n") + "\n".join(chunk) + (trail if last else "")
+                self.widget.insert(self.MARK, text)
+                if not last:
+                    yield
+            
+    def pump(self, steps):
+        if steps is not self.steps:
+            return  # Superseded by a newer update
+        self.widget.config(state="normal")
+        try:
+            next(steps)
+        except StopIteration:
+            self.steps = None
+        finally:
+            self.widget.config(state="disabled")
+        if self.steps is steps:
+            self.root.after_idle(self.pump, steps)
+
+class SyntaxHighlighter:
+    """Incremental syntax highlighting of the visible lines of a Text widget
+    
+    The widget's insert/delete/replace commands are routed through this
+    object, so every edit marks exactly the lines it touched as dirty.
+    For each line the lexer state it was lexed from and the state it
+    ended in are cached; after an edit, lexing resumes at the first dirty
+    line and carries on only while a line ends in a different state than
+    the next line was lexed from. Nothing below the viewport is lexed, and
+    lines above it only have their end state brought up to date; their
+    tags are applied once they scroll into view. All tag changes of one
+    frame are applied together, with at most frame_lines lines lexed per
+    frame.
+    """
+    
+    # Lexer state of a line that has to be lexed again
+    UNKNOWN = object()
+    FRAME_MS = 16
+    
+    def __init__(self, root, widget, lexer, frame_lines=1000):
+        self.root = root
+        self.widget = widget
+        self.lexer = lexer
+        self.frame_lines = frame_lines
+        # Per line: state it was lexed from, state it ended in, tags applied
+        self.starts = [self.UNKNOWN]
+        self.ends = [None]
+        self.painted = bytearray(1)
+        # Lines before this index have correct end states
+        self.valid = 0
+        self.pending_id = None
+        
+        self.original = widget._w + "_unhighlighted"
+        widget.tk.call("rename", widget._w, self.original)
+        # The widget command is a Tcl proc turning dispatch's status back
+        # into a Tcl error, which Tk's bindings test for with `catch`
+        dispatcher = widget._w + "_dispatch"
+        widget.tk.createcommand(dispatcher, self.dispatch)
+        widget.tk.eval(f"proc {widget._w} args {{\n"
+                       f"    lassign [{dispatcher} {{*}}$args] code result\n"
+                       f"    return -code $code $result\n"
+                       f"}}")
+        widget.configure(yscrollcommand=self.on_scroll)
+        widget.bind("<Configure>", lambda e: self.schedule(), add="+")
+        
+    def set_colors(self, colors):
+        """Configure the tags from a tag name -> foreground colour mapping"""
+        for tag in TAGS:
+            self.widget.tag_configure(tag, foreground=colors[tag])
+            
+    def call(self, *args):
+        return self.widget.tk.call((self.original,) + args)
+    
+    def line_of(self, index, last_line):
+        return min(int(self.call("index", index).split(".")[0]), last_line)
+    
+    def line_count(self):
+        return int(self.call("index", "end-1c").split(".")[0])
+    
+    def dispatch(self, operation, *args):
+        """Widget command: pass every call on, noting the lines edits touch
+        
+        Returns (Tcl return code, result) to the widget's proc. A failing
+        subcommand comes back as a Tcl error to whoever called the widget,
+        so `catch` in Tk's bindings sees it; raising it here would end
+        mainloop instead.
+        """
+        try:
+            return 0, self.forward(operation, args)
+        except tk.TclError as e:
+            return 1, str(e)
+    
+    def forward(self, operation, args):
+        if operation not in ("insert", "delete", "replace") or not args:
+            return self.call(operation, *args)
+        before = self.line_count()
+        if operation == "insert":
+            indices = [args[0]]
+        elif operation == "delete" and len(args) == 1:
+            # A single index deletes one character, possibly a newline
+            indices = [args[0], f"{args[0]}+1c"]
+        else:
+            indices = list(args if operation == "delete" else args[:2])
+        lines = [self.line_of(index, before) for index in indices]
+        result = self.call(operation, *args)
+        first, last = min(lines), max(lines)
+        self.lines_changed(first, last, last + self.line_count() - before)
+        return result
+            
+    def lines_changed(self, first, last, new_last):
+        """Lines first..last (1-based) were replaced by first..new_last"""
+        count = new_last - first + 1
+        self.starts[first - 1:last] = [self.UNKNOWN] * count
+        self.ends[first - 1:last] = [None] * count
+        self.painted[first - 1:last] = bytes(count)
+        self.valid = min(self.valid, first - 1)
+        self.schedule()
+        
+    def on_scroll(self, first, last):
+        self.widget.vbar.set(first, last)
+        self.schedule()
+        
+    def schedule(self):
+        if self.pending_id is None:
+            self.pending_id = self.root.after(self.FRAME_MS, self.run)
+            
+    def visible_lines(self):
+        """First and last line (1-based) shown in the widget"""
+        top = int(self.call("index", "@0,0").split(".")[0])
+        bottom = int(self.call("index", f"@0,{self.widget.winfo_height()}").split(".")[0])
+        return top, bottom
+    
+    def run(self):
+        """One frame: lex up to the bottom of the viewport and repaint its dirty lines"""
+        self.pending_id = None
+        top, bottom = self.visible_lines()
+        bottom = min(bottom, len(self.ends))
+        starts, ends, painted = self.starts, self.ends, self.painted
+        budget = self.frame_lines
+        # Lines above the watermark only need painting, and only from the top of the view
+        index = min(self.valid, top - 1)
+        state = ends[index - 1] if index else None
+        ranges = {tag: [] for tag in TAGS}
+        repaint = []
+        while index < bottom:
+            visible = index >= top - 1
+            if starts[index] is not self.UNKNOWN and starts[index] == state:
+                if painted[index] or not visible:
+                    state = ends[index]
+                    index += 1
+                    continue
+            if not budget:
+                break
+            budget -= 1
+            line = index + 1
+            spans, end = self.lexer(self.call("get", f"{line}.0", f"{line}.end"), state)
+            starts[index] = state
+            ends[index] = end
+            painted[index] = visible
+            if visible:
+                for tag, start, stop in spans:
+                    ranges[tag] += (f"{line}.{start}", f"{line}.{stop}")
+                if repaint and repaint[-1][1] == line - 1:
+                    repaint[-1][1] = line
+                else:
+                    repaint.append([line, line])
+            state = end
+            index += 1
+        self.valid = max(self.valid, index)
+        
+        if repaint:
+            cleared = []
+            for first, last in repaint:
+                cleared += (f"{first}.0", f"{last}.end")
+            for tag in TAGS:
+                self.call("tag", "remove", tag, *cleared)
+        for tag, indices in ranges.items():
+            if indices:
+                self.call("tag", "add", tag, *indices)
+        if index < bottom:
+            self.schedule()
+
+class ExplanationPanel:
+    """Explanation list that formats only the rows currently in view
+    
+    Shows entries of an ExplanationLog; scrolling moves a window over the
+    log instead of filling a Text widget with every message.
+    """
+    
+    def __init__(self, parent, on_select=None):
+        self.on_select = on_select
+        self.log = None
+        self.top = 0
+        self.selected = None
+        
+        frame = ttk.Frame(parent)
+        frame.pack(fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(frame, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(frame, height=8, wrap="none", font=("Segoe UI", 10),
+                            state="disabled", cursor="arrow")
+        self.text.pack(fill="both", expand=True)
+        self.text.tag_configure("selected", background="#cce5ff", foreground="#000000")
+        self.line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        
+        self.text.bind("<Configure>", lambda e: self.render())
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-1, 3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(1, 3))
+        self.text.bind("<Button-1>", self.on_click)
+        
+    def visible_rows(self):
+        height = self.text.winfo_height()
+        if height <= 1:
+            return int(self.text.cget("height"))
+        return max(1, height // self.line_height)
+    
+    def set_log(self, log):
+        self.log = log
+        self.top = 0
+        self.selected = None
+        self.render()
+        
+    def clear(self):
+        self.set_log(None)
+        
+    def render(self):
+        """Format and show only the entries in the current window"""
+        total = len(self.log) if self.log is not None else 0
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, total - rows))
+        end = min(total, self.top + rows)
+        
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        for index in range(self.top, end):
+            entry = self.log[index]
+            location = entry.location()
+            row = f"[{location}] {entry.text}" if location else entry.text
+            tags = ("selected",) if index == self.selected else ()
+            self.text.insert("end", row + ("\n" if index < end - 1 else ""), tags)
+        self.text.config(state="disabled")
+        
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+            
+    def scroll(self, direction, amount):
+        self.top += direction * amount
+        self.render()
+        return "break"
+    
+    def yview(self, *args):
+        """Scrollbar callback"""
+        if not self.log:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.log))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.top += amount * self.visible_rows() if args[2] == "pages" else amount
+        self.render()
+        
+    def select(self, index):
+        """Highlight an entry, scrolling it into view"""
+        self.selected = index
+        rows = self.visible_rows()
+        if not self.top <= index < self.top + rows:
+            self.top = index - rows // 2
+        self.render()
+        if self.on_select is not None:
+            self.on_select(self.log[index])
+            
+    def select_java_line(self, line):
+        """Select the innermost entry explaining a Java line"""
+        if self.log is None:
+            return
+        matches = self.log.entries_for_java_line(line)
+        if matches:
+            self.select(matches[0])
+            
+    def on_click(self, event):
+        if self.log is None:
+            return "break"
+        row = int(self.text.index(f"@{event.x},{event.y}").split(".")[0]) - 1
+        if self.top + row < len(self.log):
+            self.select(self.top + row)
+        return "break"
+
+class ConversionWorker:
+    """Run conversions on a background thread, newest request wins
+    
+    Every submit() bumps the generation counter and cancels the run in
+    flight. on_result(generation, result) is called from the worker thread
+    with a ConversionResult, None when cancelled, or the raised exception.
+    With a ConversionCache, cached results are returned without converting;
+    successful conversions submitted with store=True are kept in it after
+    on_result has been called.
+    """
+    
+    def __init__(self, engine, on_result, cache=None):
+        self.engine = engine
+        self.on_result = on_result
+        self.cache = cache
+        self.generation = 0
+        self.condition = threading.Condition()
+        self.request = None
+        self.running_cancel = None
+        self.thread = threading.Thread(target=self.run, name="pyjama-converter", daemon=True)
+        self.thread.start()
+        
+    def submit(self, python_code, options, store=False):
+        """Queue a conversion, superseding any pending or running one"""
+        with self.condition:
+            self.generation += 1
+            if self.running_cancel is not None:
+                self.running_cancel.set()
+            self.request = (self.generation, python_code, options, store, threading.Event())
+            self.condition.notify()
+            return self.generation
+        
+    def cancel(self):
+        """Stop the running conversion and drop any pending one"""
+        with self.condition:
+            self.request = None
+            if self.running_cancel is not None:
+                self.running_cancel.set()
+                
+    def is_busy(self):
+        with self.condition:
+            return self.request is not None or self.running_cancel is not None
+        
+    def run(self):
+        while True:
+            with self.condition:
+                while self.request is None:
+                    self.condition.wait()
+                generation, python_code, options, store, cancel_event = self.request
+                self.request = None
+                self.running_cancel = cancel_event
+            
+            converted = False
+            try:
+                result = self.cache.get(python_code, options) if self.cache is not None else None
+                if result is None:
+                    self.engine.options = options
+                    result = self.engine.convert_python_to_java(python_code,
+                                                                should_cancel=cancel_event.is_set)
+                    converted = True
+            except ConversionCancelled:
+                result = None
+            except Exception as e:
+                result = e
+            
+            with self.condition:
+                self.running_cancel = None
+            self.on_result(generation, result)
+            
+            if self.cache is not None and store and converted and result.ok:
+                try:
+                    self.cache.put(python_code, options, result)
+                except Exception:
+                    pass  # The cache only saves time; never let it stop the worker
+
+class PyjamaConverter:
+    def __init__(self, cache=None):
+        self.root = tk.Tk()
+        # Trees of the recent buffers, so Validate, Format and Convert parse each once
+        self.parse_cache = ParseCache()
+        # One long-lived engine so unchanged statements are reused between edits
+        self.engine = PyjamaEngine(parse_cache=self.parse_cache)
+        # Results of earlier sessions, so reopened files are not converted again
+        self.cache = cache
+        self.last_conversion_hash = None
+        self.scheduler = ConversionScheduler(self.root, lambda: self.convert(skip_unchanged=True))
+        self.worker = ConversionWorker(self.engine, self.on_conversion_done, cache)
+        self.pending_conversion = None
+        # Blank lines stripped from the top of the buffer before converting
+        self.python_line_offset = 0
+        # Path of the open file while it is too large for the editors
+        self.large_file = None
+        # Cancel flag of the running large-file conversion
+        self.large_file_cancel = None
+        self.setup_gui()
+        self.conversion_history = ConversionHistory()
+        # Open history window and the newest entry id listed in it
+        self.history_window = None
+        self.history_listbox = None
+        self.history_shown_id = -1
+        self.current_theme = "light"
+        
+    def setup_gui(self):
+        self.root.title("Pyjama - Python to Java Converter")
+        self.root.geometry("1400x900")
+        self.root.minsize(1000, 700)
+        
+        # Configure style
+        self.style = ttk.Style()
+        self.style.theme_use("clam")
+        self.setup_themes()
+        
+        # Menu bar
+        self.setup_menu()
+        
+        # Main container
+        main_container = ttk.Frame(self.root)
+        main_container.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        # Toolbar
+        self.setup_toolbar(main_container)
+        
+        # Code editors section
+        editor_frame = ttk.Frame(main_container)
+        editor_frame.pack(fill="both", expand=True, pady=(10, 0))
+        
+        # Left side - Python editor
+        python_frame = ttk.LabelFrame(editor_frame, text="Python Code", padding=5)
+        python_frame.pack(side="left", fill="both", expand=True, padx=(0, 5))
+        
+        # Python editor toolbar
+        py_toolbar = ttk.Frame(python_frame)
+        py_toolbar.pack(fill="x", pady=(0, 5))
+        
+        ttk.Button(py_toolbar, text="📁 Load", command=self.load_python_file).pack(side="left", padx=(0, 5))
+        ttk.Button(py_toolbar, text="💾 Save", command=self.save_python_file).pack(side="left", padx=(0, 5))
+        ttk.Button(py_toolbar, text="🗑️ Clear", command=self.clear_python).pack(side="left", padx=(0, 5))
+        
+        # Line numbers and Python text
+        py_text_frame = ttk.Frame(python_frame)
+        py_text_frame.pack(fill="both", expand=True)
+        
+        self.python_text = scrolledtext.ScrolledText(
+            py_text_frame, wrap="none", height=25, width=50,
+            font=("Consolas", 11), insertbackground="blue"
+        )
+        self.python_text.pack(fill="both", expand=True)
+        self.python_text.bind('<KeyRelease>', self.on_python_change)
+        self.python_highlighter = SyntaxHighlighter(self.root, self.python_text, python_line)
+        
+        # Right side - Java output
+        java_frame = ttk.LabelFrame(editor_frame, text="Java Code", padding=5)
+        java_frame.pack(side="right", fill="both", expand=True, padx=(5, 0))
+        
+        # Java editor toolbar
+        java_toolbar = ttk.Frame(java_frame)
+        java_toolbar.pack(fill="x", pady=(0, 5))
+        
+        ttk.Button(java_toolbar, text="💾 Save Java", command=self.save_java_file).pack(side="left", padx=(0, 5))
+        ttk.Button(java_toolbar, text="📋 Copy", command=self.copy_java).pack(side="left", padx=(0, 5))
+        
+        self.java_text = scrolledtext.ScrolledText(
+            java_frame, wrap="none", height=25, width=50,
+            font=("Consolas", 11), bg="#f8f8f8", state="disabled"
+        )
+        self.java_text.pack(fill="both", expand=True)
+        self.java_updater = TextPaneUpdater(self.root, self.java_text)
+        self.java_highlighter = SyntaxHighlighter(self.root, self.java_text, java_line)
+        self.set_syntax_colors("light")
+        
+        # Bottom section - Controls and explanations
+        bottom_frame = ttk.Frame(main_container)
+        bottom_frame.pack(fill="x", pady=(10, 0))
+        
+        # Convert button and options
+        control_frame = ttk.Frame(bottom_frame)
+        control_frame.pack(fill="x", pady=(0, 10))
+        
+        ttk.Button(control_frame, text="🔄 Convert", command=self.convert, 
+                  style="Accent.TButton").pack(side="left", padx=(0, 10))
+        ttk.Button(control_frame, text="⏹ Cancel", 
+                  command=self.cancel_conversion).pack(side="left", padx=(0, 10))
+        
+        # Conversion options
+        options_frame = ttk.LabelFrame(control_frame, text="Options", padding=5)
+        options_frame.pack(side="left", fill="x", expand=True)
+        
+        self.auto_convert_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Auto-convert", 
+                       variable=self.auto_convert_var).pack(side="left", padx=(0, 10))
+        
+        ttk.Label(options_frame, text="Delay (ms):").pack(side="left", padx=(0, 5))
+        self.auto_convert_delay_var = tk.IntVar(value=self.scheduler.quiet_ms)
+        ttk.Spinbox(options_frame, from_=100, to=5000, increment=100, width=6,
+                    textvariable=self.auto_convert_delay_var).pack(side="left", padx=(0, 10))
+        
+        self.add_main_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Add main method", 
+                       variable=self.add_main_var).pack(side="left", padx=(0, 10))
+        
+        self.add_imports_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Add imports", 
+                       variable=self.add_imports_var).pack(side="left", padx=(0, 10))
+        
+        self.infer_types_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Infer types", 
+                       variable=self.infer_types_var).pack(side="left", padx=(0, 10))
+        
+        self.specialize_collections_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Specialize collections", 
+                       variable=self.specialize_collections_var).pack(side="left", padx=(0, 10))
+        
+        self.comprehension_loops_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Comprehensions as loops", 
+                       variable=self.comprehension_loops_var).pack(side="left", padx=(0, 10))
+        
+        ttk.Label(options_frame, text="Class name:").pack(side="left", padx=(10, 5))
+        self.class_name_var = tk.StringVar(value="Main")
+        ttk.Entry(options_frame, textvariable=self.class_name_var, width=15).pack(side="left")
+        
+        # Explanation section
+        explanation_frame = ttk.LabelFrame(bottom_frame, text="Conversion Explanation", padding=5)
+        explanation_frame.pack(fill="both", expand=True)
+        
+        self.explanation_panel = ExplanationPanel(explanation_frame, on_select=self.show_explained_lines)
+        self.explanation_text = self.explanation_panel.text
+        self.java_text.tag_configure("explained", background="#fff3bf")
+        self.python_text.tag_configure("explained", background="#fff3bf")
+        self.java_text.bind("<ButtonRelease-1>", self.on_java_click)
+        
+        # Status bar
+        self.status_var = tk.StringVar(value="Ready")
+        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief="sunken")
+        status_bar.pack(side="bottom", fill="x")
+        # Shown only while a large file is being converted
+        self.progress_bar = ttk.Progressbar(self.root, mode="determinate", maximum=100)
+        
+        # Load sample code
+        self.load_sample_code()
+        
+    def setup_menu(self):
+        menubar = tk.Menu(self.root)
+        self.root.config(menu=menubar)
+        
+        # File menu
+        file_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="New", command=self.new_file, accelerator="Ctrl+N")
+        file_menu.add_command(label="Open Python...", command=self.load_python_file, accelerator="Ctrl+O")
+        file_menu.add_separator()
+        file_menu.add_command(label="Save Python...", command=self.save_python_file, accelerator="Ctrl+S")
+        file_menu.add_command(label="Save Java...", command=self.save_java_file)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.root.quit)
+        
+        # Edit menu
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Copy Java", command=self.copy_java, accelerator="Ctrl+C")
+        edit_menu.add_command(label="Clear Python", command=self.clear_python)
+        
+        # View menu
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="View", menu=view_menu)
+        view_menu.add_command(label="Toggle Theme", command=self.toggle_theme)
+        view_menu.add_command(label="Conversion History", command=self.show_history)
+        view_menu.add_command(label="Export Timings...", command=self.export_timings)
+        
+        # Tools menu
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Validate Python", command=self.validate_python)
+        tools_menu.add_command(label="Format Python", command=self.format_python)
+        tools_menu.add_command(label="Load Sample", command=self.load_sample_code)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Cache Statistics", command=self.show_cache_stats)
+        tools_menu.add_command(label="Clear Cache", command=self.clear_cache)
+        
+        # Help menu
+        help_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="About", command=self.show_about)
+        help_menu.add_command(label="Supported Features", command=self.show_features)
+        
+        # Keyboard shortcuts
+        self.root.bind('<Control-n>', lambda e: self.new_file())
+        self.root.bind('<Control-o>', lambda e: self.load_python_file())
+        self.root.bind('<Control-s>', lambda e: self.save_python_file())
+        self.root.bind('<Control-Return>', lambda e: self.convert())
+        self.root.bind('<F5>', lambda e: self.convert())
+        self.root.bind('<Escape>', lambda e: self.cancel_conversion())
+        
+    def setup_toolbar(self, parent):
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(fill="x", pady=(0, 5))
+        
+        ttk.Button(toolbar, text="🆕 New", command=self.new_file).pack(side="left", padx=(0, 5))
+        ttk.Button(toolbar, text="📁 Open", command=self.load_python_file).pack(side="left", padx=(0, 5))
+        ttk.Button(toolbar, text="💾 Save", command=self.save_python_file).pack(side="left", padx=(0, 5))
+        ttk.Separator(toolbar, orient="vertical").pack(side="left", fill="y", padx=10)
+        ttk.Button(toolbar, text="🔄 Convert", command=self.convert).pack(side="left", padx=(0, 5))
+        ttk.Button(toolbar, text="✅ Validate", command=self.validate_python).pack(side="left", padx=(0, 5))
+        ttk.Separator(toolbar, orient="vertical").pack(side="left", fill="y", padx=10)
+        ttk.Button(toolbar, text="🎨 Theme", command=self.toggle_theme).pack(side="left", padx=(0, 5))
+        ttk.Button(toolbar, text="📊 History", command=self.show_history).pack(side="left", padx=(0, 5))
+        
+    def setup_themes(self):
+        # Configure custom styles
+        self.style.configure("Accent.TButton", font=("Segoe UI", 10, "bold"))
+        
+    def set_syntax_colors(self, theme):
+        for highlighter in (self.python_highlighter, self.java_highlighter):
+            highlighter.set_colors(SYNTAX_COLORS[theme])
+    
+    def conversion_options(self):
+        """Snapshot the GUI option widgets into engine options"""
+        return ConversionOptions(
+            class_name=self.class_name_var.get() or "Main",
+            add_imports=self.add_imports_var.get(),
+            add_main=self.add_main_var.get(),
+            infer_types=self.infer_types_var.get(),
+            specialize_collections=self.specialize_collections_var.get(),
+            comprehensions="loops" if self.comprehension_loops_var.get() else "streams",
+            incremental=True
+        )
+    
+    def conversion_hash(self, python_code):
+        """Hash of the buffer and every option that affects the output"""
+        options = self.conversion_options()
+        key = f"{sorted(vars(options).items())}|{python_code}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+    
+    def convert(self, skip_unchanged=False):
+        """Perform the conversion"""
+        if self.large_file is not None:
+            # Auto-convert never starts a conversion to disk by itself
+            if not skip_unchanged:
+                self.convert_large_file()
+            return
+        
+        raw_code = self.python_text.get("1.0", "end-1c")
+        python_code = raw_code.strip()
+        
+        if not python_code:
+            self.status_var.set("No Python code to convert")
+            return
+        
+        buffer_hash = self.conversion_hash(python_code)
+        if skip_unchanged and buffer_hash == self.last_conversion_hash:
+            return
+        
+        options = self.conversion_options()
+        # Only explicit conversions are kept; every paused keystroke would flood the cache
+        # and the history
+        explicit = not skip_unchanged
+        generation = self.worker.submit(python_code, options, store=explicit)
+        # Only the newest request is kept; older ones are stale by definition
+        line_offset = raw_code[:len(raw_code) - len(raw_code.lstrip())].count("\n")
+        self.pending_conversion = (generation, python_code, buffer_hash, line_offset, explicit)
+        self.status_var.set("Converting… (Esc to cancel)")
+    
+    def cancel_conversion(self):
+        """Cancel a conversion that is taking too long"""
+        if self.large_file_cancel is not None:
+            self.large_file_cancel.set()
+            self.status_var.set("Cancelling large-file conversion…")
+        if self.worker.is_busy():
+            self.worker.cancel()
+            self.status_var.set("Cancelling conversion…")
+    
+    def on_conversion_done(self, generation, result):
+        """Called on the worker thread; hand the result to the Tk thread"""
+        self.root.after_idle(self.apply_conversion, generation, result)
+    
+    def apply_conversion(self, generation, result):
+        """Apply a finished conversion to the widgets unless it is stale"""
+        if self.pending_conversion is None or generation != self.pending_conversion[0]:
+            return
+        _, python_code, buffer_hash, line_offset, explicit = self.pending_conversion
+        self.pending_conversion = None
+        
+        if result is None:
+            self.status_var.set("Conversion cancelled")
+            return
+        if isinstance(result, Exception):
+            messagebox.showerror("Conversion Error", f"An error occurred during conversion:\n{str(result)}")
+            self.status_var.set("Conversion failed")
+            return
+        
+        try:
+            java_code = result.java_code
+            self.last_conversion_hash = buffer_hash
+            self.python_line_offset = line_offset
+            render_started = time.perf_counter()
+            
+            # Update only the changed lines of the Java text
+            self.java_updater.set_text(java_code)
+            
+            # Update explanation; entries are formatted only as they scroll into view
+            self.clear_explained_lines()
+            self.explanation_panel.set_log(result.explanations)
+            
+            timings = dict(result.timings)
+            timings["render"] = (time.perf_counter() - render_started) * 1000
+            
+            if explicit:
+                # Add to history; formatting the explanations and compressing the body
+                # is too slow to repeat on every paused keystroke
+                history_started = time.perf_counter()
+                self.conversion_history.add(datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                            python_code, java_code, result.explanations, timings)
+                self.refresh_history_list()
+                timings["history"] = (time.perf_counter() - history_started) * 1000
+            
+            self.status_var.set(f"Conversion completed - {len(java_code.splitlines())} lines generated"
+                                f" ({self.format_timings(timings)})")
+            
+        except Exception as e:
+            messagebox.showerror("Conversion Error", f"An error occurred during conversion:\n{str(e)}")
+            self.status_var.set("Conversion failed")
+    
+    def on_java_click(self, event):
+        """Select the explanation of the clicked Java line"""
+        line = int(self.java_text.index(f"@{event.x},{event.y}").split(".")[0])
+        self.explanation_panel.select_java_line(line)
+    
+    def clear_explained_lines(self):
+        self.java_text.tag_remove("explained", "1.0", "end")
+        self.python_text.tag_remove("explained", "1.0", "end")
+    
+    def show_explained_lines(self, entry):
+        """Highlight the Python and Java lines an explanation refers to"""
+        self.clear_explained_lines()
+        if entry.java_start is not None:
+            self.java_text.tag_add("explained", f"{entry.java_start}.0", f"{entry.java_end}.end")
+            self.java_text.see(f"{entry.java_start}.0")
+        if entry.python_line is not None:
+            line = entry.python_line + self.python_line_offset
+            self.python_text.tag_add("explained", f"{line}.0", f"{line}.end")
+            self.python_text.see(f"{line}.0")
+    
+    def format_timings(self, timings):
+        """Render phase timings as e.g. 'parse 12ms / convert 80ms / render 300ms'"""
+        return " / ".join(f"{phase} {ms:.0f}ms" for phase, ms in timings.items())
+    
+    def export_timings(self):
+        """Export per-conversion phase timings from the history as JSON"""
+        if not self.conversion_history:
+            messagebox.showinfo("Export Timings", "No conversion history available")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            title="Export Conversion Timings",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filename:
+            records = [
+                {
+                    'timestamp': entry.timestamp,
+                    'java_lines': entry.java_lines,
+                    'timings_ms': entry.timings
+                }
+                for entry in self.conversion_history
+            ]
+            try:
+                with open(filename, 'w', encoding='utf-8') as file:
+                    json.dump(records, file, indent=2)
+                    self.status_var.set(f"Timings exported: {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not export timings:\n{str(e)}")
+    
+    def on_python_change(self, event=None):
+        """Auto-convert once typing has paused, if enabled"""
+        if self.auto_convert_var.get():
+            try:
+                self.scheduler.quiet_ms = max(0, int(self.auto_convert_delay_var.get()))
+            except (tk.TclError, ValueError):
+                pass  # Keep the previous delay while the field holds a partial number
+            self.scheduler.schedule()
+    
+    def load_python_file(self):
+        """Load Python file"""
+        filename = filedialog.askopenfilename(
+            title="Open Python File",
+            filetypes=[("Python files", "*.py"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                size = os.path.getsize(filename)
+                if size > LARGE_FILE_BYTES:
+                    self.open_large_file(filename, size)
+                    return
+                with open(filename, 'r', encoding='utf-8') as file:
+                    content = file.read()
+                    self.leave_large_file_mode()
+                    self.python_text.delete("1.0", "end")
+                    self.python_text.insert("1.0", content)
+                    self.status_var.set(f"Loaded: {filename}")
+                    if self.auto_convert_var.get():
+                        self.convert()
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not load file:\n{str(e)}")
+    
+    def open_large_file(self, filename, size):
+        """Show a read-only preview of a file too large for the editors"""
+        preview, truncated = read_preview(filename)
+        self.scheduler.cancel()
+        self.large_file = filename
+        self.python_text.config(state="normal")
+        self.python_text.delete("1.0", "end")
+        self.python_text.insert("1.0", preview)
+        self.python_text.config(state="disabled")
+        self.java_updater.clear()
+        self.explanation_panel.clear()
+        self.last_conversion_hash = None
+        preview_lines = preview.count("\n") + 1
+        shown = f"first {preview_lines} lines shown" if truncated else "read-only"
+        self.status_var.set(f"Large file ({size / (1024 * 1024):.1f} MB, {shown}) - "
+                            "Convert writes the Java file straight to disk")
+    
+    def leave_large_file_mode(self):
+        """Make the Python editor editable again after a large-file preview"""
+        if self.large_file is not None:
+            self.large_file = None
+            self.python_text.config(state="normal")
+    
+    def large_file_preview_only(self, action):
+        """Refuse editor actions that would only see the preview of a large file"""
+        if self.large_file is None:
+            return False
+        self.status_var.set(f"{action} is not available in large-file mode; the editors only hold a preview")
+        return True
+    
+    def convert_large_file(self):
+        """Stream the open large file to a Java file on a background thread"""
+        if self.large_file_cancel is not None:
+            self.status_var.set("A large-file conversion is already running (Esc to cancel)")
+            return
+        source = self.large_file
+        stem = os.path.splitext(os.path.basename(source))[0]
+        filename = filedialog.asksaveasfilename(
+            title="Convert to Java File",
+            defaultextension=".java",
+            initialdir=os.path.dirname(source),
+            initialfile=java_class_name(stem) + ".java",
+            filetypes=[("Java files", "*.java"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        options = self.conversion_options()
+        # The public class has to match the name of the file it is written to
+        class_name = os.path.splitext(os.path.basename(filename))[0]
+        if class_name.isidentifier():
+            options.class_name = class_name
+        
+        cancel = threading.Event()
+        self.large_file_cancel = cancel
+        self.progress_bar["value"] = 0
+        self.progress_bar.pack(side="bottom", fill="x")
+        self.status_var.set(f"Converting {os.path.basename(source)}… (Esc to cancel)")
+        threading.Thread(target=self.run_large_file_conversion, daemon=True,
+                         args=(source, filename, options, cancel)).start()
+    
+    def run_large_file_conversion(self, source, filename, options, cancel):
+        """Thread body; progress and the outcome are handed to the Tk thread"""
+        reported = -1
+        
+        def progress(done_bytes, total_bytes):
+            nonlocal reported
+            percent = done_bytes * 100 // total_bytes if total_bytes else 100
+            # One Tk callback per percent rather than per statement
+            if percent != reported:
+                reported = percent
+                self.root.after_idle(self.on_large_file_progress, cancel, percent)
+        
+        try:
+            outcome = StreamingConverter(options).convert_file(source, filename, progress, cancel.is_set)
+        except ConversionCancelled:
+            outcome = None
+        except Exception as e:
+            outcome = e
+        self.root.after_idle(self.on_large_file_done, source, filename, outcome)
+    
+    def on_large_file_progress(self, cancel, percent):
+        if cancel is self.large_file_cancel and not cancel.is_set():
+            self.progress_bar["value"] = percent
+            self.status_var.set(f"Converting large file… {percent}% (Esc to cancel)")
+    
+    def on_large_file_done(self, source, filename, outcome):
+        """Report a finished large-file conversion and preview its output"""
+        self.large_file_cancel = None
+        self.progress_bar.pack_forget()
+        if outcome is None:
+            self.status_var.set("Conversion cancelled")
+            return
+        if isinstance(outcome, Exception):
+            messagebox.showerror("Conversion Error", f"An error occurred during conversion:\n{str(outcome)}")
+            self.status_var.set("Conversion failed")
+            return
+        if not outcome.ok:
+            messagebox.showerror("Conversion Error", outcome.error)
+            self.status_var.set(f"Conversion failed: {outcome.error}")
+            return
+        
+        if self.large_file == source:
+            preview, truncated = read_preview(filename)
+            self.java_updater.set_text(preview)
+        seconds = sum(outcome.timings.values()) / 1000
+        unsupported = sum(outcome.unsupported.values())
+        self.status_var.set(f"Converted {outcome.statements} statements into {outcome.java_lines} Java lines "
+                            f"in {seconds:.1f}s ({unsupported} unsupported): {filename}")
+    
+    def save_python_file(self):
+        """Save Python code"""
+        if self.large_file_preview_only("Saving Python"):
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Save Python File",
+            defaultextension=".py",
+            filetypes=[("Python files", "*.py"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                with open(filename, 'w', encoding='utf-8') as file:
+                    file.write(self.python_text.get("1.0", "end-1c"))
+                    self.status_var.set(f"Saved: {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not save file:\n{str(e)}")
+    
+    def save_java_file(self):
+        """Save Java code"""
+        if self.large_file_preview_only("Saving Java"):
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Save Java File",
+            defaultextension=".java",
+            filetypes=[("Java files", "*.java"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                with open(filename, 'w', encoding='utf-8') as file:
+                    file.write(self.java_updater.text())
+                    self.status_var.set(f"Saved: {filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not save file:\n{str(e)}")
+    
+    def copy_java(self):
+        """Copy Java code to clipboard"""
+        java_code = self.java_updater.text()
+        if java_code.strip():
+            self.root.clipboard_clear()
+            self.root.clipboard_append(java_code)
+            self.status_var.set("Java code copied to clipboard")
+        else:
+            self.status_var.set("No Java code to copy")
+    
+    def clear_python(self):
+        """Clear Python editor"""
+        self.leave_large_file_mode()
+        self.python_text.delete("1.0", "end")
+        self.java_updater.clear()
+        self.explanation_panel.clear()
+        self.last_conversion_hash = None
+        self.status_var.set("Cleared")
+    
+    def new_file(self):
+        """Create new file"""
+        self.clear_python()
+        self.load_sample_code()
+    
+    def validate_python(self):
+        """Validate Python syntax"""
+        if self.large_file_preview_only("Validation"):
+            return
+        python_code = self.python_text.get("1.0", "end-1c").strip()
+        if not python_code:
+            messagebox.showwarning("Validation", "No Python code to validate")
+            return
+        
+        try:
+            self.parse_cache.parse(python_code)
+            messagebox.showinfo("Validation", "✅ Python syntax is valid!")
+            self.status_var.set("Python syntax validated successfully")
+        except SyntaxError as e:
+            messagebox.showerror("Validation Error", 
+                               f"❌ Python syntax error:\nLine {e.lineno}: {e.msg}")
+            self.status_var.set(f"Syntax error at line {e.lineno}")
+    
+    def format_python(self):
+        """Basic Python code formatting
+        
+        The formatter only looks at lines, so when the buffer parses, the
+        result must parse to the same tree or it is not applied. Both
+        trees go through the parse cache, so converting the formatted
+        buffer afterwards does not parse it again.
+        """
+        if self.large_file_preview_only("Formatting"):
+            return
+        python_code = self.python_text.get("1.0", "end-1c")
+        if not python_code.strip():
+            return
+        
+        try:
+            # Simple formatting - remove extra blank lines and normalize indentation
+            lines = python_code.split('\n')
+            formatted_lines = []
+            indent_level = 0
+            
+            for line in lines:
+                stripped = line.strip()
+                if not stripped:
+                    if formatted_lines and formatted_lines[-1].strip():
+                        formatted_lines.append('')
+                    continue
+                
+                # Adjust indent level
+                if stripped.endswith(':'):
+                    formatted_lines.append('    ' * indent_level + stripped)
+                    indent_level += 1
+                elif stripped in ['else:', 'elif', 'except:', 'finally:']:
+                    indent_level = max(0, indent_level - 1)
+                    formatted_lines.append('    ' * indent_level + stripped)
+                    indent_level += 1
+                elif stripped.startswith(('return', 'break', 'continue', 'pass')) and indent_level > 0:
+                    formatted_lines.append('    ' * indent_level + stripped)
+                else:
+                    formatted_lines.append('    ' * indent_level + stripped)
+            
+            formatted_code = '\n'.join(formatted_lines)
+            if self.changes_program(python_code.strip(), formatted_code.strip()):
+                messagebox.showwarning("Format", "Formatting would change what this code does; "
+                                                 "the indentation was left as it is.")
+                self.status_var.set("Python code not formatted")
+                return
+            self.python_text.delete("1.0", "end")
+            self.python_text.insert("1.0", formatted_code)
+            self.status_var.set("Python code formatted")
+            
+        except Exception as e:
+            messagebox.showerror("Format Error", f"Could not format code:\n{str(e)}")
+    
+    def changes_program(self, python_code, formatted_code):
+        """Whether valid python_code parses differently once formatted"""
+        try:
+            before = self.parse_cache.parse(python_code)
+        except SyntaxError:
+            # Nothing to preserve; the formatter may well be fixing it
+            return False
+        try:
+            after = self.parse_cache.parse(formatted_code)
+        except SyntaxError:
+            return True
+        return ast.dump(before) != ast.dump(after)
+    
+    def show_cache_stats(self):
+        """Show conversion cache size and hit rate"""
+        if self.cache is None:
+            messagebox.showinfo("Cache Statistics", "The conversion cache is disabled")
+            return
+        messagebox.showinfo("Cache Statistics", self.cache.format_stats())
+    
+    def clear_cache(self):
+        """Remove every cached conversion"""
+        if self.cache is None:
+            return
+        if messagebox.askyesno("Clear Cache", "Remove all cached conversions?"):
+            self.cache.clear()
+            self.status_var.set("Conversion cache cleared")
+    
+    def toggle_theme(self):
+        """Toggle between light and dark themes"""
+        if self.current_theme == "light":
+            # Dark theme
+            self.style.configure("TFrame", background="#2d2d2d")
+            self.style.configure("TLabel", background="#2d2d2d", foreground="#ffffff")
+            self.style.configure("TButton", background="#404040", foreground="#ffffff")
+            self.python_text.config(bg="#1e1e1e", fg="#ffffff", insertbackground="#ffffff")
+            self.java_text.config(bg="#1e1e1e", fg="#ffffff")
+            self.explanation_text.config(bg="#1e1e1e", fg="#ffffff")
+            self.set_syntax_colors("dark")
+            self.current_theme = "dark"
+            self.status_var.set("Switched to dark theme")
+        else:
+            # Light theme
+            self.style.configure("TFrame", background="#f0f0f0")
+            self.style.configure("TLabel", background="#f0f0f0", foreground="#000000")
+            self.style.configure("TButton", background="#e1e1e1", foreground="#000000")
+            self.python_text.config(bg="#ffffff", fg="#000000", insertbackground="#000000")
+            self.java_text.config(bg="#f8f8f8", fg="#000000")
+            self.explanation_text.config(bg="#ffffff", fg="#000000")
+            self.set_syntax_colors("light")
+            self.current_theme = "light"
+            self.status_var.set("Switched to light theme")
+    
+    def show_history(self):
+        """Show conversion history"""
+        if not self.conversion_history:
+            messagebox.showinfo("History", "No conversion history available")
+            return
+        
+        if self.history_window is not None:
+            self.history_window.deiconify()
+            self.history_window.lift()
+            return
+        
+        history_window = tk.Toplevel(self.root)
+        history_window.title("Conversion History")
+        history_window.geometry("800x600")
+        # Hide rather than destroy, so reopening only adds the new rows
+        history_window.protocol("WM_DELETE_WINDOW", history_window.withdraw)
+        
+        # History listbox
+        frame = ttk.Frame(history_window)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        ttk.Label(frame, text="Conversion History:", font=("Segoe UI", 12, "bold")).pack(anchor="w")
+        
+        listbox_frame = ttk.Frame(frame)
+        listbox_frame.pack(fill="both", expand=True, pady=(10, 0))
+        
+        scrollbar = ttk.Scrollbar(listbox_frame)
+        scrollbar.pack(side="right", fill="y")
+        
+        history_listbox = tk.Listbox(listbox_frame, yscrollcommand=scrollbar.set, font=("Consolas", 10))
+        history_listbox.pack(fill="both", expand=True)
+        scrollbar.config(command=history_listbox.yview)
+        
+        ttk.Label(frame, text="Double-click an entry to view details", 
+                 font=("Segoe UI", 9)).pack(pady=(10, 0))
+        
+        self.history_window = history_window
+        self.history_listbox = history_listbox
+        self.history_shown_id = self.conversion_history.first_id - 1
+        self.refresh_history_list()
+        history_listbox.bind('<Double-1>', self.on_history_select)
+    
+    def refresh_history_list(self):
+        """Sync the history listbox (newest first) by adding and removing rows at its ends"""
+        listbox = self.history_listbox
+        if listbox is None:
+            return
+        history = self.conversion_history
+        # Rows of entries that fell out of the history are at the bottom
+        newest_id = history.next_id - 1
+        first_shown = self.history_shown_id - listbox.size() + 1
+        if first_shown < history.first_id:
+            stale = min(history.first_id - first_shown, listbox.size())
+            listbox.delete(listbox.size() - stale, "end")
+        new_ids = range(max(self.history_shown_id + 1, history.first_id), newest_id + 1)
+        if new_ids:
+            rows = [f"{entry.timestamp}: {entry.label}" for entry in map(history.get, new_ids)]
+            listbox.insert(0, *reversed(rows))
+        self.history_shown_id = newest_id
+    
+    def on_history_select(self, event):
+        """Load the double-clicked entry's body and show its details"""
+        selection = self.history_listbox.curselection()
+        if not selection:
+            return
+        entry = self.conversion_history.get(self.history_shown_id - selection[0])
+        if entry is None:
+            return
+        try:
+            body = self.conversion_history.load(entry)
+        except Exception as e:
+            messagebox.showerror("History", f"Could not load history entry:\n{str(e)}")
+            return
+        
+        # Show details
+        details_window = tk.Toplevel(self.history_window)
+        details_window.title(f"Conversion Details - {entry.timestamp}")
+        details_window.geometry("1000x700")
+        
+        notebook = ttk.Notebook(details_window)
+        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Python tab
+        py_frame = ttk.Frame(notebook)
+        notebook.add(py_frame, text="Python Code")
+        py_text = scrolledtext.ScrolledText(py_frame, font=("Consolas", 10))
+        py_text.pack(fill="both", expand=True)
+        py_text.insert("1.0", body['python_code'])
+        py_text.config(state="disabled")
+        
+        # Java tab
+        java_frame = ttk.Frame(notebook)
+        notebook.add(java_frame, text="Java Code")
+        java_text = scrolledtext.ScrolledText(java_frame, font=("Consolas", 10))
+        java_text.pack(fill="both", expand=True)
+        java_text.insert("1.0", body['java_code'])
+        java_text.config(state="disabled")
+        
+        # Explanation tab
+        expl_frame = ttk.Frame(notebook)
+        notebook.add(expl_frame, text="Explanation")
+        expl_text = scrolledtext.ScrolledText(expl_frame, font=("Segoe UI", 10))
+        expl_text.pack(fill="both", expand=True)
+        expl_text.insert("1.0", body['explanation'])
+        expl_text.config(state="disabled")
+    
+    def show_about(self):
+        """Show about dialog"""
+        about_text = """
+Pyjama Pro - Advanced Python to Java Converter
+Version 2.0
+
+Features:
+• Enhanced Python to Java conversion
+• Syntax validation and formatting
+• Dark/Light theme support
+• Conversion history
+• File operations (load/save)
+• Auto-conversion mode
+• Comprehensive error handling
+
+Supported Python constructs:
+• Variables and assignments
+• Functions and methods
+• Control flow (if/else, loops)
+• Basic data types
+• Mathematical operations
+• Print statements and more
+
+Created with ❤️ using Python and Tkinter
+        """
+        messagebox.showinfo("About Pyjama Pro", about_text)
+    
+    def show_features(self):
+        """Show supported features"""
+        features_window = tk.Toplevel(self.root)
+        features_window.title("Supported Python Features")
+        features_window.geometry("700x500")
+        
+        notebook = ttk.Notebook(features_window)
+        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Basic constructs
+        basic_frame = ttk.Frame(notebook)
+        notebook.add(basic_frame, text="Basic Constructs")
+        
+        basic_text = scrolledtext.ScrolledText(basic_frame, wrap="word", font=("Segoe UI", 10))
+        basic_text.pack(fill="both", expand=True)
+        basic_text.insert("1.0", """
+✅ Variables and Assignments
+- Simple assignments: x = 5
+- Augmented assignments: x += 1
+- Type inference: int, double, String, boolean
+
+✅ Data Types
+- Integers: 42 → int
+- Floats: 3.14 → double  
+- Strings: "hello" → String
+- f-strings: f"x = {x:.2f}" → "x = " + String.format("%.2f", x)
+- Booleans: True/False → true/false
+- None → null
+- With "Specialize collections": fixed-size numeric lists → int[]/double[],
+  other uniform lists → ArrayList<Integer> etc., dicts → pre-sized HashMap<K, V>
+
+✅ Operators
+- Arithmetic: +, -, *, /, %
+- Comparison: ==, !=, <, <=, >, >=
+- Power: ** → Math.pow()
+
+✅ Print Statements
+- print("hello") → System.out.println("hello")
+- print(variable) → System.out.println(variable)
+        """)
+        basic_text.config(state="disabled")
+        
+        # Control flow
+        control_frame = ttk.Frame(notebook)
+        notebook.add(control_frame, text="Control Flow")
+        
+        control_text = scrolledtext.ScrolledText(control_frame, wrap="word", font=("Segoe UI", 10))
+        control_text.pack(fill="both", expand=True)
+        control_text.insert("1.0", """
+✅ Conditional Statements
+- if/else statements
+- elif chains → else if, of any length
+- Nested conditions
+
+✅ Loops
+- for i in range(n) → for (int i = 0; i < n; i++)
+- for item in list → for (Object item : list)
+- while loops
+- s += ... on a string inside a loop → one StringBuilder per loop
+- break and continue statements
+
+✅ Comprehensions
+- [x * x for x in xs], {x for ...}, {k: v for ...} → Stream pipelines collected
+  into ArrayList/HashSet/HashMap; generator expressions → lazy Streams
+- range() sources → IntStream.range(); if clauses → filter(); nested for → flatMap()
+- sum/any/all/min/max(x for x in xs) → one pass, no intermediate collection
+- With "Comprehensions as loops": assignments and returns → plain loops into
+  pre-sized collections, and reductions → one loop (any/all stop early)
+
+✅ Functions
+- def function_name() → public static void function_name()
+- Parameter and return types inferred from call sites and returns
+  (def fibonacci(n) → public static int fibonacci(int n))
+- Function calls
+        """)
+        control_text.config(state="disabled")
+        
+        # Built-in functions
+        builtin_frame = ttk.Frame(notebook)
+        notebook.add(builtin_frame, text="Built-in Functions")
+        
+        builtin_text = scrolledtext.ScrolledText(builtin_frame, wrap="word", font=("Segoe UI", 10))
+        builtin_text.pack(fill="both", expand=True)
+        builtin_text.insert("1.0", """
+✅ Supported Built-in Functions
+- len() → .size()
+- str() → String.valueOf()
+- int() → Integer.parseInt()
+- float() → Double.parseDouble()
+- abs() → Math.abs()
+- max() → Math.max()
+- min() → Math.min()
+- range() → for loop conversion
+- sum(), any(), all() of a comprehension → fused into one pass
+
+❌ Not Yet Supported
+- Comprehensions unpacking tuples (for k, v in ...)
+- Lambda functions
+- Classes and objects
+- Exception handling (try/catch)
+- Import statements
+- File I/O operations
+        """)
+        builtin_text.config(state="disabled")
+    
+    def load_sample_code(self):
+        """Load sample Python code"""
+        self.leave_large_file_mode()
+        sample_code = '''# Sample Python code for conversion
+def calculate_factorial(n):
+    if n <= 1:
+        return 1
+    else:
+        return n * calculate_factorial(n - 1)
+
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n - 1) + fibonacci(n - 2)
+
+# Main execution
+num = 5
+print("Factorial of", num, "is", calculate_factorial(num))
+
+print("Fibonacci sequence:")
+for i in range(10):
+    print(fibonacci(i), end=" ")
+
+# Variables and operations
+x = 10
+y = 20
+result = x + y * 2
+print("\\nResult:", result)
+
+# Conditional logic
+if result > 50:
+    print("Result is large")
+elif result > 25:
+    print("Result is medium")
+else:
+    print("Result is small")
+
+# Loop example
+count = 0
+while count < 3:
+    print("Count:", count)
+    count += 1
+'''
+        
+        self.python_text.delete("1.0", "end")
+        self.python_text.insert("1.0", sample_code)
+        if self.auto_convert_var.get():
+            self.root.after(500, self.convert)
+    
+    def run(self):
+        """Start the application"""
+        self.root.mainloop()
+        if self.cache is not None:
+            try:
+                self.cache.flush_stats()
+            except OSError:
+                pass
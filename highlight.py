@@ -0,0 +1,117 @@
+"""Line-at-a-time lexers for syntax highlighting
+
+Each lexer takes one line and the state the previous line ended in, and
+returns (spans, state): spans are (tag, start column, end column) and
+state is what the next line starts in. States are plain values that
+compare equal when the lexer is in the same situation (None outside any
+multi-line construct), so a highlighter can cache them at line
+boundaries and stop re-lexing once a changed line ends in the state it
+ended in before.
+"""
+import builtins
+import keyword
+import re
+
+from engine import JAVA_KEYWORDS
+
+# Tags produced by the lexers, in the order a highlighter configures them
+TAGS = ("keyword", "builtin", "number", "string", "comment")
+
+PYTHON_KEYWORDS = frozenset(keyword.kwlist)
+PYTHON_BUILTINS = frozenset(name for name in dir(builtins) if not name.startswith("_"))
+PYTHON_TOKENS = re.compile(r"""
+    (?P<comment>\#.*)
+  | (?P<triple>(?<!\w)[rRbBuUfF]{0,2}(?:\"\"\"|'''))
+  | (?P<string>(?<!\w)[rRbBuUfF]{0,2}(?:"(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?))
+  | (?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?[jJ]?))
+  | (?P<word>\b[A-Za-z_]\w*)
+""", re.VERBOSE)
+TRIPLE_END = {
+    '"""': re.compile(r'(?:\\.|[^\\])*?"""'),
+    "'''": re.compile(r"(?:\\.|[^\\])*?'''"),
+}
+
+JAVA_BUILTINS = frozenset("""
+    ArrayList Arrays BigDecimal BigInteger Boolean Character Collections Collectors Double
+    Exception Float HashMap HashSet Integer IntStream Iterator LinkedHashMap LinkedHashSet
+    List Long Map Math Object Optional RuntimeException Scanner Set Stream String
+    StringBuilder System
+""".split())
+JAVA_TOKENS = re.compile(r"""
+    (?P<comment>//.*)
+  | (?P<block>/\*)
+  | (?P<string>"(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?)
+  | (?P<number>\b(?:0[xXbB][\da-fA-F_]+[lL]?|\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?[lLfFdD]?))
+  | (?P<word>\b[A-Za-z_$][\w$]*)
+""", re.VERBOSE)
+# State of a Java line ending inside a /* comment */
+IN_COMMENT = "/*"
+
+
+def python_line(line, state=None):
+    """Lex one line of Python; the state is the open triple quote, if any"""
+    spans = []
+    position = 0
+    if state is not None:
+        end = TRIPLE_END[state].match(line)
+        if end is None:
+            return [("string", 0, len(line))], state
+        spans.append(("string", 0, end.end()))
+        position = end.end()
+    while True:
+        token = PYTHON_TOKENS.search(line, position)
+        if token is None:
+            return spans, None
+        kind = token.lastgroup
+        position = token.end()
+        if kind == "word":
+            word = token.group()
+            if word in PYTHON_KEYWORDS:
+                kind = "keyword"
+            elif word in PYTHON_BUILTINS:
+                kind = "builtin"
+            else:
+                continue
+        elif kind == "triple":
+            delimiter = line[position - 3:position]
+            end = TRIPLE_END[delimiter].match(line, position)
+            if end is None:
+                spans.append(("string", token.start(), len(line)))
+                return spans, delimiter
+            position = end.end()
+            kind = "string"
+        spans.append((kind, token.start(), position))
+
+
+def java_line(line, state=None):
+    """Lex one line of Java; the state is IN_COMMENT inside a block comment"""
+    spans = []
+    position = 0
+    if state is not None:
+        end = line.find("*/")
+        if end < 0:
+            return [("comment", 0, len(line))], state
+        position = end + 2
+        spans.append(("comment", 0, position))
+    while True:
+        token = JAVA_TOKENS.search(line, position)
+        if token is None:
+            return spans, None
+        kind = token.lastgroup
+        position = token.end()
+        if kind == "word":
+            word = token.group()
+            if word in JAVA_KEYWORDS:
+                kind = "keyword"
+            elif word in JAVA_BUILTINS:
+                kind = "builtin"
+            else:
+                continue
+        elif kind == "block":
+            end = line.find("*/", position)
+            if end < 0:
+                spans.append(("comment", token.start(), len(line)))
+                return spans, IN_COMMENT
+            position = end + 2
+            kind = "comment"
+        spans.append((kind, token.start(), position))
@@ -0,0 +1,151 @@
+"""Bounded conversion history with compressed bodies spilled to disk
+
+Only a short summary of each conversion stays in memory. The bodies
+(Python source, Java code and explanation text) are zlib-compressed; the
+newest few are kept in a ring buffer and older ones are appended to
+segment files in a temporary directory, from which they are read back
+only when asked for. Whole segments are deleted once every entry in them
+has dropped out of the history.
+"""
+import json
+import os
+import tempfile
+import zlib
+from collections import deque
+
+# Number of characters of the Python source shown in history rows
+LABEL_LENGTH = 100
+
+
+class HistoryEntry:
+    """Summary of one conversion; the body lives in memory or a segment file"""
+
+    __slots__ = ("id", "timestamp", "label", "java_lines", "timings",
+                 "body", "segment", "offset", "length")
+
+    def __init__(self, entry_id, timestamp, label, java_lines, timings, body):
+        self.id = entry_id
+        self.timestamp = timestamp
+        self.label = label
+        self.java_lines = java_lines
+        self.timings = timings
+        # Compressed body while resident, None once spilled to `segment`
+        self.body = body
+        self.segment = None
+        self.offset = 0
+        self.length = 0
+
+
+class ConversionHistory:
+    """Newest max_entries conversions, of which memory_entries keep their body in memory"""
+
+    def __init__(self, max_entries=5000, memory_entries=20, segment_entries=256):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.segment_entries = segment_entries
+        self.entries = deque()
+        # Entries whose body is still in memory, oldest first
+        self.resident = deque()
+        self.next_id = 0
+        self.directory = None
+        # Segment number -> entries of the history still stored in it
+        self.segment_live = {}
+        self.segment = None
+        self.segment_count = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @property
+    def first_id(self):
+        """Id of the oldest entry still in the history"""
+        return self.entries[0].id if self.entries else self.next_id
+
+    def add(self, timestamp, python_code, java_code, explanation, timings):
+        """Record a conversion; explanation is anything str() turns into text"""
+        label = python_code[:LABEL_LENGTH].replace("\n", " ")
+        if len(python_code) > LABEL_LENGTH:
+            label += "..."
+        body = zlib.compress(json.dumps({
+            "python_code": python_code,
+            "java_code": java_code,
+            "explanation": str(explanation),
+        }).encode("utf-8"))
+        entry = HistoryEntry(self.next_id, timestamp, label, java_code.count("\n") + 1, timings, body)
+        self.next_id += 1
+        self.entries.append(entry)
+        self.resident.append(entry)
+
+        while len(self.resident) > self.memory_entries:
+            self.spill(self.resident.popleft())
+        while len(self.entries) > self.max_entries:
+            self.drop(self.entries.popleft())
+        return entry
+
+    def get(self, entry_id):
+        """Entry with the given id, or None once it has left the history"""
+        index = entry_id - self.first_id
+        if 0 <= index < len(self.entries):
+            return self.entries[index]
+        return None
+
+    def load(self, entry):
+        """Decompressed body of an entry: python_code, java_code and explanation"""
+        if entry.body is not None:
+            data = entry.body
+        else:
+            with open(self.segment_path(entry.segment), 'rb') as file:
+                file.seek(entry.offset)
+                data = file.read(entry.length)
+        return json.loads(zlib.decompress(data))
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory.name, f"history-{segment}.bin")
+
+    def spill(self, entry):
+        """Move an entry's body from memory to the current segment file"""
+        if self.directory is None:
+            self.directory = tempfile.TemporaryDirectory(prefix="pyjama-history-")
+        if self.segment is None or self.segment_count >= self.segment_entries:
+            if self.segment is not None and not self.segment_live[self.segment]:
+                self.remove_segment(self.segment)
+            self.segment = 0 if self.segment is None else self.segment + 1
+            self.segment_count = 0
+            self.segment_live[self.segment] = 0
+        with open(self.segment_path(self.segment), 'ab') as file:
+            entry.offset = file.tell()
+            file.write(entry.body)
+        entry.segment = self.segment
+        entry.length = len(entry.body)
+        entry.body = None
+        self.segment_count += 1
+        self.segment_live[self.segment] += 1
+
+    def drop(self, entry):
+        """Forget an entry, deleting its segment once nothing else uses it"""
+        if entry.body is not None:
+            self.resident.remove(entry)
+            return
+        self.segment_live[entry.segment] -= 1
+        if not self.segment_live[entry.segment] and entry.segment != self.segment:
+            self.remove_segment(entry.segment)
+
+    def remove_segment(self, segment):
+        del self.segment_live[segment]
+        try:
+            os.remove(self.segment_path(segment))
+        except OSError:
+            pass
+
+    def close(self):
+        """Delete the spilled bodies"""
+        if self.directory is not None:
+            self.directory.cleanup()
+            self.directory = None
+        self.entries.clear()
+        self.resident.clear()
+        self.segment_live.clear()
+        self.segment = None
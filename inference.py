@@ -0,0 +1,683 @@
+"""Scope-aware type inference pre-pass for the conversion engine
+
+Walks a parsed module before conversion, building a symbol table per
+scope and propagating Java types through assignments, arithmetic, calls
+and returns. Parameter types come from the arguments at every call site
+and return types from every return statement. A worklist re-walks only
+the scopes affected when a parameter or return type widens, until
+nothing changes, so recursive functions settle too.
+"""
+import ast
+from collections import deque
+
+# Numeric types in widening order
+NUMERIC_RANK = {"int": 0, "long": 1, "double": 2}
+INT_MIN, INT_MAX = -2147483648, 2147483647
+
+# Result types of builtins whose type does not depend on their arguments
+BUILTIN_RESULT_TYPES = {
+    "len": "int",
+    "str": "String",
+    "int": "int",
+    "float": "double",
+    "print": None,
+    "range": None,
+}
+# Builtins reducing an iterable to one value; a comprehension argument is
+# fused with them into a single pass
+REDUCTIONS = ("sum", "any", "all", "min", "max")
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def join_types(a, b):
+    """Least common Java type of a and b; None means 'not known yet'"""
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    if a in NUMERIC_RANK and b in NUMERIC_RANK:
+        return a if NUMERIC_RANK[a] > NUMERIC_RANK[b] else b
+    return "Object"
+
+
+def literal_type(value):
+    """Java type of a Python constant"""
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "int" if INT_MIN <= value <= INT_MAX else "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, str):
+        return "String"
+    return "Object"
+
+
+class Scope:
+    """Variable types of one function body (or of the module)"""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.types = {}
+
+    def lookup(self, name):
+        scope = self
+        while scope is not None:
+            if name in scope.types:
+                return scope.types[name]
+            scope = scope.parent
+        return None
+
+    def assign(self, name, java_type):
+        self.types[name] = join_types(self.types.get(name), java_type)
+
+
+class FunctionSignature:
+    """Inferred Java signature of a top-level function"""
+
+    __slots__ = ("name", "params", "return_type")
+
+    def __init__(self, name, params, return_type):
+        self.name = name
+        self.params = params
+        self.return_type = return_type
+
+    def java_params(self):
+        return ", ".join(f"{java_type} {name}" for name, java_type in self.params)
+
+    def __str__(self):
+        return f"{self.return_type} {self.name}({self.java_params()})"
+
+
+class SymbolTable:
+    """Inferred types for every scope of one module"""
+
+    # Safety bound on re-walks per scope; the type lattice is shallow
+    MAX_PASSES = 20
+
+    def __init__(self, tree, project=None, collections=None):
+        # Signatures and constants of other project modules (see project.ProjectContext)
+        self.project = project
+        # CollectionAnalysis of an earlier pass; the Java types it chose for
+        # list and dict variables replace the boxed ones of their literals
+        self.collections = collections
+        self.functions = {
+            node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)
+        }
+        self.param_types = {
+            name: [None] * len(node.args.args) for name, node in self.functions.items()
+        }
+        self.return_types = dict.fromkeys(self.functions)
+        self.returns_value = dict.fromkeys(self.functions, False)
+        # Function name -> scopes (function names, None for module) calling it
+        self.callers = {name: set() for name in self.functions}
+        # FunctionDef node (None for module level) -> Scope of the final pass
+        self.scopes = {}
+        # Comprehension node -> Scope of its loop variables, and the type of
+        # the elements it produces ((key, value) types for a dict comprehension)
+        self.comprehensions = {}
+        self.element_types = {}
+        self._signatures = {}
+        self._digest = None
+        self.analyze(tree)
+
+    def analyze(self, tree):
+        """Walk every scope, then re-walk scopes whose inputs widened until stable"""
+        module_body = [node for node in tree.body if not isinstance(node, ast.FunctionDef)]
+        self.pending = deque([None, *self.functions])
+        self.queued = set(self.pending)
+        budget = self.MAX_PASSES * len(self.pending)
+        first_module_walk = True
+        
+        while self.pending and budget:
+            budget -= 1
+            self.current = self.pending.popleft()
+            self.queued.discard(self.current)
+            if self.current is None:
+                previous = self.scopes[None].types if None in self.scopes else None
+                module_scope = Scope()
+                self.scopes[None] = module_scope
+                self.walk(module_body, module_scope, None)
+                # Functions read module-level variables through their parent scope
+                if not first_module_walk and module_scope.types != previous:
+                    for name in self.functions:
+                        self.enqueue(name)
+                first_module_walk = False
+            else:
+                self.walk_function(self.functions[self.current], self.scopes[None], self.current)
+
+    def enqueue(self, scope_name):
+        if scope_name not in self.queued:
+            self.queued.add(scope_name)
+            self.pending.append(scope_name)
+
+    def walk_function(self, node, parent_scope, name=None):
+        scope = Scope(parent_scope)
+        self.scopes[node] = scope
+        params = self.param_types.get(name) if name else None
+        for index, arg in enumerate(node.args.args):
+            scope.types[arg.arg] = params[index] if params else "Object"
+        self.walk(node.body, scope, name)
+
+    def walk(self, body, scope, function):
+        # Nested blocks go on a stack rather than the call stack, so long
+        # elif chains are walked without recursion
+        blocks = [iter(body)]
+        while blocks:
+            stmt = next(blocks[-1], None)
+            if stmt is None:
+                blocks.pop()
+            elif isinstance(stmt, ast.Assign):
+                value_type = self.expr_type(stmt.value, scope)
+                for target in stmt.targets:
+                    if isinstance(target, ast.Name):
+                        scope.assign(target.id, value_type)
+            elif isinstance(stmt, ast.AugAssign):
+                value_type = self.expr_type(stmt.value, scope)
+                if isinstance(stmt.target, ast.Name):
+                    current = scope.lookup(stmt.target.id)
+                    scope.assign(stmt.target.id, self.binop_type(stmt.op, current, value_type))
+            elif isinstance(stmt, ast.For):
+                is_range = (isinstance(stmt.iter, ast.Call) and isinstance(stmt.iter.func, ast.Name)
+                            and stmt.iter.func.id == "range")
+                self.expr_type(stmt.iter, scope)
+                if isinstance(stmt.target, ast.Name):
+                    scope.assign(stmt.target.id, "int" if is_range else "Object")
+                blocks.append(iter(stmt.orelse))
+                blocks.append(iter(stmt.body))
+            elif isinstance(stmt, (ast.If, ast.While)):
+                self.expr_type(stmt.test, scope)
+                blocks.append(iter(stmt.orelse))
+                blocks.append(iter(stmt.body))
+            elif isinstance(stmt, ast.Return):
+                if stmt.value is not None and function is not None:
+                    self.note_return(function, self.expr_type(stmt.value, scope))
+            elif isinstance(stmt, ast.Expr):
+                self.expr_type(stmt.value, scope)
+            elif isinstance(stmt, ast.FunctionDef):
+                self.walk_function(stmt, scope)
+
+    def note_return(self, function, java_type):
+        widened = join_types(self.return_types[function], java_type)
+        if not self.returns_value[function] or widened != self.return_types[function]:
+            self.returns_value[function] = True
+            self.return_types[function] = widened
+            for caller in self.callers[function]:
+                self.enqueue(caller)
+
+    def note_argument(self, function, index, java_type):
+        params = self.param_types[function]
+        if index < len(params):
+            widened = join_types(params[index], java_type)
+            if widened != params[index]:
+                params[index] = widened
+                self.enqueue(function)
+
+    def binop_type(self, op, left, right):
+        if isinstance(op, ast.Add) and "String" in (left, right):
+            return "String"
+        if isinstance(op, (ast.Div, ast.Pow)):
+            return "double" if left is not None and right is not None else None
+        if left is None or right is None:
+            return None
+        if left in NUMERIC_RANK and right in NUMERIC_RANK:
+            return join_types(left, right)
+        return "Object"
+
+    def expr_type(self, expr, scope):
+        """Java type of an expression, recording call-site argument types on the way
+
+        Sub-expressions are put in reverse Polish order with an explicit
+        stack and typed in one pass, so chains with thousands of operators
+        do not recurse.
+        """
+        if isinstance(expr, ast.Constant):
+            return literal_type(expr.value)
+        if isinstance(expr, ast.Name):
+            return self.name_type(expr, scope)
+        # (node, operand count), every node after its operands once reversed;
+        # the common node types are handled inline
+        nodes = []
+        pending = [expr]
+        while pending:
+            node = pending.pop()
+            kind = type(node)
+            if kind is ast.Name or kind is ast.Constant:
+                nodes.append((node, 0))
+            elif kind is ast.BinOp:
+                nodes.append((node, 2))
+                pending.append(node.left)
+                pending.append(node.right)
+            else:
+                operands = self.operands(node)
+                nodes.append((node, len(operands)))
+                pending.extend(operands)
+        types = []
+        for node, count in reversed(nodes):
+            kind = type(node)
+            if kind is ast.Name:
+                types.append(self.name_type(node, scope))
+            elif kind is ast.Constant:
+                types.append(literal_type(node.value))
+            elif kind is ast.BinOp:
+                right = types.pop()
+                types[-1] = self.binop_type(node.op, types[-1], right)
+            elif count:
+                operand_types = types[-count:]
+                del types[-count:]
+                types.append(self.node_type(node, operand_types, scope))
+            else:
+                types.append(self.node_type(node, (), scope))
+        return types[0]
+
+    def operands(self, expr):
+        """Sub-expressions whose types expr_type needs before typing expr"""
+        if isinstance(expr, (ast.Constant, ast.Name, *COMPREHENSIONS)):
+            # Comprehensions type their parts in a scope of their own
+            return ()
+        if isinstance(expr, ast.BinOp):
+            return (expr.left, expr.right)
+        if isinstance(expr, ast.UnaryOp):
+            return (expr.operand,)
+        if isinstance(expr, ast.Call):
+            operands = [*expr.args, *(keyword.value for keyword in expr.keywords)]
+            if not isinstance(expr.func, ast.Name):
+                operands.append(expr.func)
+            return operands
+        if isinstance(expr, ast.JoinedStr):
+            return [value.value for value in expr.values if isinstance(value, ast.FormattedValue)]
+        if isinstance(expr, ast.List):
+            return expr.elts
+        if isinstance(expr, ast.Dict):
+            return [child for child in expr.keys + expr.values if child is not None]
+        return [child for child in ast.iter_child_nodes(expr) if isinstance(child, ast.expr)]
+
+    def node_type(self, expr, operand_types, scope):
+        """Java type of expr given the types of its operands()"""
+        if isinstance(expr, ast.Constant):
+            return literal_type(expr.value)
+        if isinstance(expr, ast.Name):
+            return self.name_type(expr, scope)
+        if isinstance(expr, ast.BinOp):
+            return self.binop_type(expr.op, *operand_types)
+        if isinstance(expr, ast.UnaryOp):
+            return "boolean" if isinstance(expr.op, ast.Not) else operand_types[0]
+        if isinstance(expr, (ast.Compare, ast.BoolOp)):
+            return "boolean"
+        if isinstance(expr, ast.Call):
+            return self.call_type(expr, operand_types[:len(expr.args)])
+        if isinstance(expr, ast.JoinedStr):
+            return "String"
+        if isinstance(expr, ast.Attribute) and self.project is not None:
+            return self.external_type(expr) or "Object"
+        if isinstance(expr, ast.List):
+            return "ArrayList<Object>"
+        if isinstance(expr, ast.Dict):
+            return "HashMap<Object, Object>"
+        if isinstance(expr, COMPREHENSIONS):
+            return self.comprehension_type(expr, scope)
+        return "Object"
+
+    def comprehension_type(self, expr, scope):
+        """Java type of a comprehension, typing its loop variables in a scope of their own"""
+        inner = Scope(scope)
+        for generator in expr.generators:
+            iterable_type = self.expr_type(generator.iter, inner)
+            if isinstance(generator.target, ast.Name):
+                inner.types[generator.target.id] = self.iteration_type(generator.iter, iterable_type)
+            for condition in generator.ifs:
+                self.expr_type(condition, inner)
+        self.comprehensions[expr] = inner
+        if isinstance(expr, ast.DictComp):
+            key, value = self.expr_type(expr.key, inner), self.expr_type(expr.value, inner)
+            self.element_types[expr] = (key, value)
+            return f"HashMap<{boxed(key)}, {boxed(value)}>"
+        element = self.expr_type(expr.elt, inner)
+        self.element_types[expr] = element
+        if isinstance(expr, ast.ListComp):
+            return f"ArrayList<{boxed(element)}>"
+        if isinstance(expr, ast.SetComp):
+            return f"HashSet<{boxed(element)}>"
+        return f"Stream<{boxed(element)}>"
+
+    def name_type(self, name, scope):
+        """Java type of a variable, a specialised list or dict type when there is one"""
+        java_type = scope.lookup(name.id)
+        if java_type is None and self.project is not None:
+            return self.external_type(name)
+        if self.collections is not None and java_type in ("ArrayList<Object>", "HashMap<Object, Object>"):
+            info = self.collections.lookup(self.functions.get(self.current), name.id)
+            return (info.java_type() if info is not None else None) or java_type
+        return java_type
+
+    def iteration_type(self, iterable, iterable_type):
+        """Java type of the items a for clause takes from iterable"""
+        if (isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name)
+                and iterable.func.id == "range"):
+            return "int"
+        if iterable_type is None:
+            return None
+        if iterable_type.endswith("[]"):
+            return iterable_type[:-2]
+        for collection in ("ArrayList<", "HashSet<", "Stream<", "HashMap<"):
+            if iterable_type.startswith(collection):
+                # A dict iterates over its keys
+                element = iterable_type[len(collection):-1].split(", ")[0]
+                return UNBOXED_TYPES.get(element, element)
+        return "Object"
+
+    def call_type(self, call, arg_types):
+        if self.project is not None and (not isinstance(call.func, ast.Name)
+                                         or call.func.id not in self.functions):
+            symbol = self.project.resolve(call.func)
+            if symbol is not None and symbol.kind == "function":
+                return symbol.signature.return_type if symbol.signature is not None else "Object"
+        if not isinstance(call.func, ast.Name):
+            return "Object"
+
+        name = call.func.id
+        if name in self.functions:
+            self.callers[name].add(self.current)
+            for index, java_type in enumerate(arg_types):
+                self.note_argument(name, index, java_type)
+            return self.return_types[name]
+        if name in BUILTIN_RESULT_TYPES:
+            return BUILTIN_RESULT_TYPES[name]
+        if name in REDUCTIONS and len(call.args) == 1 and not call.keywords:
+            element = self.element_types.get(call.args[0])
+            if element is not None or isinstance(call.args[0], COMPREHENSIONS):
+                return reduction_type(name, element)
+        if name in ("abs", "max", "min"):
+            result = None
+            for java_type in arg_types:
+                result = join_types(result, java_type)
+            return result
+        return "Object"
+
+    def external_type(self, expr):
+        """Type of a constant imported from another project module, or None"""
+        symbol = self.project.resolve(expr)
+        return symbol.java_type if symbol is not None and symbol.kind == "constant" else None
+
+    def signature(self, name):
+        """Memoized Java signature of a top-level function"""
+        signature = self._signatures.get(name)
+        if signature is None:
+            node = self.functions[name]
+            params = [
+                (arg.arg, java_type or "Object")
+                for arg, java_type in zip(node.args.args, self.param_types[name])
+            ]
+            if self.returns_value[name]:
+                return_type = self.return_types[name] or "Object"
+            else:
+                return_type = "void"
+            signature = FunctionSignature(name, params, return_type)
+            self._signatures[name] = signature
+        return signature
+
+    def variable_type(self, function_node, name):
+        """Inferred type of a variable in the scope of function_node (None: module)"""
+        scope = self.scopes.get(function_node)
+        return scope.lookup(name) if scope is not None else None
+
+    def digest(self):
+        """Hashable summary of everything statements can see outside themselves"""
+        if self._digest is None:
+            signatures = tuple(str(self.signature(name)) for name in sorted(self.functions))
+            module_types = tuple(sorted(self.scopes[None].types.items(), key=lambda item: item[0]))
+            self._digest = (signatures, module_types)
+        return self._digest
+
+
+# Java wrapper classes used as generic arguments
+BOXED_TYPES = {"int": "Integer", "long": "Long", "double": "Double", "boolean": "Boolean",
+               "String": "String"}
+UNBOXED_TYPES = {boxed_type: java_type for java_type, boxed_type in BOXED_TYPES.items()}
+
+
+def boxed(java_type):
+    """Java type usable as a generic argument"""
+    return BOXED_TYPES.get(java_type) or java_type or "Object"
+
+
+def reduction_type(name, element):
+    """Result type of a REDUCTIONS builtin over elements of the given type"""
+    if name in ("any", "all"):
+        return "boolean"
+    if name == "sum":
+        # Unknown elements are summed as doubles, which any number fits
+        return element if element in NUMERIC_RANK else "double"
+    return element or "Object"
+
+
+# List methods that change the size of a list
+RESIZING_METHODS = {"append", "extend", "insert", "pop", "remove", "clear"}
+
+
+class CollectionInfo:
+    """How one list or dict variable is built and used within its scope"""
+
+    __slots__ = ("kind", "element_type", "key_type", "resized", "escapes")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.element_type = None
+        self.key_type = None
+        self.resized = False
+        self.escapes = False
+
+    def is_primitive_array(self):
+        """Homogeneous primitive list that is never resized or handed elsewhere"""
+        return (self.kind == "list" and not self.resized and not self.escapes
+                and (self.element_type in NUMERIC_RANK or self.element_type == "boolean"))
+
+    def java_type(self):
+        """Specialised Java type, or None when element types are not uniform"""
+        if self.is_primitive_array():
+            return f"{self.element_type}[]"
+        element = BOXED_TYPES.get(self.element_type)
+        if self.kind == "list":
+            return f"ArrayList<{element}>" if element else None
+        key = BOXED_TYPES.get(self.key_type)
+        return f"HashMap<{key}, {element}>" if key and element else None
+
+
+class CollectionAnalysis(ast.NodeVisitor):
+    """Find list and dict variables that can use primitive arrays or typed collections
+
+    Variables assigned a list or dict literal are collected first; a second
+    walk then joins element types and records how each one is used.
+    Rebinding to anything but a literal makes a variable fully boxed, and
+    uses other than indexing, len(), iteration and list methods count as
+    escapes, which rule out primitive arrays.
+
+    Both walks keep their pending nodes on an explicit stack: visit()
+    only queues a node together with the function it belongs to, so
+    deeply nested code does not recurse.
+    """
+
+    def __init__(self, tree, symbols):
+        self.symbols = symbols
+        # (FunctionDef node or None, name) -> CollectionInfo
+        self.collections = {}
+        self.collect(tree)
+        self.function = None
+        # (node, enclosing FunctionDef or None) still to be visited
+        self.pending = []
+        if self.collections:
+            self.walk(tree)
+
+    def collect(self, tree):
+        # Pre-order in source order, so the first literal assigned decides the kind
+        pending = [(tree, None)]
+        while pending:
+            node, function = pending.pop()
+            if function is not None and function not in self.symbols.scopes:
+                # Methods and nested functions have no inferred types; leave their lists boxed
+                pass
+            elif isinstance(node, ast.Assign) and isinstance(node.value, (ast.List, ast.Dict)):
+                kind = "list" if isinstance(node.value, ast.List) else "dict"
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        info = self.collections.setdefault((function, target.id), CollectionInfo(kind))
+                        if info.kind != kind:
+                            self.make_boxed(info)
+            for child in reversed(list(ast.iter_child_nodes(node))):
+                pending.append((child, child if isinstance(child, ast.FunctionDef) else function))
+
+    def walk(self, tree):
+        self.visit(tree)
+        while self.pending:
+            node, self.function = self.pending.pop()
+            method = getattr(self, "visit_" + node.__class__.__name__, self.generic_visit)
+            method(node)
+
+    def visit(self, node):
+        self.pending.append((node, self.function))
+
+    def generic_visit(self, node):
+        # Queued last to first, so children are still visited in order
+        for child in reversed(list(ast.iter_child_nodes(node))):
+            self.visit(child)
+
+    def digest(self):
+        """Hashable summary of the Java type chosen for every collection"""
+        return tuple(sorted((function.name if function is not None else "", name, str(info.java_type()))
+                            for (function, name), info in self.collections.items()))
+
+    def make_boxed(self, info):
+        info.escapes = True
+        info.element_type = "Object"
+        info.key_type = "Object"
+
+    def lookup(self, function, name):
+        """CollectionInfo visible as `name` from function (None: module)
+
+        Functions type inference never walked own no collections, so every
+        name they use is looked up at module level.
+        """
+        scope = self.symbols.scopes.get(function)
+        if scope is None or name not in scope.types:
+            return self.collections.get((None, name))
+        return self.collections.get((function, name))
+
+    def refines_types(self):
+        """Whether inference should run again with the types chosen here
+
+        Inference types every literal as a list or dict of Object; a
+        specialised variable that escapes (passed, returned or assigned) or
+        is iterated by a comprehension carries its own type into that code.
+        """
+        names = {generator.iter.id for expr in self.symbols.comprehensions
+                 for generator in expr.generators if isinstance(generator.iter, ast.Name)}
+        return any((info.escapes or name in names) and info.java_type() is not None
+                   for (_, name), info in self.collections.items())
+
+    def element_type(self, elements):
+        scope = self.symbols.scopes.get(self.function)
+        if scope is None:
+            # Unknown types inside a function inference never walked
+            return "Object"
+        result = None
+        for element in elements:
+            if element is None:
+                return "Object"
+            result = join_types(result, self.symbols.expr_type(element, scope))
+        return result
+
+    def visit_FunctionDef(self, node):
+        outer, self.function = self.function, node
+        self.generic_visit(node)
+        self.function = outer
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.assign_name(target.id, node.value)
+            elif isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name):
+                info = self.lookup(self.function, target.value.id)
+                if info is not None:
+                    info.element_type = join_types(info.element_type, self.element_type([node.value]))
+                    if info.kind == "dict":
+                        # Storing a new key grows the dict
+                        info.key_type = join_types(info.key_type, self.element_type([target.slice]))
+                        info.resized = True
+                self.visit(target.slice)
+            else:
+                self.visit(target)
+        if isinstance(node.value, (ast.List, ast.Dict)):
+            for child in ast.iter_child_nodes(node.value):
+                self.visit(child)
+        else:
+            self.visit(node.value)
+
+    def assign_name(self, name, value):
+        info = self.collections.get((self.function, name))
+        if info is None:
+            return
+        if isinstance(value, ast.List) and info.kind == "list":
+            info.element_type = join_types(info.element_type, self.element_type(value.elts))
+        elif isinstance(value, ast.Dict) and info.kind == "dict":
+            info.key_type = join_types(info.key_type, self.element_type(value.keys))
+            info.element_type = join_types(info.element_type, self.element_type(value.values))
+        else:
+            self.make_boxed(info)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name):
+            info = self.lookup(self.function, node.target.id)
+            if info is not None:
+                self.make_boxed(info)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            info = self.lookup(self.function, func.value.id)
+            if info is not None:
+                if info.kind == "list" and func.attr in RESIZING_METHODS:
+                    info.resized = True
+                    if func.attr in ("append", "insert") and node.args:
+                        info.element_type = join_types(info.element_type,
+                                                       self.element_type(node.args[-1:]))
+                    elif func.attr == "extend":
+                        self.make_boxed(info)
+                else:
+                    info.escapes = True
+                for arg in node.args:
+                    self.visit(arg)
+                return
+        if (isinstance(func, ast.Name) and func.id == "len" and len(node.args) == 1
+                and isinstance(node.args[0], ast.Name)):
+            return
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        if isinstance(node.value, ast.Name) and not isinstance(node.slice, ast.Slice):
+            self.visit(node.slice)
+        else:
+            self.generic_visit(node)
+
+    def visit_For(self, node):
+        if isinstance(node.iter, ast.Name):
+            self.visit(node.target)
+            for child in node.body + node.orelse:
+                self.visit(child)
+        else:
+            self.generic_visit(node)
+
+    def visit_comprehension(self, node):
+        # Iterating a list variable, like a for loop, is not an escape
+        if isinstance(node.iter, ast.Name):
+            self.visit(node.target)
+            for condition in node.ifs:
+                self.visit(condition)
+        else:
+            self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            info = self.lookup(self.function, node.id)
+            if info is not None:
+                info.escapes = True
@@ -0,0 +1,404 @@
+"""Conversion of a whole Python project with references between modules
+
+A first pass parses every module once and records what other modules
+can refer to: its top-level functions, its module-level constants and
+what its imports point at. Imports between the project's modules give a
+dependency graph, and each module is converted once every module it
+imports has been, so the engine can type calls into them from their
+final inferred signatures. Modules whose dependencies are done are
+converted in parallel. A module being converted only looks names up in
+the index; the modules it imports are never parsed again.
+
+Constants (UPPER_CASE names assigned a literal once, at module level)
+become `public static final` fields of their class. Imported functions
+and constants are referenced as `Class.name`, qualified with the Java
+package when it differs. Classes are placed in packages mirroring the
+source directories, under a root package named after the source
+directory itself: a class in a named package cannot refer to one in the
+default package.
+"""
+import ast
+import os
+import re
+import time
+from collections import deque
+
+from batch import BatchSummary, plan_conversion
+from engine import JAVA_KEYWORDS, ConversionOptions, PyjamaEngine, parse_python
+from inference import literal_type
+
+CONSTANT_NAME = re.compile(r"[A-Z][A-Z0-9_]*")
+
+
+class ProjectSymbol:
+    """A function or constant of a project module, as other modules see it"""
+
+    __slots__ = ("kind", "java", "java_type", "signature")
+
+    def __init__(self, kind, java, java_type=None, signature=None):
+        # "function" or "constant"
+        self.kind = kind
+        # Java expression naming it from the referring class, e.g. "Util.area"
+        self.java = java
+        self.java_type = java_type
+        # FunctionSignature once the defining module is converted, else None
+        self.signature = signature
+
+
+class ProjectContext:
+    """What one module's imports refer to: all it sees of the rest of the project"""
+
+    def __init__(self, names, symbols, constants, import_positions):
+        # Local name -> dotted project path it is bound to
+        self.names = names
+        # Dotted path of an imported function or constant -> ProjectSymbol
+        self.symbols = symbols
+        # This module's own constants -> Java type, emitted as fields
+        self.constants = constants
+        # (line, column) of the import statements that resolve within the project
+        self.import_positions = import_positions
+
+    def resolve(self, expr):
+        """ProjectSymbol a Name or dotted Attribute refers to, or None"""
+        parts = []
+        while isinstance(expr, ast.Attribute):
+            parts.append(expr.attr)
+            expr = expr.value
+        if not isinstance(expr, ast.Name):
+            return None
+        bound = self.names.get(expr.id)
+        if bound is None:
+            return None
+        parts.append(bound)
+        return self.symbols.get(".".join(reversed(parts)))
+
+    def is_project_import(self, node):
+        return (node.lineno, node.col_offset) in self.import_positions
+
+
+class ModuleSummary:
+    """What the index pass learns about one module"""
+
+    def __init__(self, name, functions=(), constants=None, imports=(), error=None):
+        self.name = name
+        self.functions = list(functions)
+        self.constants = constants or {}
+        # (line, column, [(local name, bound path, imported path)]) per import
+        # statement; a star import binds the local name "*"
+        self.imports = list(imports)
+        self.error = error
+
+
+def module_name(src_path, source_dir):
+    """Dotted module name of a file and whether it is a package's __init__"""
+    rel = os.path.relpath(os.path.splitext(src_path)[0], source_dir)
+    parts = [part for part in rel.split(os.sep) if part != "."]
+    if parts and parts[-1] == "__init__":
+        return ".".join(parts[:-1]), True
+    return ".".join(parts), False
+
+
+def java_package(source_dir, rel_dir):
+    """Java package of the classes converted from rel_dir below source_dir"""
+    parts = [os.path.basename(os.path.abspath(source_dir))]
+    if rel_dir != ".":
+        parts.extend(rel_dir.split(os.sep))
+    return ".".join(java_package_part(part) for part in parts)
+
+
+def java_package_part(name):
+    """Turn a directory name into a valid Java package name segment"""
+    part = re.sub(r"\W", "_", name).lower()
+    if not part or part[0].isdigit():
+        part = "_" + part
+    if part in JAVA_KEYWORDS:
+        part += "_"
+    return part
+
+
+def absolute_import(name, is_package, level, module):
+    """Absolute dotted path of a (possibly relative) `from` import, or None"""
+    if not level:
+        return module
+    package = name if is_package else name.rpartition(".")[0]
+    parts = package.split(".") if package else []
+    if level - 1 > len(parts):
+        return None
+    parts = parts[:len(parts) - (level - 1)]
+    if module:
+        parts.append(module)
+    return ".".join(parts) or None
+
+
+def summarize(tree, name, is_package):
+    """Index entry of a parsed module"""
+    stores = {}
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            stores[node.id] = stores.get(node.id, 0) + 1
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            # Rebound from inside a function
+            for global_name in node.names:
+                stores[global_name] = stores.get(global_name, 0) + 2
+        elif isinstance(node, ast.Import):
+            bindings = []
+            for alias in node.names:
+                if alias.asname:
+                    bindings.append((alias.asname, alias.name, alias.name))
+                else:
+                    top = alias.name.partition(".")[0]
+                    bindings.append((top, top, alias.name))
+            imports.append((node.lineno, node.col_offset, bindings))
+        elif isinstance(node, ast.ImportFrom):
+            base = absolute_import(name, is_package, node.level, node.module)
+            if base is None:
+                continue
+            bindings = []
+            for alias in node.names:
+                if alias.name == "*":
+                    bindings.append(("*", base, base))
+                else:
+                    path = f"{base}.{alias.name}"
+                    bindings.append((alias.asname or alias.name, path, path))
+            imports.append((node.lineno, node.col_offset, bindings))
+
+    functions = [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+    constants = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name) or not CONSTANT_NAME.fullmatch(target.id):
+            continue
+        if not isinstance(node.value, ast.Constant) or stores.get(target.id) != 1:
+            continue
+        java_type = literal_type(node.value.value)
+        if java_type != "Object":
+            constants[target.id] = java_type
+    return ModuleSummary(name, functions, constants, imports)
+
+
+def summarize_file(task):
+    """Index pass for one file; runs inside a worker process"""
+    src_path, name, is_package = task
+    try:
+        with open(src_path, 'r', encoding='utf-8') as file:
+            tree = parse_python(file.read())
+    except (OSError, SyntaxError, ValueError) as e:
+        return ModuleSummary(name, error=str(e))
+    return summarize(tree, name, is_package)
+
+
+def convert_module_file(src_path, dst_path, options, context, tree=None):
+    """Convert one module against its context; runs inside a worker process
+
+    Returns the batch outcome tuple and the inferred signatures of the
+    module's functions, which modules importing it are converted with.
+    """
+    try:
+        with open(src_path, 'r', encoding='utf-8') as file:
+            python_code = file.read()
+        engine = PyjamaEngine(options, project=context)
+        if tree is None:
+            result = engine.convert_python_to_java(python_code)
+        else:
+            result = engine.assemble(engine.convert_module(tree, python_code))
+        signatures = {}
+        if result.ok and engine.symbols is not None:
+            signatures = {name: engine.symbols.signature(name) for name in engine.symbols.functions}
+        os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+        with open(dst_path, 'w', encoding='utf-8') as file:
+            file.write(result.java_code)
+        error = None if result.ok else result.explanation
+        return (src_path, result.ok, result.unsupported, error, None), signatures
+    except Exception as e:
+        return (src_path, False, {}, str(e), None), {}
+
+
+def _convert_task(args):
+    return convert_module_file(*args)
+
+
+class ProjectIndex:
+    """Functions, constants and imports of every module of a project"""
+
+    def __init__(self, summaries, packages, class_names):
+        self.summaries = {summary.name: summary for summary in summaries}
+        # Module -> Java package and class name
+        self.packages = packages
+        self.class_names = class_names
+        # Module -> {function name: FunctionSignature}, filled in as modules are converted
+        self.signatures = {}
+        self.dependencies = {name: set() for name in self.summaries}
+        for summary in summaries:
+            for _, _, bindings in summary.imports:
+                for _, _, path in bindings:
+                    owner = self.owner(path)
+                    if owner is not None and owner != summary.name:
+                        self.dependencies[summary.name].add(owner)
+
+    def owner(self, path):
+        """Module a dotted import path resolves to, if it names a module or one of its members"""
+        if path in self.summaries:
+            return path
+        module, _, member = path.rpartition(".")
+        summary = self.summaries.get(module)
+        if summary is not None and (member in summary.constants or member in summary.functions):
+            return module
+        return None
+
+    def java_name(self, module, member, referrer):
+        package = self.packages[module]
+        name = f"{self.class_names[module]}.{member}"
+        if package != self.packages[referrer]:
+            return f"{package}.{name}"
+        return name
+
+    def context(self, module):
+        """ProjectContext of a module, with the signatures known so far"""
+        summary = self.summaries[module]
+        names = {}
+        positions = set()
+        for line, column, bindings in summary.imports:
+            resolved = True
+            for local, bound, path in bindings:
+                owner = self.owner(path)
+                if owner is None:
+                    resolved = False
+                elif local == "*":
+                    exported = self.summaries[owner]
+                    for member in (*exported.functions, *exported.constants):
+                        names[member] = f"{owner}.{member}"
+                else:
+                    names[local] = bound
+            if resolved:
+                positions.add((line, column))
+
+        symbols = {}
+        for dependency in self.dependencies[module]:
+            exported = self.summaries[dependency]
+            signatures = self.signatures.get(dependency, {})
+            for function in exported.functions:
+                symbols[f"{dependency}.{function}"] = ProjectSymbol(
+                    "function", self.java_name(dependency, function, module),
+                    signature=signatures.get(function))
+            for constant, java_type in exported.constants.items():
+                symbols[f"{dependency}.{constant}"] = ProjectSymbol(
+                    "constant", self.java_name(dependency, constant, module), java_type=java_type)
+        return ProjectContext(names, symbols, summary.constants, positions)
+
+    def acyclic_dependencies(self):
+        """Dependencies with the import cycles broken
+
+        A depth-first walk drops every edge back to a module still being
+        walked; modules in a cycle then see the ones converted after them
+        without signatures.
+        """
+        kept = {name: set() for name in self.dependencies}
+        state = {}
+        for root in sorted(self.dependencies):
+            if root in state:
+                continue
+            state[root] = "walking"
+            stack = [(root, iter(sorted(self.dependencies[root])))]
+            while stack:
+                name, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[name] = "done"
+                    stack.pop()
+                elif state.get(child) != "walking":
+                    kept[name].add(child)
+                    if child not in state:
+                        state[child] = "walking"
+                        stack.append((child, iter(sorted(self.dependencies[child]))))
+        return kept
+
+    def schedule(self):
+        """Counts of unconverted dependencies per module, and each module's dependents"""
+        dependencies = self.acyclic_dependencies()
+        waiting = {name: len(deps) for name, deps in dependencies.items()}
+        dependents = {name: [] for name in dependencies}
+        for name, deps in dependencies.items():
+            for dependency in deps:
+                dependents[dependency].append(name)
+        return waiting, dependents
+
+
+def convert_project(source_dir, output_dir, jobs=None, add_imports=True, add_main=True):
+    """Convert every module under source_dir, resolving imports between them"""
+    tasks = plan_conversion(source_dir, output_dir)
+    summary = BatchSummary()
+    started = time.perf_counter()
+    modules = {}
+    packages = {}
+    class_names = {}
+    for src_path, dst_path, class_name in tasks:
+        name, is_package = module_name(src_path, source_dir)
+        rel_dir = os.path.relpath(os.path.dirname(src_path), source_dir)
+        modules[name] = (src_path, dst_path, is_package)
+        packages[name] = java_package(source_dir, rel_dir)
+        class_names[name] = class_name
+
+    def options(name):
+        return ConversionOptions(class_name=class_names[name], add_imports=add_imports,
+                                 add_main=add_main, explain=False, package=packages[name])
+
+    def work(name, tree=None):
+        src_path, dst_path, _ = modules[name]
+        return src_path, dst_path, options(name), index.context(name), tree
+
+    if jobs == 1:
+        # Serially, the trees of the index pass are kept and each file is parsed once
+        trees = {}
+        summaries = []
+        for name, (src_path, _, is_package) in modules.items():
+            try:
+                with open(src_path, 'r', encoding='utf-8') as file:
+                    trees[name] = parse_python(file.read())
+            except (OSError, SyntaxError, ValueError) as e:
+                summaries.append(ModuleSummary(name, error=str(e)))
+            else:
+                summaries.append(summarize(trees[name], name, is_package))
+        index = ProjectIndex(summaries, packages, class_names)
+        for name in dependency_order(index):
+            outcome, signatures = convert_module_file(*work(name, trees.pop(name, None)))
+            index.signatures[name] = signatures
+            summary.add(*outcome)
+    else:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            index_work = [(src_path, name, is_package) for name, (src_path, _, is_package) in modules.items()]
+            chunksize = max(1, len(index_work) // ((jobs or os.cpu_count() or 1) * 8))
+            index = ProjectIndex(list(pool.map(summarize_file, index_work, chunksize=chunksize)),
+                                 packages, class_names)
+            waiting, dependents = index.schedule()
+            running = {pool.submit(_convert_task, work(name)): name
+                       for name, count in waiting.items() if not count}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outcome, signatures = future.result()
+                    index.signatures[name] = signatures
+                    summary.add(*outcome)
+                    for dependent in dependents[name]:
+                        waiting[dependent] -= 1
+                        if not waiting[dependent]:
+                            running[pool.submit(_convert_task, work(dependent))] = dependent
+    summary.elapsed = time.perf_counter() - started
+    return summary
+
+
+def dependency_order(index):
+    """Modules ordered so that each comes after the modules it imports"""
+    waiting, dependents = index.schedule()
+    ready = deque(name for name in sorted(waiting) if not waiting[name])
+    while ready:
+        name = ready.popleft()
+        yield name
+        for dependent in dependents[name]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+                ready.append(dependent)
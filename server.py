@@ -0,0 +1,490 @@
+"""Long-lived conversion server for editor integration
+
+Speaks JSON-RPC 2.0 over stdin/stdout with the Language Server Protocol's
+Content-Length framing, so any LSP client can drive it. Open documents
+are kept with their parsed AST and a per-document engine whose
+incremental fragment cache holds the converted Java of every top-level
+statement, so an edit only pays for the statements it touched. Edits
+that arrive in a burst are coalesced: documents are converted once the
+queue of pending messages has drained.
+
+After each conversion the server pushes textDocument/publishDiagnostics
+(syntax errors and unsupported constructs) and a pyjama/java
+notification carrying the Java source. The pyjama/convert request
+returns the same payload for an open document or for ad-hoc text.
+"""
+import copy
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from engine import ConversionOptions, ConversionResult, PyjamaEngine
+from explanations import ExplanationLog
+
+# JSON-RPC and LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+# Full document sync: every didChange carries the whole buffer
+SYNC_FULL = 1
+# ConversionOptions fields a client may set through initializationOptions
+# or workspace/didChangeConfiguration
+CLIENT_OPTIONS = ("class_name", "add_imports", "add_main", "infer_types", "specialize_collections",
+                  "comprehensions")
+# Markers the engine writes into the Java for constructs it could not convert
+PROBLEM_MARKERS = (("/* Error converting ", SEVERITY_ERROR), ("/* Unsupported", SEVERITY_WARNING))
+MAX_MESSAGE_LENGTH = 200
+
+
+class ProtocolError(Exception):
+    """A message that could not be read or answered; code is a JSON-RPC error code"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def read_message(stream):
+    """Next JSON-RPC message from a binary stream, or None at end of input"""
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode("ascii", errors="replace").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                length = int(value)
+            except ValueError:
+                raise ProtocolError(PARSE_ERROR, f"Bad Content-Length: {value.strip()}")
+    if length is None:
+        raise ProtocolError(PARSE_ERROR, "Missing Content-Length header")
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError as e:
+        raise ProtocolError(PARSE_ERROR, f"Invalid JSON: {e}")
+
+
+def write_message(stream, message):
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body))
+    stream.write(body)
+    stream.flush()
+
+
+def syntax_diagnostic(error):
+    """LSP diagnostic for a SyntaxError raised by the parser"""
+    line = max((error.lineno or 1) - 1, 0)
+    character = max((error.offset or 1) - 1, 0)
+    end_line = line
+    end_character = character + 1
+    if getattr(error, "end_lineno", None) and error.end_offset:
+        end_line = error.end_lineno - 1
+        end_character = max(error.end_offset - 1, character + 1 if end_line == line else 0)
+    return {
+        "range": {"start": {"line": line, "character": character},
+                  "end": {"line": end_line, "character": end_character}},
+        "severity": SEVERITY_ERROR,
+        "source": "pyjama",
+        "message": f"Python syntax error: {error.msg}",
+    }
+
+
+def error_diagnostic(message):
+    """LSP diagnostic on the first line for a conversion that failed as a whole"""
+    return {
+        "range": {"start": {"line": 0, "character": 0}, "end": {"line": 1, "character": 0}},
+        "severity": SEVERITY_ERROR,
+        "source": "pyjama",
+        "message": message[:MAX_MESSAGE_LENGTH],
+    }
+
+
+def conversion_diagnostics(result):
+    """Diagnostics for the constructs a conversion left as error or unsupported comments
+
+    Each marked Java line is traced back to the innermost explanation
+    whose Java range covers it, whose Python line the diagnostic spans.
+    """
+    problems = {}
+    for number, line in enumerate(result.java_code.split("\n"), 1):
+        for marker, severity in PROBLEM_MARKERS:
+            start = line.find(marker)
+            if start >= 0:
+                end = line.find("*/", start)
+                text = line[start + 3:end if end >= 0 else len(line)].strip()
+                if len(text) > MAX_MESSAGE_LENGTH:
+                    text = text[:MAX_MESSAGE_LENGTH - 3] + "..."
+                problems[number] = (severity, text)
+                break
+    if not problems:
+        return []
+
+    marked = sorted(problems)
+    # Java line -> (span of the innermost covering entry, its Python line)
+    origins = {}
+    for entry in result.explanations:
+        if entry.java_start is None or entry.python_line is None:
+            continue
+        span = entry.java_end - entry.java_start
+        index = bisect_left(marked, entry.java_start)
+        while index < len(marked) and marked[index] <= entry.java_end:
+            number = marked[index]
+            if number not in origins or span < origins[number][0]:
+                origins[number] = (span, entry.python_line)
+            index += 1
+
+    diagnostics = []
+    for number in marked:
+        if number not in origins:
+            continue
+        severity, text = problems[number]
+        line = origins[number][1] - 1
+        diagnostics.append({
+            "range": {"start": {"line": line, "character": 0},
+                      "end": {"line": line + 1, "character": 0}},
+            "severity": severity,
+            "source": "pyjama",
+            "message": text,
+        })
+    return diagnostics
+
+
+class Document:
+    """An open editor buffer with the warm state of its last conversion"""
+
+    def __init__(self, uri, version, text, options):
+        self.uri = uri
+        self.version = version
+        self.text = text
+        # Kept across edits so its fragment cache survives
+        self.engine = PyjamaEngine(options)
+        # AST of converted_text; an options change reconverts it without parsing
+        self.tree = None
+        self.converted_text = None
+        self.result = None
+        self.diagnostics = []
+        self.dirty = True
+
+    def convert(self, cache=None, store=False):
+        """Bring result and diagnostics up to date with text
+
+        Results are looked up in cache, but only stored there with store;
+        the text between keystrokes is rarely worth keeping.
+        """
+        if self.text == self.converted_text and self.result is not None:
+            self.dirty = False
+            return
+        engine = self.engine
+        result = cache.get(self.text, engine.options) if cache else None
+        if result is not None:
+            self.tree = None
+            self.result = result
+            self.diagnostics = conversion_diagnostics(result)
+        else:
+            started = time.perf_counter()
+            try:
+                self.tree = engine.parse(self.text)
+            except SyntaxError as e:
+                # Keep the last good Java on screen; only the diagnostics change
+                self.tree = None
+                self.converted_text = self.text
+                self.diagnostics = [syntax_diagnostic(e)]
+                if self.result is None:
+                    error_msg = f"Python syntax error at line {e.lineno}: {e.msg}"
+                    self.result = ConversionResult(f"/* {error_msg} */", ExplanationLog.from_messages(error_msg),
+                                                   ok=False)
+                self.dirty = False
+                return
+            parsed = time.perf_counter()
+            self.reconvert(self.tree, started, parsed)
+            if cache and store and self.result.ok:
+                cache.put(self.text, engine.options, self.result)
+        self.converted_text = self.text
+        self.dirty = False
+
+    def reconvert(self, tree, started=None, parsed=None):
+        """Convert an already parsed tree of text into result and diagnostics
+
+        The engine raising is reported as a failed conversion, so one buffer
+        the converter chokes on never takes the server down.
+        """
+        engine = self.engine
+        parsed = parsed or time.perf_counter()
+        engine.unsupported = {}
+        try:
+            module = engine.convert_module(tree, self.text)
+            converted = time.perf_counter()
+            result = engine.assemble(module)
+        except Exception as e:
+            error_msg = f"Conversion error: {e}"
+            self.result = ConversionResult(f"/* {error_msg} */", ExplanationLog.from_messages(error_msg),
+                                           ok=False)
+            self.diagnostics = [error_diagnostic(error_msg)]
+            return
+        result.timings = {
+            "parse": (parsed - started) * 1000 if started else 0.0,
+            "convert": (converted - parsed) * 1000,
+            "assemble": (time.perf_counter() - converted) * 1000,
+        }
+        self.result = result
+        self.diagnostics = conversion_diagnostics(result)
+
+    def set_options(self, options):
+        """Switch conversion options, reusing the parsed tree when there is one"""
+        self.engine.options = options
+        if self.tree is not None and self.converted_text == self.text:
+            self.reconvert(self.tree)
+            self.dirty = False
+        else:
+            self.converted_text = None
+            self.dirty = True
+
+    def payload(self):
+        result = self.result
+        return {
+            "uri": self.uri,
+            "version": self.version,
+            "java": result.java_code,
+            "ok": result.ok,
+            "unsupported": result.unsupported,
+            "timings": result.timings,
+        }
+
+
+class PyjamaServer:
+    """JSON-RPC conversion server reading from and writing to binary streams"""
+
+    def __init__(self, reader, writer, cache=None, options=None):
+        self.reader = reader
+        self.writer = writer
+        self.cache = cache
+        self.options = copy.copy(options) if options else ConversionOptions()
+        self.options.incremental = True
+        # Diagnostics need the Java-to-Python line mapping
+        self.options.explain = True
+        self.documents = {}
+        self.incoming = queue.Queue()
+        self.initialized = False
+        self.shutdown_requested = False
+        self.exited = False
+        self.handlers = {
+            "initialize": self.initialize,
+            "initialized": self.ignore,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didSave": self.ignore,
+            "textDocument/didClose": self.did_close,
+            "workspace/didChangeConfiguration": self.did_change_configuration,
+            "pyjama/convert": self.convert_request,
+        }
+
+    def serve(self):
+        """Handle messages until exit; returns the process exit code"""
+        threading.Thread(target=self.read_loop, daemon=True).start()
+        while not self.exited:
+            message = self.incoming.get()
+            if message is None:
+                break
+            if isinstance(message, ProtocolError):
+                self.send_error(None, message.code, str(message))
+                continue
+            self.dispatch(message)
+            # Convert only once a burst of edits has been read
+            if self.incoming.empty():
+                self.flush()
+        if self.cache is not None:
+            self.cache.flush_stats()
+        return 0 if self.shutdown_requested else 1
+
+    def read_loop(self):
+        """Reader thread: parse framed messages into the queue, None at end of input"""
+        while True:
+            try:
+                message = read_message(self.reader)
+            except ProtocolError as e:
+                self.incoming.put(e)
+                continue
+            except (OSError, ValueError):
+                message = None
+            self.incoming.put(message)
+            if message is None:
+                return
+
+    def dispatch(self, message):
+        if not isinstance(message, dict):
+            self.send_error(None, INVALID_REQUEST, "Expected a JSON object")
+            return
+        method = message.get("method")
+        is_request = "id" in message
+        if method is None:
+            # Responses: the server never sends requests of its own
+            return
+        handler = self.handlers.get(method)
+        if handler is None:
+            # Unknown notifications, $/cancelRequest among them, are ignored
+            if is_request:
+                self.send_error(message["id"], METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return
+        if not self.initialized and method not in ("initialize", "exit"):
+            if is_request:
+                self.send_error(message["id"], SERVER_NOT_INITIALIZED, "Server not initialized")
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except ProtocolError as e:
+            if is_request:
+                self.send_error(message["id"], e.code, str(e))
+            return
+        except (KeyError, TypeError, AttributeError) as e:
+            if is_request:
+                self.send_error(message["id"], INVALID_PARAMS, f"Invalid params: {e}")
+            return
+        except Exception as e:
+            if is_request:
+                self.send_error(message["id"], INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+            return
+        if is_request:
+            self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def send(self, message):
+        write_message(self.writer, message)
+
+    def send_error(self, message_id, code, text):
+        self.send({"jsonrpc": "2.0", "id": message_id, "error": {"code": code, "message": text}})
+
+    def notify(self, method, params):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def flush(self):
+        """Convert every document edited since the last flush and publish the results"""
+        for document in list(self.documents.values()):
+            if document.dirty:
+                try:
+                    # The text a document was opened with is worth keeping; edits are not
+                    document.convert(self.cache, store=document.result is None)
+                except Exception as e:
+                    # Conversion failures are already diagnostics; anything else must not stop the server
+                    document.dirty = False
+                    print(f"pyjama: could not convert {document.uri}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                self.publish(document)
+
+    def publish(self, document):
+        self.notify("textDocument/publishDiagnostics", {
+            "uri": document.uri,
+            "version": document.version,
+            "diagnostics": document.diagnostics,
+        })
+        self.notify("pyjama/java", document.payload())
+
+    def apply_options(self, settings):
+        """Copy of the server options with the client's settings applied"""
+        options = copy.copy(self.options)
+        for name in CLIENT_OPTIONS:
+            if name in settings:
+                setattr(options, name, settings[name])
+        return options
+
+    # Handlers; each takes the params object and returns a request's result
+
+    def ignore(self, params):
+        return None
+
+    def initialize(self, params):
+        self.options = self.apply_options(params.get("initializationOptions") or {})
+        self.initialized = True
+        return {
+            "capabilities": {"textDocumentSync": {"openClose": True, "change": SYNC_FULL}},
+            "serverInfo": {"name": "pyjama"},
+        }
+
+    def shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def exit(self, params):
+        self.exited = True
+
+    def did_open(self, params):
+        item = params["textDocument"]
+        self.documents[item["uri"]] = Document(item["uri"], item.get("version"), item["text"],
+                                               copy.copy(self.options))
+
+    def did_change(self, params):
+        document = self.open_document(params["textDocument"]["uri"])
+        changes = params["contentChanges"]
+        if changes:
+            # Full sync: the last change holds the whole buffer
+            document.text = changes[-1]["text"]
+        document.version = params["textDocument"].get("version")
+        document.dirty = True
+
+    def did_close(self, params):
+        uri = params["textDocument"]["uri"]
+        if self.documents.pop(uri, None) is not None:
+            self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def did_change_configuration(self, params):
+        settings = params.get("settings") or {}
+        self.options = self.apply_options(settings.get("pyjama", settings))
+        for document in self.documents.values():
+            document.set_options(copy.copy(self.options))
+            if not document.dirty:
+                self.publish(document)
+
+    def convert_request(self, params):
+        """pyjama/convert: Java for an open document, or for params["text"]"""
+        if "text" in params:
+            options = self.apply_options(params.get("options") or {})
+            result = PyjamaEngine(options).convert_python_to_java(params["text"])
+            return {
+                "java": result.java_code,
+                "ok": result.ok,
+                "unsupported": result.unsupported,
+                "timings": result.timings,
+                "explanations": [entry.to_dict() for entry in result.explanations],
+            }
+        document = self.open_document(params["textDocument"]["uri"])
+        if document.dirty:
+            document.convert(self.cache, store=True)
+            self.publish(document)
+        elif self.cache is not None and document.tree is not None and document.result.ok:
+            # Converted by an earlier flush, which left it out of the cache
+            self.cache.put(document.text, document.engine.options, document.result)
+        payload = document.payload()
+        payload["diagnostics"] = document.diagnostics
+        payload["explanations"] = [entry.to_dict() for entry in document.result.explanations]
+        return payload
+
+    def open_document(self, uri):
+        document = self.documents.get(uri)
+        if document is None:
+            raise ProtocolError(INVALID_PARAMS, f"Document is not open: {uri}")
+        return document
+
+
+def serve_stdio(cache=None, options=None):
+    """Run a server on this process's stdin and stdout"""
+    # A reader of its own: the interpreter aborts at exit if the reader
+    # thread is still blocked inside sys.stdin's buffer
+    reader = os.fdopen(sys.stdin.fileno(), 'rb', closefd=False)
+    return PyjamaServer(reader, sys.stdout.buffer, cache, options).serve()
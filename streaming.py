@@ -0,0 +1,267 @@
+"""Streaming conversion of large Python files straight to a Java file
+
+The source is read line by line and cut into top-level statements, each
+of which is parsed, analysed and converted on its own before the next
+one is read. Main-body and static-method lines go to two buffered spill
+files that are concatenated into the output at the end, so memory use is
+bounded by the largest single top-level statement rather than by the
+size of the file. Type inference, when enabled, only sees one statement
+at a time, and no explanations are recorded.
+"""
+import ast
+import copy
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import time
+import tokenize
+
+from engine import JAVA_IMPORTS, CodeEmitter, ConversionCancelled, ConversionOptions, PyjamaEngine
+
+# Lines starting a clause of the compound statement before them
+CONTINUATION_LINE = re.compile(r"(?:else|elif|except|finally)\b")
+# Lines without any of these characters cannot change the scanner state
+SPECIAL_CHARS = re.compile(r"""["'#()\[\]{}\\]""")
+LINE_TOKENS = re.compile(r"""
+    (?P<triple>\"\"\"|''')
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<quote>["'])
+  | (?P<comment>\#)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+""", re.VERBOSE)
+TRIPLE_END = {
+    '"""': re.compile(r'(?:\\.|[^\\])*?"""', re.DOTALL),
+    "'''": re.compile(r"(?:\\.|[^\\])*?'''", re.DOTALL),
+}
+# Files larger than this are converted here rather than in memory
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+SPILL_BUFFER = 1024 * 1024
+PREVIEW_LINES = 500
+PREVIEW_BYTES = 256 * 1024
+
+
+def split_statements(readline):
+    """Yield (first line number, source) for each top-level statement read from readline
+
+    A light line scanner tracks brackets, strings, comments and backslash
+    continuations, which is all it takes to see where a new statement
+    starts in column 0; the full tokenizer would cost more than parsing.
+    else/elif/except/finally clauses and decorated definitions stay with
+    their statement, and comments and blank lines go with the statement
+    before them.
+    """
+    pending = []
+    pending_start = 1
+    line_number = 0
+    depth = 0
+    triple = None
+    continued = False
+    decorated = False
+    while True:
+        line = readline()
+        if not line:
+            break
+        line_number += 1
+        if (not depth and triple is None and not continued and line[:1] not in " \t\r\n\f#"
+                and not CONTINUATION_LINE.match(line)):
+            if not decorated and pending:
+                yield pending_start, "".join(pending)
+                pending = []
+                pending_start = line_number
+            decorated = line.startswith("@")
+        pending.append(line)
+
+        position = 0
+        if triple is not None:
+            end = TRIPLE_END[triple].match(line)
+            if end is None:
+                continue
+            triple = None
+            position = end.end()
+        continued = False
+        if not SPECIAL_CHARS.search(line, position):
+            continue
+        while True:
+            token = LINE_TOKENS.search(line, position)
+            if token is None:
+                continued = line.rstrip("\r\n").endswith("\\")
+                break
+            kind = token.lastgroup
+            if kind == "triple":
+                end = TRIPLE_END[token.group()].match(line, token.end())
+                if end is None:
+                    triple = token.group()
+                    break
+                position = end.end()
+                continue
+            if kind == "comment":
+                break
+            if kind == "quote":
+                # An unterminated string is left for the parser to report
+                break
+            if kind == "open":
+                depth += 1
+            elif kind == "close":
+                depth = max(0, depth - 1)
+            position = token.end()
+    if pending:
+        yield pending_start, "".join(pending)
+
+
+def read_preview(path, max_lines=PREVIEW_LINES, max_bytes=PREVIEW_BYTES):
+    """First max_lines lines of a file, read through a memory map
+
+    Returns (text, truncated). Only the pages holding the preview are
+    touched, however large the file is; a preview cut by max_bytes ends
+    at the last complete line.
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return "", False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            limit = min(len(data), max_bytes)
+            end = 0
+            for _ in range(max_lines):
+                newline = data.find(b"\n", end, limit)
+                if newline < 0:
+                    if limit == len(data):
+                        end = limit
+                    break
+                end = newline + 1
+            if not end:
+                # A single line longer than the preview is cut where the preview ends
+                end = limit
+            truncated = end < len(data)
+            head = data[:end]
+    if head.startswith(b"\xef\xbb\xbf"):
+        head = head[3:]
+    text = head.decode("utf-8", errors="replace").replace("\r\n", "\n")
+    return text.rstrip("\n"), truncated
+
+
+class StreamSummary:
+    """Outcome of a streamed conversion"""
+
+    def __init__(self):
+        self.statements = 0
+        self.java_lines = 0
+        self.unsupported = {}
+        self.timings = {}
+        self.ok = True
+        self.error = None
+
+
+class StreamingConverter:
+    """Convert a Python file to a Java file one top-level statement at a time
+
+    progress(done_bytes, total_bytes) is called after every statement and
+    should_cancel() is polled between statements; cancelling raises
+    ConversionCancelled and leaves no output file behind.
+    """
+
+    def __init__(self, options=None):
+        options = copy.copy(options or ConversionOptions())
+        # Explanations would keep one record per statement in memory
+        options.explain = False
+        self.engine = PyjamaEngine(options)
+
+    def convert_file(self, src_path, dst_path, progress=None, should_cancel=None):
+        summary = StreamSummary()
+        total_bytes = os.path.getsize(src_path)
+        started = time.perf_counter()
+        output_dir = os.path.dirname(os.path.abspath(dst_path))
+        os.makedirs(output_dir, exist_ok=True)
+        part_path = dst_path + ".part"
+        try:
+            with tokenize.open(src_path) as source, \
+                    tempfile.TemporaryFile("w+", encoding="utf-8", buffering=SPILL_BUFFER,
+                                           dir=output_dir) as main_spill, \
+                    tempfile.TemporaryFile("w+", encoding="utf-8", buffering=SPILL_BUFFER,
+                                           dir=output_dir) as methods_spill:
+                try:
+                    lines = self.convert_statements(source, main_spill, methods_spill, summary,
+                                                    total_bytes, progress, should_cancel)
+                except SyntaxError as e:
+                    summary.ok = False
+                    summary.error = f"Python syntax error at line {e.lineno}: {e.msg}"
+                    lines = None
+                converted = time.perf_counter()
+                summary.timings["convert"] = (converted - started) * 1000
+                with open(part_path, 'w', encoding='utf-8', buffering=SPILL_BUFFER) as out:
+                    if lines is None:
+                        out.write(f"/* {summary.error} */")
+                    else:
+                        summary.java_lines = self.assemble(out, main_spill, methods_spill, *lines)
+                summary.timings["assemble"] = (time.perf_counter() - converted) * 1000
+            os.replace(part_path, dst_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        summary.unsupported = self.engine.unsupported
+        return summary
+
+    def convert_statements(self, source, main_spill, methods_spill, summary, total_bytes,
+                           progress, should_cancel):
+        """Convert every statement into the spill files; returns their line counts"""
+        engine = self.engine
+        engine.unsupported = {}
+        engine.extra_imports = set()
+        main_lines = methods_lines = 0
+        done_bytes = 0
+        for first_line, text in split_statements(source.readline):
+            if should_cancel is not None and should_cancel():
+                raise ConversionCancelled()
+            try:
+                tree = engine.parse(text)
+            except SyntaxError as e:
+                e.lineno = (e.lineno or 1) + first_line - 1
+                raise
+            # Line numbers stay relative to the statement; they are only
+            # needed for explanations, which streaming does not record
+            engine.prepare_module(tree)
+            for node in tree.body:
+                if isinstance(node, ast.FunctionDef):
+                    methods_lines += self.convert_statement(node, methods_spill, 1)
+                else:
+                    main_lines += self.convert_statement(node, main_spill, 2)
+                summary.statements += 1
+            done_bytes += len(text.encode("utf-8"))
+            if progress is not None:
+                progress(min(done_bytes, total_bytes), total_bytes)
+        return main_lines, methods_lines
+
+    def convert_statement(self, node, spill, level):
+        out = CodeEmitter(level)
+        self.engine.convert_node(node, out, None)
+        for line in out.lines:
+            spill.write(line)
+            spill.write("\n")
+        return len(out.lines)
+
+    def assemble(self, out, main_spill, methods_spill, main_lines, methods_lines):
+        """Write the class around the spilled statements; returns the Java line count"""
+        options = self.engine.options
+        lines = 0
+        if options.add_imports:
+            imports = [*JAVA_IMPORTS, *sorted(self.engine.extra_imports)]
+            out.write("\n".join(imports) + "\n\n")
+            lines += len(imports) + 1
+        out.write(f"public class {options.class_name or 'Main'} {{\n")
+        lines += 1
+        if options.add_main and main_lines:
+            out.write("    public static void main(String[] args) {\n")
+            main_spill.seek(0)
+            shutil.copyfileobj(main_spill, out)
+            out.write("    }\n")
+            lines += main_lines + 2
+        if methods_lines:
+            out.write("\n")
+            methods_spill.seek(0)
+            shutil.copyfileobj(methods_spill, out)
+            lines += methods_lines + 1
+        out.write("}")
+        return lines + 1
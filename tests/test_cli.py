@@ -0,0 +1,18 @@
+"""Command-line conversion of single files"""
+import main
+
+FIBONACCI = """def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n - 1) + fibonacci(n - 2)
+
+print(fibonacci(10))
+"""
+
+
+def test_small_file_is_converted_with_whole_module_inference(tmp_path):
+    source = tmp_path / "demo.py"
+    source.write_text(FIBONACCI, encoding="utf-8")
+    output = tmp_path / "Demo.java"
+    assert main.main([str(source), "-o", str(output)]) == 0
+    assert "public static int fibonacci(int n)" in output.read_text(encoding="utf-8")
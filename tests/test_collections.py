@@ -0,0 +1,70 @@
+"""Specialised collection output (specialize_collections)"""
+import textwrap
+
+from engine import ConversionOptions, PyjamaEngine
+
+
+def convert(source):
+    options = ConversionOptions(specialize_collections=True, add_imports=False)
+    return PyjamaEngine(options).convert_python_to_java(textwrap.dedent(source))
+
+
+def test_list_in_method_converts():
+    result = convert("""
+        class Point:
+            def coords(self, x):
+                pts = [x, x]
+                pts[0] = x
+                return pts
+    """)
+    assert result.ok, result.java_code
+
+
+def test_lists_in_functions_nested_in_try_and_if_convert():
+    result = convert("""
+        data = [1, 2]
+        try:
+            def f(x):
+                vals = [x, 2]
+                data[0] = x
+                return vals
+        except ValueError:
+            pass
+        if True:
+            def g(y):
+                return [y]
+    """)
+    assert result.ok, result.java_code
+    # Stores from a function without inferred types box the module list
+    assert "ArrayList<Object> data" in result.java_code
+
+
+def test_top_level_list_becomes_primitive_array():
+    result = convert("""
+        a = [1, 2, 3]
+        a[0] = 4
+    """)
+    assert result.ok
+    assert "int[] a = new int[] {1, 2, 3};" in result.java_code
+
+
+def test_specialised_list_passed_to_function_types_its_parameter():
+    result = convert("""
+        def compute(values):
+            return len(values)
+
+        nums = [1, 2, 3]
+        nums.append(4)
+        print(compute(nums))
+    """)
+    assert "ArrayList<Integer> nums" in result.java_code
+    assert "compute(ArrayList<Integer> values)" in result.java_code
+
+
+def test_returned_specialised_list_types_the_return():
+    result = convert("""
+        def make():
+            out = [1.5]
+            return out
+    """)
+    assert "public static ArrayList<Double> make()" in result.java_code
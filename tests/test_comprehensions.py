@@ -0,0 +1,64 @@
+"""Comprehensions lowered to streams or loops"""
+import textwrap
+
+import pytest
+
+from engine import ConversionOptions, PyjamaEngine
+
+MODES = ("streams", "loops")
+
+
+def convert(source, comprehensions, **options):
+    options = ConversionOptions(comprehensions=comprehensions, add_imports=False, **options)
+    return PyjamaEngine(options).convert_python_to_java(textwrap.dedent(source))
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("streams", "IntStream.iterate(10, v -> v > 0, v -> v - 1)"),
+    ("loops", "for (int v = 10; v > 0; v--)"),
+])
+def test_negative_range_step_counts_down(mode, expected):
+    result = convert("a = [v for v in range(10, 0, -1)]\n", mode)
+    assert result.ok
+    assert expected in result.java_code
+    assert not result.unsupported
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_range_with_variable_step_is_not_lowered(mode):
+    result = convert("n = 3\nc = [v for v in range(0, 10, n)]\n", mode)
+    assert "v < 10" not in result.java_code
+    assert result.unsupported == {"ListComp": 1}
+
+
+def test_loops_mode_counts_unsupported_nodes_once():
+    source = """
+        n = 4
+        a = [v.x for v in range(n + 1)]
+        b = [v for v in range(o.n)]
+        c = sum(v.y for v in range(0, -n, -1))
+    """
+    assert convert(source, "loops").unsupported == convert(source, "streams").unsupported
+
+
+@pytest.mark.parametrize("infer_types", (True, False))
+@pytest.mark.parametrize("mode, expected", [
+    ("streams", "IntStream.range(0, x).mapToObj(x2 -> (x2 * 2))"),
+    ("loops", "for (int x2 = 0; x2 < x; x2++)"),
+])
+def test_variable_shadowing_a_local_is_renamed(mode, expected, infer_types):
+    result = convert("""
+        def double_all(x):
+            doubled = [x * 2 for x in range(x)]
+            return doubled
+    """, mode, infer_types=infer_types)
+    assert result.ok
+    assert expected in result.java_code
+
+
+def test_nested_comprehension_variables_get_distinct_names():
+    result = convert("""
+        def f(a):
+            return [[x + 1 for x in x] for x in a]
+    """, "streams")
+    assert "map(x -> x.stream().map(x2 -> (x2 + 1))" in result.java_code
@@ -0,0 +1,94 @@
+"""Very long and very deeply nested inputs convert without overflowing the stack"""
+import threading
+
+import pytest
+
+from engine import ConversionOptions, PyjamaEngine
+
+# Python's own parser gives up on longer elif chains and unary chains
+ELIF_LIMIT = 5000
+UNARY_LIMIT = 2000
+# Python's tokenizer refuses more than 100 indentation levels
+NESTING_LIMIT = 95
+
+
+def nested_source(depth):
+    """`depth` nested if blocks, each holding one assignment"""
+    lines = []
+    for d in range(depth):
+        lines.append("    " * d + f"if x{d} > {d}:")
+        lines.append("    " * (d + 1) + f"y = x{d} + 1")
+    return "\n".join(lines) + "\n"
+
+
+def elif_chain(n):
+    lines = ["x = 1", "if x == 0:", "    y = 0"]
+    for i in range(1, n):
+        lines += [f"elif x == {i}:", f"    y = {i}"]
+    lines += ["else:", "    y = -1"]
+    return "\n".join(lines) + "\n"
+
+
+def sum_chain(n):
+    return "x = " + " + ".join(f"a{i}" for i in range(n)) + "\n"
+
+
+def string_chain(n):
+    terms = " + ".join("str(i)" for _ in range(n))
+    return f's = ""\nfor i in range(3):\n    s += "a" + {terms}\n'
+
+
+def subscript_chain(n):
+    return "y = [1]\nx = y" + "[0]" * n + "\n"
+
+
+def compare_chain(n):
+    return "if " + " + ".join("a" for _ in range(n)) + " < b:\n    print(b)\n"
+
+
+def unary_chain(n):
+    return "x = " + "-" * n + "y\n"
+
+
+def convert_in_thread(source, options):
+    """Convert on a worker thread, as the GUI does"""
+    outcome = {}
+    worker = threading.Thread(
+        target=lambda: outcome.update(result=PyjamaEngine(options).convert_python_to_java(source)))
+    worker.start()
+    worker.join()
+    return outcome["result"]
+
+
+def assert_converted(result):
+    assert result.ok
+    assert "Error converting" not in result.java_code
+    assert "maximum recursion depth" not in result.java_code
+
+
+@pytest.mark.parametrize("specialize", [False, True], ids=["default", "collections"])
+@pytest.mark.parametrize("source", [
+    pytest.param(nested_source(NESTING_LIMIT), id="deep nesting"),
+    pytest.param(elif_chain(ELIF_LIMIT), id="elif chain"),
+    pytest.param(sum_chain(20000), id="sum chain"),
+    pytest.param(string_chain(5000), id="string chain"),
+    pytest.param(subscript_chain(5000), id="subscript chain"),
+    pytest.param(compare_chain(5000), id="compare chain"),
+    pytest.param(unary_chain(UNARY_LIMIT), id="unary chain"),
+])
+def test_long_and_deep_inputs_convert(source, specialize):
+    result = convert_in_thread(source, ConversionOptions(specialize_collections=specialize))
+    assert_converted(result)
+
+
+def test_deep_nesting_keeps_every_block():
+    result = PyjamaEngine().convert_python_to_java(nested_source(NESTING_LIMIT))
+    assert_converted(result)
+    innermost = NESTING_LIMIT - 1
+    assert "    " * (innermost + 2) + f"if (x{innermost} > {innermost}) {{" in result.java_code
+
+
+def test_elif_chain_keeps_every_branch():
+    result = PyjamaEngine().convert_python_to_java(elif_chain(ELIF_LIMIT))
+    assert_converted(result)
+    assert result.java_code.count("else if") == ELIF_LIMIT - 1
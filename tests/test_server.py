@@ -0,0 +1,67 @@
+"""JSON-RPC conversion server"""
+import io
+
+import server
+from engine import PyjamaEngine
+
+
+def exchange(messages, **options):
+    """Messages the server sent while handling messages, each arriving after it went idle"""
+    output = io.BytesIO()
+    pyjama = server.PyjamaServer(None, output, **options)
+    for message in messages:
+        pyjama.dispatch(message)
+        pyjama.flush()
+    output.seek(0)
+    sent = []
+    while True:
+        message = server.read_message(output)
+        if message is None:
+            return sent
+        sent.append(message)
+
+
+def session(*messages, initialization_options=None):
+    return [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+         "params": {"initializationOptions": initialization_options or {}}},
+        *messages,
+        {"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+    ]
+
+
+def did_open(text, uri="file:///a.py"):
+    return {"jsonrpc": "2.0", "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": uri, "version": 1, "text": text}}}
+
+
+def notifications(sent, method):
+    return [message["params"] for message in sent if message.get("method") == method]
+
+
+def test_open_document_publishes_java():
+    sent = exchange(session(did_open("x = 1\nprint(x)\n")))
+    java, = notifications(sent, "pyjama/java")
+    assert java["ok"]
+    assert "System.out.println(x);" in java["java"]
+
+
+def test_method_list_with_specialised_collections():
+    text = "class Point:\n    def coords(self, x):\n        pts = [x, x]\n        return pts\n"
+    sent = exchange(session(did_open(text), initialization_options={"specialize_collections": True}))
+    java, = notifications(sent, "pyjama/java")
+    assert java["ok"]
+
+
+def test_engine_error_is_published_and_server_keeps_running(monkeypatch):
+    def broken(self, tree, python_code, should_cancel=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(PyjamaEngine, "convert_module", broken)
+    sent = exchange(session(did_open("x = 1\n"), did_open("y = 2\n", uri="file:///b.py")))
+    java = notifications(sent, "pyjama/java")
+    assert [payload["uri"] for payload in java] == ["file:///a.py", "file:///b.py"]
+    assert not any(payload["ok"] for payload in java)
+    diagnostics = notifications(sent, "textDocument/publishDiagnostics")
+    assert diagnostics[0]["diagnostics"][0]["message"] == "Conversion error: boom"
+    assert any(message.get("id") == 2 and "result" in message for message in sent)